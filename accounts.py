@@ -0,0 +1,65 @@
+"""
+多帳號設定模組
+從帳號清單檔案 (accounts.json) 讀取多位員工的登入資訊，並切換 Config 使用的帳號
+"""
+import os
+import json
+from config import Config
+
+# 可以在帳號清單中覆寫的設定
+ACCOUNT_FIELDS = {
+    "username": "USERNAME",
+    "password": "PASSWORD",
+    "email_to": "EMAIL_TO",
+    "login_url": "LOGIN_URL",
+    "backend": "PUNCH_BACKEND",
+}
+
+# .env 中的原始設定，切換帳號時未提供的欄位會還原成這些值
+_DEFAULTS = {attr: getattr(Config, attr) for attr in ACCOUNT_FIELDS.values()}
+
+
+class AccountsError(Exception):
+    """帳號清單檔案格式錯誤"""
+
+
+def load_accounts(path=None, include_disabled=False):
+    """讀取帳號清單
+
+    檔案為 JSON 陣列，每個帳號至少要有 username 與 password，
+    可選 name、email_to、login_url 與 enabled（預設 true）。
+    """
+    path = os.path.expanduser(path or Config.ACCOUNTS_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise AccountsError(f"無法讀取帳號清單 {path}: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("accounts", [])
+    if not isinstance(data, list):
+        raise AccountsError(f"帳號清單 {path} 應為 JSON 陣列")
+
+    accounts = []
+    seen = set()
+    for i, account in enumerate(data, 1):
+        if not isinstance(account, dict) or not account.get("username") or not account.get("password"):
+            raise AccountsError(f"第 {i} 個帳號缺少 username 或 password")
+        if account["username"] in seen:
+            raise AccountsError(f"帳號重複: {account['username']}")
+        seen.add(account["username"])
+        if account.get("enabled", True) or include_disabled:
+            accounts.append(account)
+    return accounts
+
+
+def apply_account(account):
+    """讓 Config 改用指定帳號的登入資訊（未提供的欄位使用 .env 的設定）"""
+    for field, attr in ACCOUNT_FIELDS.items():
+        setattr(Config, attr, account.get(field) or _DEFAULTS[attr])
+
+
+def account_name(account):
+    """帳號的顯示名稱"""
+    return account.get("name") or account["username"]
@@ -5,70 +5,135 @@
 import os
 import json
 import datetime
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+import threading
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for
 from config import Config
 from web_automation import WebAutomation
 from email_service import EmailService
 from attendance_parser import AttendanceParser
+from driver_pool import DriverPoolError, get_driver_pool
+from status_cache import StatusCache
+from single_flight import KeyedLock, SingleFlight
+from job_queue import JobQueue
+from event_bus import EventBus, LogFollower, format_sse
+from log_reader import LogReader
+import attendance_store
+from attendance_store import get_attendance_store
+from schedule_config import get_schedule_config
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # 在生產環境中應該使用更安全的密鑰
 
-# 打卡時間設定檔案路徑
-SCHEDULE_FILE = 'schedule_config.json'
+# 打卡時間設定（與本地排程共用，依檔案修改時間快取）
+schedule_config = get_schedule_config()
 
 def load_schedule_config():
     """載入打卡時間設定"""
-    if os.path.exists(SCHEDULE_FILE):
-        try:
-            with open(SCHEDULE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"載入設定檔案失敗: {e}")
-    
-    # 預設設定
-    return {
-        "check_in_time": "08:45",
-        "lunch_out_time": "12:00", 
-        "lunch_in_time": "13:00",
-        "check_out_time": "17:46",
-        "enabled": True
-    }
+    return schedule_config.load()
 
 def save_schedule_config(config):
     """儲存打卡時間設定"""
+    return schedule_config.save(config)
+
+# 日誌檔案路徑與讀取器
+LOG_FILE = 'attendance_log.txt'
+log_reader = LogReader(LOG_FILE)
+
+def get_attendance_logs(page=1, per_page=50):
+    """獲取打卡記錄日誌，第 1 頁為最近 per_page 條記錄"""
+    logs, _ = get_attendance_log_page(page, per_page)
+    return logs
+
+def get_attendance_log_page(page=1, per_page=50):
+    """獲取一頁打卡記錄日誌，回傳 (記錄, 是否還有更舊的記錄)"""
     try:
-        with open(SCHEDULE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
-        return True
+        return log_reader.page(page, per_page)
     except Exception as e:
-        print(f"儲存設定檔案失敗: {e}")
-        return False
+        print(f"讀取日誌檔案失敗: {e}")
+        return [], False
 
-def get_attendance_logs():
-    """獲取打卡記錄日誌"""
-    log_file = 'attendance_log.txt'
-    logs = []
-    
-    if os.path.exists(log_file):
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # 只顯示最近 50 條記錄
-                for line in lines[-50:]:
-                    line = line.strip()
-                    if line:
-                        logs.append(line)
-        except Exception as e:
-            print(f"讀取日誌檔案失敗: {e}")
-    
-    return logs
+def fetch_attendance_status():
+    """借用瀏覽器抓取當前打卡狀態"""
+    with get_driver_pool().lease() as automation:
+        # 獲取打卡記錄
+        records = AttendanceParser.get_today_attendance_records(automation.driver)
+        status = AttendanceParser.get_current_status(records)
+        work_hours = AttendanceParser.calculate_work_hours(records)
+
+    try:
+        get_attendance_store().save_records(records)
+    except Exception as e:
+        print(f"⚠️ 打卡記錄寫入資料庫失敗: {e}")
+
+    return {
+        "status": status,
+        "records": records,
+        "work_hours": round(work_hours, 2)
+    }
+
+# 同時間的狀態查詢共用同一次抓取，同一帳號的打卡依序執行
+status_flight = SingleFlight()
+punch_locks = KeyedLock()
+
+# 打卡狀態快取，避免每次重新整理頁面都操作瀏覽器
+# 推送狀態變化、新日誌與工作進度給已連線的頁面
+event_bus = EventBus()
+log_follower = LogFollower(LOG_FILE, event_bus)
+
+status_cache = StatusCache(
+    lambda: status_flight.do(("status", Config.USERNAME), fetch_attendance_status),
+    on_update=lambda data: event_bus.publish("status", data),
+)
+
+# 手動打卡在背景執行，請求立即回傳工作編號
+job_queue = JobQueue()
+job_queue.add_listener(lambda job: event_bus.publish("job", job.to_dict()))
+
+def run_manual_checkin(job, action):
+    """背景執行手動打卡，回傳結果訊息"""
+    job.update("等待其他打卡完成")
+    try:
+        # 從驅動池借用已登入的瀏覽器並執行打卡，同一帳號一次只執行一個打卡
+        with punch_locks.hold(Config.USERNAME):
+            job.update("登入中")
+            with get_driver_pool().lease() as automation:
+                job.update("打卡中")
+                # 使用 punch_in 方法，它會根據當前狀態自動判斷打卡動作
+                outcome = automation.punch_in(action)
+    except DriverPoolError:
+        raise RuntimeError("登入失敗") from None
+    except Exception as e:
+        raise RuntimeError(f"打卡執行失敗: {str(e)}") from e
+    finally:
+        # 打卡後狀態已改變，不再共用打卡前開始的抓取，清除快取並在背景抓取新狀態
+        status_flight.forget(("status", Config.USERNAME))
+        status_cache.invalidate(refresh=True)
+
+    if outcome in (attendance_store.FAILED, attendance_store.LOGIN_FAILED):
+        result = f"{action} 打卡失敗"
+    elif outcome == attendance_store.SKIPPED:
+        result = f"{action} 已略過（目前狀態不需要打卡）"
+    elif outcome == attendance_store.DEFERRED:
+        result = f"{action} 已延後（工時未滿 8 小時）"
+    else:
+        result = f"{action} 打卡完成"
+
+    # 記錄到日誌
+    log_message = f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 手動{action}: {result}"
+    with open(LOG_FILE, 'a', encoding='utf-8') as f:
+        f.write(log_message + '\n')
+
+    if outcome in (attendance_store.FAILED, attendance_store.LOGIN_FAILED):
+        raise RuntimeError(result)
+    if outcome == attendance_store.SUCCESS:
+        return f"打卡成功: {result}"
+    return result
 
 @app.route('/')
 def index():
     """首頁"""
     config = load_schedule_config()
-    logs = get_attendance_logs()
+    logs = get_attendance_logs(per_page=10)
     
     return render_template('index.html', 
                          config=config, 
@@ -97,65 +162,69 @@ def update_schedule():
 
 @app.route('/manual_checkin', methods=['POST'])
 def manual_checkin():
-    """手動執行打卡"""
+    """手動執行打卡（排入背景工作，立即回傳工作編號）"""
     try:
         action = request.form.get('action')
-        
-        # 創建 WebAutomation 實例並執行打卡
-        automation = WebAutomation()
-        automation.setup_driver()
-        
-        if automation.login():
-            try:
-                # 使用 punch_in 方法，它會根據當前狀態自動判斷打卡動作
-                automation.punch_in(action)
-                result = f"{action} 打卡完成"
-                
-                # 記錄到日誌
-                log_message = f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 手動{action}: {result}"
-                with open('attendance_log.txt', 'a', encoding='utf-8') as f:
-                    f.write(log_message + '\n')
-                
-                return jsonify({"success": True, "message": f"打卡成功: {result}"})
-            except Exception as e:
-                return jsonify({"success": False, "message": f"打卡執行失敗: {str(e)}"})
-            finally:
-                automation.quit()
-        else:
-            automation.quit()
-            return jsonify({"success": False, "message": "登入失敗"})
-            
+        job = job_queue.submit("manual_checkin", run_manual_checkin, action, description=f"手動{action}")
+        return jsonify({"success": True, "job_id": job.id, "message": f"已排入{action}打卡，執行中..."}), 202
+
     except Exception as e:
         return jsonify({"success": False, "message": f"打卡失敗: {str(e)}"})
 
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """查詢背景工作的進度與結果"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "找不到工作"}), 404
+    return jsonify({"success": True, "job": job.to_dict()})
+
 @app.route('/get_attendance_status')
 def get_attendance_status():
     """獲取當前打卡狀態"""
     try:
-        automation = WebAutomation()
-        automation.setup_driver()
-        
-        if automation.login():
-            # 獲取打卡記錄
-            records = AttendanceParser.get_today_attendance_records(automation.driver)
-            status = AttendanceParser.get_current_status(records)
-            work_hours = AttendanceParser.calculate_work_hours(records)
-            
-            automation.quit()
-            
-            return jsonify({
-                "success": True,
-                "status": status,
-                "records": records,
-                "work_hours": round(work_hours, 2)
-            })
-        else:
-            automation.quit()
-            return jsonify({"success": False, "message": "登入失敗"})
+        data, age = status_cache.get()
+        return jsonify({
+            "success": True,
+            **data,
+            "cached": age > 0,
+            "age": round(age, 1)
+        })
             
+    except DriverPoolError:
+        return jsonify({"success": False, "message": "登入失敗"})
     except Exception as e:
         return jsonify({"success": False, "message": f"獲取狀態失敗: {str(e)}"})
 
+@app.route('/events')
+def events():
+    """以 Server-Sent Events 推送打卡狀態、日誌與背景工作進度"""
+    log_follower.start()
+
+    def stream():
+        subscription = event_bus.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            # 連線後先送出目前的打卡狀態
+            try:
+                data, _ = status_cache.get()
+                yield format_sse("status", data)
+            except Exception as e:
+                yield format_sse("status_error", {"message": f"獲取狀態失敗: {str(e)}"})
+
+            while True:
+                item = subscription.get(timeout=Config.SSE_HEARTBEAT)
+                if item is None:
+                    # 心跳只維持連線，不觸發重新爬取；快取更新時會另外推送 status 事件
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(*item)
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/test_email')
 def test_email():
     """測試郵件功能"""
@@ -170,12 +239,17 @@ def test_email():
 
 @app.route('/logs')
 def logs():
-    """日誌頁面"""
-    logs = get_attendance_logs()
-    return render_template('logs.html', logs=logs)
+    """日誌頁面（?page=2 起為較舊的記錄）"""
+    page = max(1, request.args.get('page', 1, type=int))
+    logs, has_more = get_attendance_log_page(page)
+    return render_template('logs.html', logs=logs, page=page, has_more=has_more)
 
 
 if __name__ == '__main__':
     print("🌐 啟動自動打卡系統 Web 介面...")
     print("📱 請在瀏覽器中開啟: http://localhost:5001")
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    debug = True
+    # debug 模式下 reloader 的監看行程不處理請求，只在實際提供服務的行程預熱瀏覽器
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true" or not debug:
+        threading.Thread(target=get_driver_pool().warm_up, daemon=True).start()
+    app.run(debug=debug, host='0.0.0.0', port=5001)
@@ -5,15 +5,177 @@
 import os
 import re
 import datetime
-from selenium.webdriver.common.by import By
+from html.parser import HTMLParser
+from config import Config
+import work_hours
+from timing import timed
+
+# 今日打卡容器與記錄行的 XPath
+CONTAINER_XPATH = "//div[contains(@class,'border') and contains(@class,'px-3') and .//div[contains(text(), '{date}')]]"
+ROW_XPATH = ".//div[contains(@class,'row') and contains(@class,'border-bottom') and contains(@class,'hover-bg-primary-light')]"
+
+# 在瀏覽器內以相同的 XPath 找出容器與各行，一次回傳所有行的 innerText
+SNAPSHOT_SCRIPT = """
+var container = document.evaluate(arguments[0], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!container) { return null; }
+var rows = document.evaluate(arguments[1], container, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var texts = [];
+for (var i = 0; i < rows.snapshotLength; i++) { texts.push(rows.snapshotItem(i).innerText); }
+return texts;
+"""
+
+# 時區行判斷用的關鍵字（區分大小寫的子字串比對）
+TIMEZONE_KEYWORDS = [
+    # 完整時區名稱
+    'Eastern Time Zone', 'Central Time Zone', 'Mountain Time Zone',
+    'Pacific Time Zone', 'East Asia Time Zone', 'India Standard Time',
+    'Greenwich Mean Time', 'Coordinated Universal Time',
+    # 時區縮寫
+    'EST', 'CST', 'MST', 'PST', 'EDT', 'CDT', 'MDT', 'PDT',
+    'GMT', 'UTC', 'JST', 'KST', 'IST',
+    # UTC/GMT 偏移
+    'UTC+', 'UTC-', 'GMT+', 'GMT-',
+    # 地區名稱
+    'Ann Arbor', 'Pittsburgh', 'Durham', 'Chicago', 'Texas', 'Colorado',
+    'Washington', 'California', 'Taiwan', 'Singapore', 'Malaysia',
+    'New York', 'Los Angeles', 'Seattle', 'Boston', 'Miami',
+    'Asia/', 'America/', 'Europe/', 'Africa/', 'Australia/',
+    # 其他可能的時區標識
+    'Time Zone', 'Timezone', 'TZ', 'Offset'
+]
+
+# 時區行判斷用的正則表達式（不分大小寫）
+# 只用於判斷是否符合，因此寫成與原本規則等價但回溯較少的形式
+TIMEZONE_PATTERNS = [
+    r'(?:UTC|GMT)[+-]\d',  # UTC+8, GMT-5
+    r'\b(?:[ECMP][SD]T|GMT|UTC|[JKI]ST)\b',  # 特定時區縮寫 EST, PDT, JST...
+    r'(?<=[A-Z]{2}) Time Zone',  # Eastern Time Zone（前面至少兩個字母）
+    r'(?:Asia|America)/[A-Z_]',  # Asia/Taipei, America/New_York
+]
+
+
+def _minimal_keywords(keywords):
+    """移除包含其他關鍵字的關鍵字（例如 'UTC+' 已被 'UTC' 涵蓋），減少每個位置要嘗試的分支"""
+    unique = list(dict.fromkeys(keywords))
+    return [k for k in unique if not any(other != k and other in k for other in unique)]
+
+
+# 將所有關鍵字與模式合併為單一預先編譯的正則表達式，每行只需掃描一次
+TIMEZONE_ROW_RE = re.compile("|".join(
+    [re.escape(k) for k in _minimal_keywords(TIMEZONE_KEYWORDS)]
+    + [f"(?i:{p})" for p in TIMEZONE_PATTERNS]
+))
+TIME_RE = re.compile(r'\b(\d{1,2}:\d{2})\b')
+
+# 離線解析 HTML 用的標籤分類
+SKIP_TAGS = {"script", "style", "template", "noscript"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+BLOCK_TAGS = {"div", "p", "br", "li", "ul", "ol", "tr", "table", "section", "header", "footer", "h1", "h2", "h3", "h4", "h5", "h6"}
+CONTAINER_CLASSES = ("border", "px-3")
+ROW_CLASSES = ("row", "border-bottom", "hover-bg-primary-light")
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+class _HTMLNode:
+    """離線解析用的簡易 DOM 節點"""
+    __slots__ = ("tag", "cls", "children", "parent")
+
+    def __init__(self, tag, cls="", parent=None):
+        self.tag = tag
+        self.cls = cls
+        self.children = []
+        self.parent = parent
+
+    def first_text(self):
+        """對應 XPath text() 轉字串時取第一個文字節點"""
+        for child in self.children:
+            if isinstance(child, str):
+                return child
+        return ""
+
+    def iter_elements(self):
+        """依文件順序走訪所有子孫元素"""
+        stack = [c for c in reversed(self.children) if not isinstance(c, str)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(c for c in reversed(node.children) if not isinstance(c, str))
+
+    def inner_text(self):
+        """近似瀏覽器的 innerText：區塊元素之間換行，行內文字以空白連接"""
+        parts = []
+
+        def walk(node):
+            for child in node.children:
+                if isinstance(child, str):
+                    text = " ".join(child.split())
+                    if text:
+                        if parts and parts[-1] not in ("\n", " "):
+                            parts.append(" ")
+                        parts.append(text)
+                elif child.tag in BLOCK_TAGS:
+                    parts.append("\n")
+                    walk(child)
+                    parts.append("\n")
+                else:
+                    walk(child)
+
+        walk(self)
+        lines = (line.strip() for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+class _HTMLTreeBuilder(HTMLParser):
+    """以標準函式庫 HTMLParser 建立簡易 DOM"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _HTMLNode("#document")
+        self.current = self.root
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth or tag in SKIP_TAGS:
+            self._skip_depth += tag in SKIP_TAGS
+            return
+        node = _HTMLNode(tag, dict(attrs).get("class") or "", self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._skip_depth:
+            self.current.children.append(_HTMLNode(tag, dict(attrs).get("class") or "", self.current))
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.current.children.append(data)
+
 
 class AttendanceParser:
     """打卡記錄解析類別"""
     
 
     @staticmethod
-    def get_today_attendance_records(driver):
-        """獲取當天的完整打卡記錄"""
+    def get_today_date_str():
+        """取得打卡系統上今天的日期字串 (MM/DD)"""
         # 在 GitHub Actions 環境中，使用台灣時間來匹配打卡系統的日期
         if os.getenv("GITHUB_ACTIONS"):
             # 台灣時間 = UTC + 8 小時
@@ -23,121 +185,45 @@ class AttendanceParser:
         else:
             today_str = datetime.datetime.now().strftime("%m/%d")
             print(f"🕐 使用本地時間日期: {today_str}")
-        
-        records = []
+        return today_str
+
+    @staticmethod
+    @timed("records")
+    def get_today_attendance_records(driver, mode=None):
+        """獲取當天的完整打卡記錄
+
+        mode="snapshot"（預設）以一次 execute_script 取回所有行的文字後在本機解析；
+        mode="live" 逐一透過 WebDriver 讀取容器、行與行文字。
+        """
+        # 只有讀取瀏覽器頁面時才載入 Selenium，離線解析與工時計算不需要
+        from selenium.common.exceptions import WebDriverException
+
+        mode = mode or Config.PARSER_MODE
+        today_str = AttendanceParser.get_today_date_str()
         
         try:
             print(f"🔍 正在尋找日期: {today_str}")
             
-            # 方法1: 尋找包含今日日期的 div
-            # try:
-            #     date_div = driver.find_element(By.XPATH, f"//div[contains(text(), '{today_str}')]")
-            #     print(f"✅ 找到日期 div: {date_div.text}")
-                
-            #     # 找到包含這個日期的容器
-            #     container = date_div.find_element(By.XPATH, "./ancestor::div[contains(@class,'border') and contains(@class,'px-3')]")
-            #     print(f"✅ 找到日期容器")
-                
-            # except Exception as e:
-            #     print(f"⚠️ 方法1失敗: {e}")
-            #     # 方法2: 直接尋找包含日期的容器
-            try:
-                container = driver.find_element(By.XPATH, f"//div[contains(@class,'border') and contains(@class,'px-3') and .//div[contains(text(), '{today_str}')]]")
-                print(f"✅ 方法2找到日期容器")
-            except Exception as e2:
-                print(f"❌ 方法2也失敗: {e2}")
-                return []
+            row_texts = None
+            if mode == "snapshot":
+                try:
+                    row_texts = AttendanceParser._snapshot_row_texts(driver, today_str)
+                except WebDriverException as e:
+                    print(f"⚠️ 快照解析失敗，改用逐行讀取: {e}")
+                    mode = "live"
+                else:
+                    if row_texts is None:
+                        print("❌ 找不到今日日期容器")
+                        return []
+                    print(f"✅ 快照取得日期容器")
             
-            # 尋找所有打卡記錄行（排除標題行）
-            rows = container.find_elements(By.XPATH, ".//div[contains(@class,'row') and contains(@class,'border-bottom') and contains(@class,'hover-bg-primary-light')]")
-            print(f"📊 找到 {len(rows)} 個打卡記錄行")
+            if mode != "snapshot":
+                row_texts = AttendanceParser._live_row_texts(driver, today_str)
+                if row_texts is None:
+                    return []
             
-            for i, row in enumerate(rows):
-                try:
-                    print(f"🔍 解析第 {i+1} 行...")
-                    
-                    # 獲取整行的文本
-                    row_text = row.text
-                    print(f"   行文本: {row_text}")
-                    
-                    # 檢查是否為時區相關行
-                    timezone_keywords = [
-                        # 完整時區名稱
-                        'Eastern Time Zone', 'Central Time Zone', 'Mountain Time Zone', 
-                        'Pacific Time Zone', 'East Asia Time Zone', 'India Standard Time',
-                        'Greenwich Mean Time', 'Coordinated Universal Time',
-                        # 時區縮寫
-                        'EST', 'CST', 'MST', 'PST', 'EDT', 'CDT', 'MDT', 'PDT',
-                        'GMT', 'UTC', 'JST', 'KST', 'CST', 'IST',
-                        # UTC/GMT 偏移
-                        'UTC+', 'UTC-', 'GMT+', 'GMT-',
-                        # 地區名稱
-                        'Ann Arbor', 'Pittsburgh', 'Durham', 'Chicago', 'Texas', 'Colorado',
-                        'Washington', 'California', 'Taiwan', 'Singapore', 'Malaysia',
-                        'New York', 'Los Angeles', 'Seattle', 'Boston', 'Miami',
-                        'Asia/', 'America/', 'Europe/', 'Africa/', 'Australia/',
-                        # 其他可能的時區標識
-                        'Time Zone', 'Timezone', 'TZ', 'Offset'
-                    ]
-                    
-                    is_timezone_row = any(keyword in row_text for keyword in timezone_keywords)
-                    
-                    # 額外檢查：使用正則表達式檢測時區模式
-                    timezone_patterns = [
-                        r'UTC[+-]\d+',  # UTC+8, UTC-5
-                        r'GMT[+-]\d+',  # GMT+8, GMT-5
-                        r'\b(EST|CST|MST|PST|EDT|CDT|MDT|PDT|GMT|UTC|JST|KST|IST)\b',  # 特定時區縮寫
-                        r'[A-Z][a-z]+ Time Zone',  # Eastern Time Zone
-                        r'Asia/[A-Za-z_]+',  # Asia/Taipei
-                        r'America/[A-Za-z_]+',  # America/New_York
-                    ]
-                    
-                    has_timezone_pattern = any(re.search(pattern, row_text, re.IGNORECASE) for pattern in timezone_patterns)
-                    
-                    if is_timezone_row or has_timezone_pattern:
-                        print(f"   ⚠️ 第 {i+1} 行是時區行，跳過")
-                        print(f"      關鍵字匹配: {is_timezone_row}")
-                        print(f"      模式匹配: {has_timezone_pattern}")
-                        continue
-                    
-                    # 使用正則表達式提取時間
-                    time_pattern = r'\b(\d{1,2}:\d{2})\b'
-                    times = re.findall(time_pattern, row_text)
-                    print(f"   找到時間: {times}")
-                    
-                    if len(times) >= 1:
-                        # 過濾掉可能的時區時間
-                        valid_times = []
-                        for time_str in times:
-                            try:
-                                hour, minute = map(int, time_str.split(':'))
-                                # 排除明顯不是打卡時間的時間
-                                # 打卡時間通常在 6:00-22:00 之間
-                                if 6 <= hour <= 22:
-                                    valid_times.append(time_str)
-                                else:
-                                    print(f"      ⚠️ 跳過可疑時間: {time_str} (不在正常打卡時間範圍)")
-                            except ValueError:
-                                print(f"      ⚠️ 跳過無效時間格式: {time_str}")
-                        
-                        if valid_times:
-                            check_in_time = valid_times[0]
-                            check_out_time = valid_times[1] if len(valid_times) > 1 else ""
-                            
-                            records.append({
-                                'check_in': check_in_time,
-                                'check_out': check_out_time
-                            })
-                            print(f"   ✅ 記錄 {i+1}: Check in={check_in_time}, Check out={check_out_time}")
-                        else:
-                            print(f"   ⚠️ 第 {i+1} 行沒有找到有效的打卡時間")
-                    else:
-                        print(f"   ⚠️ 第 {i+1} 行沒有找到時間")
-                    
-                except Exception as e:
-                    print(f"   ❌ 解析第 {i+1} 行失敗: {e}")
-                    continue
-                    
+            print(f"📊 找到 {len(row_texts)} 個打卡記錄行")
+            records = AttendanceParser.parse_row_texts(row_texts)
             print(f"📋 當天打卡記錄: {records}")
             return records
             
@@ -147,6 +233,122 @@ class AttendanceParser:
             traceback.print_exc()
             return []
 
+    @staticmethod
+    def parse_html(html, date, verbose=False):
+        """從已儲存的頁面 HTML 解析指定日期的打卡記錄，不需要瀏覽器
+
+        html 可為 str 或 bytes；date 可為 "MM/DD" 字串或 date/datetime 物件。
+        """
+        if isinstance(html, bytes):
+            html = html.decode("utf-8", errors="replace")
+        if isinstance(date, (datetime.date, datetime.datetime)):
+            date = date.strftime("%m/%d")
+
+        row_texts = AttendanceParser.extract_row_texts(html, date)
+        if row_texts is None:
+            if verbose:
+                print(f"❌ 找不到日期 {date} 的容器")
+            return []
+        return AttendanceParser.parse_row_texts(row_texts, verbose=verbose)
+
+    @staticmethod
+    def extract_row_texts(html, date):
+        """以與 CONTAINER_XPATH / ROW_XPATH 相同的規則從 HTML 取出各行文字"""
+        builder = _HTMLTreeBuilder()
+        builder.feed(html)
+        builder.close()
+
+        for node in builder.root.iter_elements():
+            if node.tag != "div" or not all(c in node.cls for c in CONTAINER_CLASSES):
+                continue
+            if not any(d.tag == "div" and date in d.first_text() for d in node.iter_elements()):
+                continue
+            return [
+                row.inner_text() for row in node.iter_elements()
+                if row.tag == "div" and all(c in row.cls for c in ROW_CLASSES)
+            ]
+        return None
+
+    @staticmethod
+    def _snapshot_row_texts(driver, today_str):
+        """以單次 execute_script 取得今日容器內所有行的文字，找不到容器時回傳 None"""
+        return driver.execute_script(
+            SNAPSHOT_SCRIPT, CONTAINER_XPATH.format(date=today_str), ROW_XPATH
+        )
+
+    @staticmethod
+    def _live_row_texts(driver, today_str):
+        """逐一透過 WebDriver 讀取今日容器內各行的文字，找不到容器時回傳 None"""
+        from selenium.webdriver.common.by import By
+
+        try:
+            container = driver.find_element(By.XPATH, CONTAINER_XPATH.format(date=today_str))
+            print(f"✅ 方法2找到日期容器")
+        except Exception as e2:
+            print(f"❌ 方法2也失敗: {e2}")
+            return None
+        
+        # 尋找所有打卡記錄行（排除標題行）
+        rows = container.find_elements(By.XPATH, ROW_XPATH)
+        return [row.text for row in rows]
+
+    @staticmethod
+    def parse_row_texts(row_texts, verbose=True):
+        """從各行文字解析出打卡記錄"""
+        log = print if verbose else _silent
+        records = []
+        
+        for i, row_text in enumerate(row_texts):
+            try:
+                log(f"🔍 解析第 {i+1} 行...")
+                log(f"   行文本: {row_text}")
+                
+                # 檢查是否為時區相關行（關鍵字與模式合併為單一預先編譯的正則表達式）
+                timezone_match = TIMEZONE_ROW_RE.search(row_text)
+                if timezone_match:
+                    log(f"   ⚠️ 第 {i+1} 行是時區行，跳過")
+                    log(f"      符合: {timezone_match.group(0)}")
+                    continue
+                
+                # 使用正則表達式提取時間
+                times = TIME_RE.findall(row_text)
+                log(f"   找到時間: {times}")
+                
+                if len(times) >= 1:
+                    # 過濾掉可能的時區時間
+                    valid_times = []
+                    for time_str in times:
+                        try:
+                            hour, minute = map(int, time_str.split(':'))
+                            # 排除明顯不是打卡時間的時間
+                            # 打卡時間通常在 6:00-22:00 之間
+                            if 6 <= hour <= 22:
+                                valid_times.append(time_str)
+                            else:
+                                log(f"      ⚠️ 跳過可疑時間: {time_str} (不在正常打卡時間範圍)")
+                        except ValueError:
+                            log(f"      ⚠️ 跳過無效時間格式: {time_str}")
+                    
+                    if valid_times:
+                        check_in_time = valid_times[0]
+                        check_out_time = valid_times[1] if len(valid_times) > 1 else ""
+                        
+                        records.append({
+                            'check_in': check_in_time,
+                            'check_out': check_out_time
+                        })
+                        log(f"   ✅ 記錄 {i+1}: Check in={check_in_time}, Check out={check_out_time}")
+                    else:
+                        log(f"   ⚠️ 第 {i+1} 行沒有找到有效的打卡時間")
+                else:
+                    log(f"   ⚠️ 第 {i+1} 行沒有找到時間")
+                
+            except Exception as e:
+                log(f"   ❌ 解析第 {i+1} 行失敗: {e}")
+                continue
+        
+        return records
+
     @staticmethod
     def get_current_status(records):
         """判斷當前打卡狀態"""
@@ -180,22 +382,5 @@ class AttendanceParser:
 
     @staticmethod
     def calculate_work_hours(records):
-        """計算總工時"""
-        total_hours = 0
-        
-        for record in records:
-            try:
-                if record['check_in'] and record['check_out']:
-                    in_time = datetime.datetime.strptime(record['check_in'], "%H:%M").time()
-                    out_time = datetime.datetime.strptime(record['check_out'], "%H:%M").time()
-                    today = datetime.datetime.now().date()
-                    in_datetime = datetime.datetime.combine(today, in_time)
-                    out_datetime = datetime.datetime.combine(today, out_time)
-                    duration = out_datetime - in_datetime
-                    hours = duration.total_seconds() / 3600
-                    total_hours += hours
-            except Exception as e:
-                print(f"⚠️ 計算工時時出錯: {e}")
-                continue
-        
-        return total_hours
+        """計算已完成時段的總工時"""
+        return work_hours.summarize(records).completed_hours
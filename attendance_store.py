@@ -0,0 +1,239 @@
+"""
+打卡資料庫模組
+以 SQLite 保存打卡結果與每天的打卡記錄，寫入由背景執行緒批次提交，查詢走索引
+"""
+import os
+import queue
+import atexit
+import sqlite3
+import datetime
+import threading
+from config import Config
+from work_hours import current_time, to_minutes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS punches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    action TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    message TEXT,
+    work_hours REAL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_punches_account_date ON punches (account, date);
+CREATE INDEX IF NOT EXISTS idx_punches_date ON punches (date);
+CREATE INDEX IF NOT EXISTS idx_punches_action_date ON punches (action, date);
+
+CREATE TABLE IF NOT EXISTS records (
+    account TEXT NOT NULL,
+    date TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    check_in TEXT,
+    check_out TEXT,
+    minutes INTEGER,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (account, date, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_records_date ON records (date);
+"""
+
+# 打卡結果
+SUCCESS = "success"
+SKIPPED = "skipped"
+DEFERRED = "deferred"
+FAILED = "failed"
+LOGIN_FAILED = "login_failed"
+
+_STOP = object()
+
+
+class AttendanceStore:
+    """SQLite 打卡資料庫
+
+    record_punch() 與 save_records() 只把寫入放進佇列，背景執行緒把累積的寫入
+    合併成一個交易提交；查詢使用另一個連線，在 WAL 模式下不會被寫入阻擋。
+
+    佇列中的每一項是一組 (sql, rows) 陳述式，同一項的陳述式一定在同一個交易中提交；
+    整批提交失敗時改為逐項重試，只捨棄出錯的那一項。
+    """
+
+    def __init__(self, path=None, batch_size=100):
+        self.path = os.path.expanduser(path or Config.ATTENDANCE_DB)
+        self.batch_size = batch_size
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._read_lock = threading.Lock()
+        self._reader = self._connect()
+        self._reader.executescript(SCHEMA)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="attendance-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---- 寫入 ----
+
+    def record_punch(self, action, outcome, message="", work_hours=None, source=None,
+                     account=None, when=None):
+        """記錄一次打卡結果"""
+        when = when or current_time()
+        self._queue.put([(
+            "INSERT INTO punches (account, date, time, action, outcome, message, work_hours, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(account or Config.USERNAME or "", when.strftime("%Y-%m-%d"), when.strftime("%H:%M:%S"),
+              action, outcome, message, work_hours, source)],
+        )])
+
+    def save_records(self, records, date=None, account=None):
+        """以最新解析結果取代某天的打卡記錄；沒有記錄時保留原本的資料
+
+        頁面尚未載入完成或解析失敗時會得到空的結果，不能因此清掉當天已保存的記錄。
+        """
+        if not records:
+            return
+        account = account or Config.USERNAME or ""
+        date = (date or current_time().date()).isoformat()
+        updated_at = current_time().isoformat(timespec="seconds")
+        rows = []
+        for seq, record in enumerate(records):
+            in_minutes = to_minutes(record.get("check_in"))
+            out_minutes = to_minutes(record.get("check_out"))
+            minutes = out_minutes - in_minutes if in_minutes is not None and out_minutes is not None else None
+            rows.append((account, date, seq, record.get("check_in"), record.get("check_out"), minutes, updated_at))
+        # 刪除與寫入放在同一項，避免被拆到不同交易而留下當天沒有記錄的狀態
+        self._queue.put([
+            ("DELETE FROM records WHERE account = ? AND date = ?", [(account, date)]),
+            ("INSERT INTO records (account, date, seq, check_in, check_out, minutes, updated_at) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?)", rows),
+        ])
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in batch)
+            writes = [item for item in batch if item is not _STOP]
+            try:
+                self._commit(conn, writes)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                conn.close()
+                return
+
+    @staticmethod
+    def _execute(conn, writes):
+        with conn:
+            for statements in writes:
+                for sql, rows in statements:
+                    conn.executemany(sql, rows)
+
+    def _commit(self, conn, writes):
+        """整批寫入一個交易；失敗時逐項重試，只捨棄出錯的項目"""
+        try:
+            self._execute(conn, writes)
+            return
+        except sqlite3.Error as e:
+            if len(writes) == 1:
+                print(f"❌ 打卡資料庫寫入失敗: {e}")
+                return
+            print(f"⚠️ 打卡資料庫批次寫入失敗，改為逐筆寫入: {e}")
+        for statements in writes:
+            try:
+                self._execute(conn, [statements])
+            except sqlite3.Error as e:
+                print(f"❌ 打卡資料庫寫入失敗: {e}")
+
+    def flush(self):
+        """等待所有排隊中的寫入完成"""
+        self._queue.join()
+
+    def close(self):
+        """寫入剩餘資料並關閉資料庫"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+
+    # ---- 查詢 ----
+
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def punches(self, start=None, end=None, account=None, action=None, limit=None):
+        """查詢打卡結果，依時間由新到舊排列"""
+        sql = "SELECT date, time, action, outcome, message, work_hours, source FROM punches WHERE account = ?"
+        params = [account or Config.USERNAME or ""]
+        if start:
+            sql += " AND date >= ?"
+            params.append(start.isoformat())
+        if end:
+            sql += " AND date <= ?"
+            params.append(end.isoformat())
+        if action:
+            sql += " AND action = ?"
+            params.append(action)
+        sql += " ORDER BY date DESC, time DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        columns = ("date", "time", "action", "outcome", "message", "work_hours", "source")
+        return [dict(zip(columns, row)) for row in self._query(sql, params)]
+
+    def records(self, date, account=None):
+        """查詢某天的打卡記錄"""
+        rows = self._query(
+            "SELECT check_in, check_out FROM records WHERE account = ? AND date = ? ORDER BY seq",
+            (account or Config.USERNAME or "", date.isoformat()),
+        )
+        return [{"check_in": check_in, "check_out": check_out} for check_in, check_out in rows]
+
+    def daily_hours(self, start, end, account=None):
+        """每天已完成的工時，回傳 {日期: 小時}"""
+        rows = self._query(
+            "SELECT date, SUM(minutes) FROM records WHERE account = ? AND date BETWEEN ? AND ? "
+            "GROUP BY date ORDER BY date",
+            (account or Config.USERNAME or "", start.isoformat(), end.isoformat()),
+        )
+        return {datetime.date.fromisoformat(date): (minutes or 0) / 60 for date, minutes in rows}
+
+    def outcome_summary(self, start, end, account=None):
+        """統計期間內各打卡動作的結果次數，回傳 {(動作, 結果): 次數}"""
+        rows = self._query(
+            "SELECT action, outcome, COUNT(*) FROM punches WHERE account = ? AND date BETWEEN ? AND ? "
+            "GROUP BY action, outcome",
+            (account or Config.USERNAME or "", start.isoformat(), end.isoformat()),
+        )
+        return {(action, outcome): count for action, outcome, count in rows}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_attendance_store():
+    """取得全域共用的打卡資料庫"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AttendanceStore()
+            atexit.register(_store.close)
+        return _store
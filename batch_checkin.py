@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+多帳號批次打卡
+以有上限的行程池為帳號清單中的每個帳號執行 run_checkin，每個行程維持一個 Chrome 依序切換帳號
+
+用法:
+    python batch_checkin.py <動作> [--accounts accounts.json] [--workers N] [--output 結果.jsonl]
+                            [--window 秒數] [--rate 每分鐘登入次數]
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import multiprocessing.util
+from config import Config
+from accounts import AccountsError, account_name, apply_account, load_accounts
+from attendance_store import FAILED, LOGIN_FAILED
+
+VALID_ACTIONS = ["上班", "午休下班", "午休上班", "下班"]
+FAILED_OUTCOMES = (FAILED, LOGIN_FAILED)
+
+
+# 工作行程結束時要關閉的資源 (模組, 全域實例, 方法)；通知摘要會寄信，所以要在郵件佇列之前關閉
+WORKER_RESOURCES = [
+    ("driver_pool", "_pool", "shutdown"),
+    ("notification_digest", "_digest", "close"),
+    ("mail_queue", "_mail_queue", "close"),
+    ("attendance_store", "_store", "close"),
+]
+
+
+def _close_worker_resources():
+    """關閉工作行程中建立的瀏覽器，送完通知與郵件並寫完資料庫"""
+    for module_name, attr, method in WORKER_RESOURCES:
+        # 只處理已載入且已建立的實例，不為了關閉而匯入模組
+        resource = getattr(sys.modules.get(module_name), attr, None)
+        if resource is None:
+            continue
+        try:
+            getattr(resource, method)()
+        except Exception as e:
+            print(f"⚠️ 工作行程關閉 {module_name} 失敗: {e}")
+
+
+def _init_worker():
+    # multiprocessing 的子行程結束時不會執行 atexit，改由 Finalize 明確關閉本行程建立的資源
+    multiprocessing.util.Finalize(None, _close_worker_resources, exitpriority=0)
+
+
+def checkin_runner(label, source):
+    """預設的打卡函式：使用 main.run_checkin"""
+    from main import run_checkin
+    return run_checkin(label, source=source)
+
+
+def run_account(account, label, source, runner=checkin_runner):
+    """在工作行程中切換到指定帳號並打卡，回傳可序列化的結果"""
+    apply_account(account)
+    started = time.perf_counter()
+    result = {"account": account_name(account), "username": account["username"], "label": label}
+    try:
+        result["outcome"] = runner(label, source)
+    except Exception as e:
+        result["outcome"] = FAILED
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def summarize(results, elapsed):
+    """統計各結果的數量、耗時與吞吐量"""
+    counts = {}
+    for result in results:
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    durations = [r["seconds"] for r in results if r.get("seconds") is not None]
+    return {
+        "accounts": len(results),
+        "outcomes": counts,
+        "elapsed": elapsed,
+        "per_minute": len(results) / elapsed * 60 if elapsed > 0 else 0.0,
+        "median_seconds": statistics.median(durations) if durations else 0.0,
+        "max_seconds": max(durations) if durations else 0.0,
+    }
+
+
+def print_report(results, elapsed):
+    """顯示每個帳號的結果與吞吐量"""
+    print(f"\n{'帳號':<20} {'結果':<10} {'耗時 (秒)':>10}  訊息")
+    for result in sorted(results, key=lambda r: r["account"]):
+        seconds = "-" if result.get("seconds") is None else f"{result['seconds']:.1f}"
+        print(f"{result['account']:<20} {result['outcome']:<10} {seconds:>10}  {result.get('error', '')}")
+
+    summary = summarize(results, elapsed)
+    outcomes = ", ".join(f"{outcome} {count}" for outcome, count in sorted(summary["outcomes"].items()))
+    print(f"\n📊 {summary['accounts']} 個帳號: {outcomes or '-'}")
+    print(f"⏱️ 總耗時 {elapsed:.1f} 秒，{summary['per_minute']:.1f} 帳號/分鐘，"
+          f"單一帳號中位數 {summary['median_seconds']:.1f} 秒、最長 {summary['max_seconds']:.1f} 秒")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多帳號批次打卡")
+    parser.add_argument("action", choices=VALID_ACTIONS, help="打卡動作")
+    parser.add_argument("--accounts", help=f"帳號清單檔案，預設 {Config.ACCOUNTS_FILE}")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_WORKERS, help="同時執行的行程數")
+    parser.add_argument("--output", help="將每個帳號的結果輸出為 JSON lines 檔案")
+    parser.add_argument("--window", type=float, default=Config.DISPATCH_WINDOW,
+                        help="各帳號隨機分散開始的時間窗秒數")
+    parser.add_argument("--rate", type=float, default=Config.DISPATCH_LOGIN_RATE,
+                        help="每分鐘最多登入次數，0 表示不限速")
+    args = parser.parse_args(argv)
+
+    try:
+        accounts = load_accounts(args.accounts)
+    except AccountsError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if not accounts:
+        print("❌ 帳號清單中沒有啟用的帳號", file=sys.stderr)
+        return 1
+
+    from dispatcher import Dispatcher
+
+    print(f"👥 {len(accounts)} 個帳號，使用 {min(args.workers, len(accounts))} 個行程執行 {args.action} 打卡"
+          f"（{args.window:.0f} 秒內分散開始，每分鐘最多登入 {args.rate:g} 次）...")
+    dispatcher = Dispatcher(rate_per_minute=args.rate, window=args.window, workers=args.workers)
+    results, elapsed = dispatcher.run(
+        accounts, args.action,
+        on_result=lambda r: print(f"   {'❌' if r['outcome'] in FAILED_OUTCOMES else '✅'} {r['account']}: {r['outcome']}"),
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    summary = print_report(results, elapsed)
+    return 2 if any(outcome in summary["outcomes"] for outcome in FAILED_OUTCOMES) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+瀏覽器設定效能比較
+比較 standard 與 lean 兩種 Chrome 設定的啟動時間、頁面就緒時間與記憶體用量 (RSS)
+
+用法:
+    python bench_browser_profile.py [--url 網址] [--selector CSS 選擇器] [--runs 次數]
+
+預設開啟 LOGIN_URL 並等待登入表單的帳號欄位出現；RSS 為 ChromeDriver 與所有 Chrome 子行程的總和（需要 Linux /proc）。
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from selenium.webdriver.common.by import By
+from config import Config
+from readiness import Readiness
+from web_automation import WebAutomation
+
+PROFILES = ["standard", "lean"]
+
+
+def process_tree_rss(pid):
+    """回傳行程及其所有子行程的 RSS 總和 (bytes)；無法讀取 /proc 時回傳 None"""
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                # 行程名稱可能含空白，取最後一個 ')' 之後的欄位
+                fields = f.read().rsplit(b")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+        stack.extend(children.get(current, []))
+    return total
+
+
+def measure(profile, url, selector):
+    """啟動一次瀏覽器並載入頁面，回傳 (啟動秒數, 頁面就緒秒數, RSS bytes)"""
+    automation = WebAutomation()
+    try:
+        started = time.perf_counter()
+        automation.setup_driver(profile)
+        launched = time.perf_counter()
+        automation.driver.get(url)
+        Readiness(automation.driver).element(By.CSS_SELECTOR, selector)
+        ready = time.perf_counter()
+        rss = process_tree_rss(automation.driver.service.process.pid)
+        return launched - started, ready - launched, rss
+    finally:
+        automation.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比較 standard 與 lean 瀏覽器設定")
+    parser.add_argument("--url", default=Config.LOGIN_URL, help="要載入的頁面，預設 LOGIN_URL")
+    parser.add_argument("--selector", default="#__BVID__6", help="頁面就緒時會出現的元素 (CSS)")
+    parser.add_argument("--runs", type=int, default=5, help="每種設定的重複次數")
+    args = parser.parse_args(argv)
+    if not args.url:
+        print("❌ 請設定 LOGIN_URL 或指定 --url", file=sys.stderr)
+        return 1
+
+    print(f"⏱️ 每種設定啟動 {args.runs} 次，載入 {args.url}，取中位數\n")
+    results = {}
+    for profile in PROFILES:
+        samples = [measure(profile, args.url, args.selector) for _ in range(args.runs)]
+        startup = statistics.median(s[0] for s in samples)
+        ready = statistics.median(s[1] for s in samples)
+        rss = [s[2] for s in samples if s[2] is not None]
+        results[profile] = (startup, ready, statistics.median(rss) if rss else None)
+
+    print(f"{'設定':<10} {'啟動 (ms)':>10} {'頁面就緒 (ms)':>14} {'RSS (MB)':>10}")
+    for profile, (startup, ready, rss) in results.items():
+        rss_text = "-" if rss is None else f"{rss / 1024 / 1024:.0f}"
+        print(f"{profile:<10} {startup * 1000:>10.0f} {ready * 1000:>14.0f} {rss_text:>10}")
+
+    standard, lean = results["standard"], results["lean"]
+    print(f"\n📊 頁面就緒加速 {standard[1] / lean[1]:.2f}x", end="")
+    if standard[2] and lean[2]:
+        print(f"，記憶體減少 {(1 - lean[2] / standard[2]) * 100:.0f}%")
+    else:
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+冷啟動匯入時間比較
+在全新的 Python 行程中匯入各模組，比較匯入時間以及是否載入了 Selenium
+
+用法:
+    python bench_import_time.py [每個模組的重複次數]
+"""
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+# 不需要瀏覽器的 CLI 路徑（email、hours --cached、check）使用的模組
+BROWSERLESS_MODULES = ["config", "email_service", "hours_report", "attendance_store", "main"]
+# 需要瀏覽器的模組，作為對照
+BROWSER_MODULES = ["web_automation"]
+
+HEAVY_PREFIXES = ("selenium", "webdriver_manager")
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split(".")[0] for name in sys.modules if name.startswith({prefixes!r})}})
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure_import(module, runs=5):
+    """在新的行程中匯入 module runs 次，回傳 (中位數秒數, 載入的重量級套件)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    heavy = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, prefixes=HEAVY_PREFIXES)],
+            cwd=here, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        heavy = result["heavy"]
+    return statistics.median(samples), heavy
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"⏱️ 每個模組在新行程中匯入 {runs} 次，取中位數\n")
+    print(f"{'模組':<20} {'匯入時間 (ms)':>14}  載入的重量級套件")
+
+    for module in BROWSERLESS_MODULES + BROWSER_MODULES:
+        seconds, heavy = measure_import(module, runs)
+        print(f"{module:<20} {seconds * 1000:>14.1f}  {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+時區行分類器效能比較
+比較舊版（每行重建關鍵字清單並逐一比對）與預先編譯的單一正則表達式的每行成本
+
+用法:
+    python bench_timezone_classifier.py [每種輸入的重複次數]
+"""
+import re
+import sys
+import timeit
+from attendance_parser import TIMEZONE_ROW_RE
+
+SAMPLE_ROWS = [
+    "Check in: 08:50\nCheck out: 12:01\nSubtotal: 03:11",
+    "Check in: 13:01\nCheck out:\nSubtotal:",
+    "Eastern Time Zone UTC-5 21:50",
+    "Taiwan 09:50 East Asia Time Zone",
+    "Subtotal: 8:00 Total: 8:00",
+]
+
+
+def legacy_is_timezone_row(row_text):
+    """重構前 get_today_attendance_records 內的時區判斷邏輯"""
+    timezone_keywords = [
+        'Eastern Time Zone', 'Central Time Zone', 'Mountain Time Zone',
+        'Pacific Time Zone', 'East Asia Time Zone', 'India Standard Time',
+        'Greenwich Mean Time', 'Coordinated Universal Time',
+        'EST', 'CST', 'MST', 'PST', 'EDT', 'CDT', 'MDT', 'PDT',
+        'GMT', 'UTC', 'JST', 'KST', 'CST', 'IST',
+        'UTC+', 'UTC-', 'GMT+', 'GMT-',
+        'Ann Arbor', 'Pittsburgh', 'Durham', 'Chicago', 'Texas', 'Colorado',
+        'Washington', 'California', 'Taiwan', 'Singapore', 'Malaysia',
+        'New York', 'Los Angeles', 'Seattle', 'Boston', 'Miami',
+        'Asia/', 'America/', 'Europe/', 'Africa/', 'Australia/',
+        'Time Zone', 'Timezone', 'TZ', 'Offset'
+    ]
+    is_timezone_row = any(keyword in row_text for keyword in timezone_keywords)
+    timezone_patterns = [
+        r'UTC[+-]\d+',
+        r'GMT[+-]\d+',
+        r'\b(EST|CST|MST|PST|EDT|CDT|MDT|PDT|GMT|UTC|JST|KST|IST)\b',
+        r'[A-Z][a-z]+ Time Zone',
+        r'Asia/[A-Za-z_]+',
+        r'America/[A-Za-z_]+',
+    ]
+    has_timezone_pattern = any(re.search(pattern, row_text, re.IGNORECASE) for pattern in timezone_patterns)
+    return is_timezone_row or has_timezone_pattern
+
+
+def compiled_is_timezone_row(row_text):
+    """預先編譯的單一正則表達式"""
+    return TIMEZONE_ROW_RE.search(row_text) is not None
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"⏱️ 每種輸入重複 {number} 次\n")
+    print(f"{'輸入':<40} {'舊版 (µs/行)':>14} {'編譯版 (µs/行)':>16} {'加速':>8}")
+
+    for row in SAMPLE_ROWS:
+        assert legacy_is_timezone_row(row) == compiled_is_timezone_row(row)
+        legacy = timeit.timeit(lambda: legacy_is_timezone_row(row), number=number) / number * 1e6
+        compiled = timeit.timeit(lambda: compiled_is_timezone_row(row), number=number) / number * 1e6
+        label = row.replace("\n", " ")[:38]
+        print(f"{label:<40} {legacy:>14.2f} {compiled:>16.2f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
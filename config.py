@@ -28,12 +28,95 @@ class Config:
     SMTP_PASS = os.getenv("SMTP_PASS")
     EMAIL_TO = os.getenv("EMAIL_TO")
     
+    # 寄信佇列設定：重試次數、指數退避起始與上限秒數、連線閒置關閉秒數、程式結束前等待寄出的秒數
+    EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", 3))
+    EMAIL_RETRY_BACKOFF_BASE = float(os.getenv("EMAIL_RETRY_BACKOFF_BASE", 2))
+    EMAIL_RETRY_BACKOFF_MAX = float(os.getenv("EMAIL_RETRY_BACKOFF_MAX", 60))
+    SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 60))
+    EMAIL_FLUSH_TIMEOUT = float(os.getenv("EMAIL_FLUSH_TIMEOUT", 30))
+
+    # 通知摘要：啟用後成功通知累積 NOTIFY_DIGEST_WINDOW 秒合併成一封，失敗通知仍立即寄出
+    NOTIFY_DIGEST_ENABLED = os.getenv("NOTIFY_DIGEST_ENABLED", "false").lower() == "true"
+    NOTIFY_DIGEST_WINDOW = float(os.getenv("NOTIFY_DIGEST_WINDOW", 3600))
+
+    # 驅動池設定
+    DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", 1))
+    DRIVER_POOL_IDLE_TIMEOUT = int(os.getenv("DRIVER_POOL_IDLE_TIMEOUT", 900))
+    DRIVER_CACHE_DIR = os.getenv("DRIVER_CACHE_DIR", "~/.cache/auto_checkin")
+
+    # 瀏覽器設定: standard 或 lean (擋掉圖片/字型/分析追蹤、eager 載入)，以 bench_browser_profile.py 確認效果後再切換
+    BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "standard").lower()
+
+    # 登入狀態保存設定
+    SESSION_PERSISTENCE_ENABLED = os.getenv("SESSION_PERSISTENCE_ENABLED", "true").lower() == "true"
+    SESSION_STORE_DIR = os.getenv("SESSION_STORE_DIR", "~/.cache/auto_checkin/sessions")
+    SESSION_SECRET = os.getenv("SESSION_SECRET")
+    SESSION_MAX_AGE = int(os.getenv("SESSION_MAX_AGE", 12 * 3600))
+    SESSION_PROBE_TIMEOUT = float(os.getenv("SESSION_PROBE_TIMEOUT", 5))
+
+    # 頁面就緒偵測設定
+    READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", 15))
+    READY_POLL_INTERVAL = float(os.getenv("READY_POLL_INTERVAL", 0.1))
+    LOGIN_SETTLE_TIME = float(os.getenv("LOGIN_SETTLE_TIME", 1.5))
+    LOGIN_RETRY_BACKOFF_BASE = float(os.getenv("LOGIN_RETRY_BACKOFF_BASE", 1))
+    LOGIN_RETRY_BACKOFF_MAX = float(os.getenv("LOGIN_RETRY_BACKOFF_MAX", 16))
+
+    # 打卡記錄解析模式: snapshot (單次取回整頁資料) 或 live (逐一讀取元素)
+    PARSER_MODE = os.getenv("PARSER_MODE", "snapshot").lower()
+
+    # 打卡狀態快取設定（秒）：TTL 內直接回傳，過期後在 MAX_STALE 內先回傳舊資料並背景更新
+    STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", 60))
+    STATUS_CACHE_MAX_STALE = float(os.getenv("STATUS_CACHE_MAX_STALE", 600))
+
+    # 事件推送 (Server-Sent Events) 心跳秒數
+    SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", 15))
+
+    # 背景工作設定：執行緒數量與完成後保留結果的秒數
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+    JOB_RETENTION = int(os.getenv("JOB_RETENTION", 3600))
+
+    # 打卡資料庫 (SQLite) 位置
+    ATTENDANCE_DB = os.getenv("ATTENDANCE_DB", "~/.cache/auto_checkin/attendance.db")
+
+    # 本地排程檢查 schedule_config.json 是否變更的間隔秒數
+    SCHEDULE_WATCH_INTERVAL = float(os.getenv("SCHEDULE_WATCH_INTERVAL", 5))
+
+    # 多帳號批次打卡：帳號清單檔案與同時執行的行程數（每個行程一個 Chrome）
+    ACCOUNTS_FILE = os.getenv("ACCOUNTS_FILE", "accounts.json")
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
+
+    # 批次打卡調度：每分鐘最多登入次數（0 表示不限速）、可連續登入的次數、
+    # 登入失敗時最低降到的每分鐘登入次數、各帳號隨機分散開始的時間窗秒數
+    DISPATCH_LOGIN_RATE = float(os.getenv("DISPATCH_LOGIN_RATE", 20))
+    DISPATCH_BURST = int(os.getenv("DISPATCH_BURST", 3))
+    DISPATCH_MIN_LOGIN_RATE = float(os.getenv("DISPATCH_MIN_LOGIN_RATE", 2))
+    DISPATCH_WINDOW = float(os.getenv("DISPATCH_WINDOW", 120))
+
+    # 打卡方式: selenium (瀏覽器) 或 http (直接呼叫網站 API，失敗時改用瀏覽器)
+    PUNCH_BACKEND = os.getenv("PUNCH_BACKEND", "selenium").lower()
+    # HTTP 打卡使用的 API，路徑相對於 HTTP_API_BASE（預設為 LOGIN_URL）
+    # 網站沒有公開 API 文件，路徑沒有預設值，未設定時一律改用瀏覽器打卡
+    HTTP_API_BASE = os.getenv("HTTP_API_BASE")
+    HTTP_LOGIN_PATH = os.getenv("HTTP_LOGIN_PATH")
+    HTTP_RECORDS_PATH = os.getenv("HTTP_RECORDS_PATH")
+    HTTP_PUNCH_PATH = os.getenv("HTTP_PUNCH_PATH")
+    HTTP_TOKEN_FIELD = os.getenv("HTTP_TOKEN_FIELD", "token")
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 4))
+
+    # 每次打卡各階段耗時的記錄檔 (JSON lines)，設為空字串則不記錄
+    TIMING_LOG_FILE = os.getenv("TIMING_LOG_FILE", "~/.cache/auto_checkin/timing.jsonl")
+
+    # 延後打卡工作（等待滿 8 小時的下班打卡）保存位置
+    DEFERRED_JOBS_FILE = os.getenv("DEFERRED_JOBS_FILE", "~/.cache/auto_checkin/deferred_jobs.json")
+
     # 請假日設定
     SKIP_DATES = set()
     
     @classmethod
     def load_skip_dates(cls):
-        """載入請假日設定"""
+        """載入請假日設定（重新載入時會先清除舊的設定）"""
+        cls.SKIP_DATES.clear()
         skip_dates_str = os.getenv("SKIP_DATES", "")
         if skip_dates_str:
             for d in skip_dates_str.split(","):
@@ -43,18 +126,18 @@ class Config:
                     print(f"⚠️ 無效日期格式: {d.strip()}，應為 YYYY-MM-DD")
     
     @classmethod
-    def is_skip_today(cls):
-        """檢查今天是否為請假日"""
-        today = datetime.date.today()
+    def is_skip_today(cls, today=None):
+        """檢查今天（或指定日期）是否為請假日"""
+        today = today or datetime.date.today()
         if today in cls.SKIP_DATES:
             print(f"⏸ 今天 {today} 在 SKIP_DATES，跳過自動打卡")
             return True
         return False
     
     @classmethod
-    def is_workday(cls):
-        """檢查今天是否為工作日"""
-        today = datetime.date.today()
+    def is_workday(cls, today=None):
+        """檢查今天（或指定日期）是否為工作日"""
+        today = today or datetime.date.today()
         return today.weekday() in cls.WORK_DAYS
     
     @classmethod
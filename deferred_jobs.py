@@ -0,0 +1,98 @@
+"""
+延後打卡工作模組
+將「滿 8 小時後再下班打卡」這類延後工作存到磁碟，等待期間不需要保留瀏覽器，
+程式重新啟動後也能接續執行
+"""
+import os
+import json
+import uuid
+import datetime
+import threading
+from config import Config
+from work_hours import current_time
+
+AUTO_CHECKOUT_SOURCE = "自動下班偵測"
+UNDER_HOURS_SOURCE = "工時不足延後"
+
+
+class DeferredJobStore:
+    """延後打卡工作的 JSON 儲存類別"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path or Config.DEFERRED_JOBS_FILE)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("jobs", [])
+        except (OSError, ValueError, AttributeError):
+            return []
+
+    def _save(self, jobs):
+        """以先寫暫存檔再改名的方式儲存"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"jobs": jobs}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def fire_time(job):
+        """工作的執行時間"""
+        return datetime.datetime.fromisoformat(job["fire_at"])
+
+    def add(self, fire_at, label, source):
+        """新增延後工作；同一來源與動作的舊工作會被取代"""
+        job = {
+            "id": uuid.uuid4().hex,
+            "label": label,
+            "source": source,
+            "fire_at": fire_at.isoformat(timespec="seconds"),
+            "created_at": current_time().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            jobs = [j for j in self._load() if (j.get("label"), j.get("source")) != (label, source)]
+            jobs.append(job)
+            self._save(jobs)
+        return job
+
+    def pending(self, source=None, now=None):
+        """回傳今天尚未完成的工作（依時間排序），前幾天遺留的工作會被清除"""
+        today = (now or current_time()).date()
+        with self._lock:
+            jobs = self._load()
+            valid = []
+            for job in jobs:
+                try:
+                    if self.fire_time(job).date() >= today:
+                        valid.append(job)
+                except (KeyError, TypeError, ValueError):
+                    continue
+            if len(valid) != len(jobs):
+                self._save(valid)
+        if source:
+            valid = [job for job in valid if job.get("source") == source]
+        return sorted(valid, key=self.fire_time)
+
+    def remove(self, job_id):
+        """移除已完成的工作"""
+        with self._lock:
+            jobs = self._load()
+            remaining = [job for job in jobs if job.get("id") != job_id]
+            if len(remaining) != len(jobs):
+                self._save(remaining)
+
+    def remove_due(self, label, now=None, exclude_source=None):
+        """移除指定動作中已到期的工作；exclude_source 來源的工作保留給負責的行程處理"""
+        now = now or current_time()
+        with self._lock:
+            jobs = self._load()
+            remaining = [
+                job for job in jobs
+                if job.get("label") != label or self.fire_time(job) > now
+                or (exclude_source and job.get("source") == exclude_source)
+            ]
+            if len(remaining) != len(jobs):
+                self._save(remaining)
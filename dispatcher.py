@@ -0,0 +1,162 @@
+"""
+批次打卡調度模組
+在允許的時間窗內為每個帳號加上隨機延遲，以令牌桶限制登入速率，登入失敗時自動放慢
+"""
+import time
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from accounts import account_name
+from attendance_store import FAILED, LOGIN_FAILED
+from batch_checkin import _init_worker, checkin_runner, run_account
+
+
+class TokenBucket:
+    """令牌桶：平均每秒 rate 個令牌，最多累積 capacity 個"""
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self._rate = rate
+        self.capacity = max(1, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @rate.setter
+    def rate(self, value):
+        with self._lock:
+            self._refill_locked()
+            self._rate = value
+
+    def acquire(self):
+        """取得一個令牌，必要時等待；回傳等待的秒數"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill_locked()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                # 速率可能在等待期間被調整，每次最多睡一秒後重新計算
+                delay = min(1.0, (1 - self._tokens) / self._rate) if self._rate > 0 else 1.0
+            self._sleep(delay)
+            waited += delay
+
+
+class AdaptiveRate:
+    """登入失敗時速率減半，成功時逐步恢復到上限（加性增加、乘性減少）"""
+
+    def __init__(self, max_rate, min_rate, increase=None, decrease=0.5):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.increase = max_rate / 10 if increase is None else increase
+        self.decrease = decrease
+        self.rate = max_rate
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+        return self.rate
+
+    def on_failure(self):
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        return self.rate
+
+
+def jitter_schedule(accounts, window, rng=None):
+    """為每個帳號在 [0, window) 秒內隨機挑一個開始時間，依時間排序回傳 [(延遲秒數, 帳號), ...]"""
+    rng = rng or random.Random()
+    return sorted(((rng.uniform(0, window) if window > 0 else 0.0, account) for account in accounts),
+                  key=lambda item: item[0])
+
+
+class Dispatcher:
+    """限速的多帳號打卡調度器
+
+    每個帳號在時間窗內的隨機時間點開始，開始前須從令牌桶取得登入名額；
+    工作行程回報登入失敗時降低令牌桶速率，成功時逐步恢復。
+    """
+
+    def __init__(self, rate_per_minute=None, burst=None, window=None, min_rate_per_minute=None,
+                 workers=None, runner=checkin_runner, rng=None, clock=time.monotonic, sleep=time.sleep):
+        rate_per_minute = Config.DISPATCH_LOGIN_RATE if rate_per_minute is None else rate_per_minute
+        min_rate_per_minute = Config.DISPATCH_MIN_LOGIN_RATE if min_rate_per_minute is None else min_rate_per_minute
+        self.window = Config.DISPATCH_WINDOW if window is None else window
+        self.workers = workers or Config.BATCH_WORKERS
+        self.runner = runner
+        self.rng = rng
+        self._clock = clock
+        self._sleep = sleep
+        self.adaptive = AdaptiveRate(rate_per_minute / 60, min_rate_per_minute / 60)
+        # 速率設為 0 時不限速
+        self.bucket = None
+        if rate_per_minute > 0:
+            self.bucket = TokenBucket(self.adaptive.rate, Config.DISPATCH_BURST if burst is None else burst,
+                                      clock=clock, sleep=sleep)
+        self._lock = threading.Lock()
+
+    def _on_result(self, result):
+        """依工作結果調整登入速率"""
+        if self.bucket is None:
+            return
+        with self._lock:
+            before = self.adaptive.rate
+            if result["outcome"] == LOGIN_FAILED:
+                rate = self.adaptive.on_failure()
+                if rate < before:
+                    print(f"🐢 登入失敗，放慢登入速率至每分鐘 {rate * 60:.1f} 次")
+            elif result["outcome"] != FAILED:
+                rate = self.adaptive.on_success()
+            else:
+                return
+            self.bucket.rate = rate
+
+    def _wait_until(self, target):
+        while True:
+            remaining = target - self._clock()
+            if remaining <= 0:
+                return
+            self._sleep(min(remaining, 1.0))
+
+    def run(self, accounts, label, source="批次打卡", on_result=None):
+        """依調度為所有帳號打卡，回傳 (結果列表, 總耗時秒數)"""
+        schedule = jitter_schedule(accounts, self.window, self.rng)
+        workers = max(1, min(self.workers, len(accounts) or 1))
+        started = self._clock()
+        results = []
+        results_lock = threading.Lock()
+        # 只在有空閒的工作行程時才送出，取得令牌的時間就是實際登入的時間
+        slots = threading.BoundedSemaphore(workers)
+
+        def collect(account, future):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"account": account_name(account), "username": account["username"],
+                          "label": label, "outcome": FAILED, "error": str(e), "seconds": None}
+            self._on_result(result)
+            with results_lock:
+                results.append(result)
+            slots.release()
+            if on_result:
+                on_result(result)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            for offset, account in schedule:
+                self._wait_until(started + offset)
+                slots.acquire()
+                if self.bucket is not None:
+                    self.bucket.acquire()
+                future = executor.submit(run_account, account, label, source, self.runner)
+                future.add_done_callback(lambda f, account=account: collect(account, f))
+        return results, self._clock() - started
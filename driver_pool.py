@@ -0,0 +1,268 @@
+"""
+瀏覽器驅動池模組
+維護一組已登入的 Chrome 實例，讓打卡與查詢狀態重複使用同一個瀏覽器
+"""
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException
+from config import Config
+from readiness import Readiness
+from web_automation import WebAutomation
+
+
+class DriverPoolError(Exception):
+    """驅動池無法提供可用的瀏覽器"""
+
+
+class LoginFailedError(DriverPoolError):
+    """新啟動的瀏覽器無法登入"""
+
+
+class PooledDriver:
+    """池中的單一瀏覽器實例"""
+
+    def __init__(self, automation, account=None):
+        self.automation = automation
+        self.account = account
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class DriverPool:
+    """已登入 Chrome 實例的驅動池
+
+    checkout() 取出一個已登入並重新整理過頁面的 WebAutomation，
+    使用完畢後以 checkin() 歸還；閒置超過 idle_timeout 秒的實例會被關閉。
+    """
+
+    def __init__(self, size=None, idle_timeout=None, factory=None):
+        self.size = max(1, size or Config.DRIVER_POOL_SIZE)
+        self.idle_timeout = Config.DRIVER_POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self._factory = factory or WebAutomation
+        self._idle = []
+        self._total = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+
+    def _launch(self):
+        """啟動並登入一個新的瀏覽器"""
+        automation = self._factory()
+        try:
+            automation.setup_driver()
+            if not automation.login():
+                raise LoginFailedError("登入失敗")
+        except Exception:
+            automation.quit()
+            raise
+        print("🚗 驅動池: 已啟動新的瀏覽器實例")
+        return PooledDriver(automation, account=Config.USERNAME)
+
+    @staticmethod
+    def is_healthy(entry):
+        """檢查瀏覽器是否仍可回應"""
+        driver = entry.automation.driver
+        if driver is None:
+            return False
+        try:
+            driver.current_url
+            return bool(driver.window_handles)
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _refresh(entry):
+        """重新整理頁面，若登入已失效或帳號已切換則重新登入"""
+        automation = entry.automation
+        if entry.account != Config.USERNAME:
+            # 批次打卡時同一個瀏覽器會依序登入不同帳號
+            print("👤 驅動池: 切換帳號，重新登入...")
+            automation.reset_session()
+            if not automation.login():
+                # 直接回報登入失敗，不再另開瀏覽器重登，避免繞過批次打卡的登入限速
+                entry.account = None
+                raise LoginFailedError(f"帳號 {Config.USERNAME} 登入失敗")
+            entry.account = Config.USERNAME
+            return True
+        automation.driver.refresh()
+        if Readiness(automation.driver).check_button(timeout=Config.SESSION_PROBE_TIMEOUT):
+            return True
+        print("🔐 驅動池: 登入狀態失效，重新登入...")
+        return automation.login()
+
+    def _discard(self, entry):
+        """關閉瀏覽器並釋放名額（呼叫端需持有鎖）"""
+        try:
+            entry.automation.quit()
+        except Exception as e:
+            print(f"⚠️ 驅動池: 關閉瀏覽器失敗: {e}")
+        self._total -= 1
+        self._cond.notify()
+
+    def warm_up(self, count=None):
+        """預先啟動瀏覽器直到達到指定數量"""
+        target = min(self.size, count or self.size)
+        while True:
+            with self._cond:
+                if self._closed or self._total >= target:
+                    break
+                self._total += 1
+            try:
+                entry = self._launch()
+            except Exception as e:
+                with self._cond:
+                    self._total -= 1
+                print(f"❌ 驅動池預熱失敗: {e}")
+                break
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+        self._start_reaper()
+
+    def checkout(self, timeout=None):
+        """取出一個可用的 WebAutomation"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            entry = None
+            with self._cond:
+                if self._closed:
+                    raise DriverPoolError("驅動池已關閉")
+                self._evict_idle_locked()
+                if self._idle:
+                    entry = self._idle.pop()
+                elif self._total < self.size:
+                    self._total += 1
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise DriverPoolError("等待可用瀏覽器逾時")
+                    self._cond.wait(remaining)
+                    continue
+
+            if entry is None:
+                try:
+                    entry = self._launch()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                try:
+                    usable = self.is_healthy(entry) and self._safe_refresh(entry)
+                except LoginFailedError:
+                    # 瀏覽器本身正常，歸還給驅動池讓下一個帳號使用
+                    self.checkin(entry)
+                    raise
+                if not usable:
+                    print("♻️ 驅動池: 瀏覽器健康檢查失敗，替換實例")
+                    with self._cond:
+                        self._discard(entry)
+                    continue
+
+            entry.uses += 1
+            self._start_reaper()
+            return entry
+
+    def _safe_refresh(self, entry):
+        try:
+            return self._refresh(entry)
+        except WebDriverException as e:
+            print(f"⚠️ 驅動池: 重新整理失敗: {e}")
+            return False
+
+    def checkin(self, entry, healthy=True):
+        """歸還瀏覽器；不健康的實例會直接關閉"""
+        if healthy:
+            self._drain_logs(entry)
+        with self._cond:
+            entry.last_used = time.monotonic()
+            if self._closed or not healthy or not self.is_healthy(entry):
+                self._discard(entry)
+                return
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @staticmethod
+    def _drain_logs(entry):
+        """清空累積的 performance log，避免常駐瀏覽器的記錄無限增長"""
+        try:
+            entry.automation.driver.get_log("performance")
+        except (AttributeError, WebDriverException):
+            pass
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """以 with 區塊借用已登入的 WebAutomation"""
+        entry = self.checkout(timeout)
+        healthy = True
+        try:
+            yield entry.automation
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self.checkin(entry, healthy=healthy)
+
+    def _evict_idle_locked(self):
+        if self.idle_timeout <= 0:
+            return
+        now = time.monotonic()
+        keep = []
+        for entry in self._idle:
+            if now - entry.last_used > self.idle_timeout:
+                print("🧹 驅動池: 關閉閒置的瀏覽器實例")
+                self._discard(entry)
+            else:
+                keep.append(entry)
+        self._idle = keep
+
+    def evict_idle(self):
+        """關閉閒置過久的瀏覽器"""
+        with self._cond:
+            self._evict_idle_locked()
+
+    def _start_reaper(self):
+        if self.idle_timeout <= 0 or (self._reaper and self._reaper.is_alive()):
+            return
+        interval = max(1, min(60, self.idle_timeout / 2))
+
+        def reap():
+            while not self._reaper_stop.wait(interval):
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=reap, name="driver-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def stats(self):
+        """回傳驅動池目前狀態"""
+        with self._cond:
+            return {"size": self.size, "total": self._total, "idle": len(self._idle)}
+
+    def shutdown(self):
+        """關閉所有瀏覽器"""
+        self._reaper_stop.set()
+        with self._cond:
+            self._closed = True
+            for entry in self._idle:
+                self._discard(entry)
+            self._idle = []
+            self._cond.notify_all()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """取得全域共用的驅動池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.shutdown)
+        return _pool
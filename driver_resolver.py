@@ -0,0 +1,141 @@
+"""
+ChromeDriver 解析模組
+以本機 manifest 快取 ChromeDriver 路徑，Chrome 未更新時不需再做版本查詢
+"""
+import os
+import re
+import json
+import time
+import shutil
+import subprocess
+from config import Config
+
+MANIFEST_NAME = "chromedriver_manifest.json"
+
+CHROME_CANDIDATES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+]
+
+
+class DriverResolver:
+    """ChromeDriver 路徑解析類別"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.expanduser(cache_dir or Config.DRIVER_CACHE_DIR)
+        self.manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+
+    @staticmethod
+    def find_chrome_binary():
+        """尋找本機安裝的 Chrome 執行檔"""
+        override = os.getenv("CHROME_BINARY")
+        if override and os.path.exists(override):
+            return override
+        for candidate in CHROME_CANDIDATES:
+            path = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+            if path and os.path.exists(path):
+                return os.path.realpath(path)
+        return None
+
+    @staticmethod
+    def fingerprint(chrome_path):
+        """以執行檔的 mtime 與大小作為 Chrome 版本的指紋，不需啟動 Chrome"""
+        stat = os.stat(chrome_path)
+        return f"{chrome_path}:{int(stat.st_mtime)}:{stat.st_size}"
+
+    @staticmethod
+    def probe_chrome_version(chrome_path):
+        """執行 chrome --version 取得版本號"""
+        try:
+            output = subprocess.run(
+                [chrome_path, "--version"], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"⚠️ 無法取得 Chrome 版本: {e}")
+            return None
+        match = re.search(r"(\d+\.\d+\.\d+\.\d+)", output)
+        return match.group(1) if match else None
+
+    def load_manifest(self):
+        """讀取 manifest"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"entries": {}}
+
+    def save_manifest(self, manifest):
+        """以先寫暫存檔再改名的方式儲存 manifest"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _install():
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+
+    def resolve(self):
+        """回傳 ChromeDriver 路徑；無法取得時回傳 None 交給 Selenium Manager 處理"""
+        started = time.perf_counter()
+        manifest = self.load_manifest()
+        entries = manifest.setdefault("entries", {})
+
+        chrome_path = self.find_chrome_binary()
+        key = self.fingerprint(chrome_path) if chrome_path else None
+
+        # 快速路徑：Chrome 未變動且快取的 driver 仍存在
+        entry = entries.get(key) if key else None
+        if entry and os.path.exists(entry["driver_path"]):
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"⚡ 使用快取的 ChromeDriver {entry['chrome_version']} ({elapsed:.1f} ms)")
+            return entry["driver_path"]
+
+        # 慢速路徑：Chrome 有更新或第一次執行
+        chrome_version = self.probe_chrome_version(chrome_path) if chrome_path else None
+        try:
+            driver_path = self._install()
+        except Exception as e:
+            print(f"⚠️ 下載 ChromeDriver 失敗，改用離線快取: {e}")
+            return self._offline_fallback(entries, chrome_version)
+
+        if key:
+            entries[key] = {
+                "chrome_version": chrome_version,
+                "driver_path": driver_path,
+                "resolved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            try:
+                self.save_manifest(manifest)
+            except OSError as e:
+                print(f"⚠️ 無法寫入 ChromeDriver manifest: {e}")
+
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"📦 已解析 ChromeDriver {chrome_version} ({elapsed:.1f} ms)")
+        return driver_path
+
+    @staticmethod
+    def _offline_fallback(entries, chrome_version):
+        """離線時優先使用主版本相同的 driver，否則使用最近一次解析的 driver"""
+        candidates = [e for e in entries.values() if os.path.exists(e["driver_path"])]
+        if not candidates:
+            return None
+        if chrome_version:
+            major = chrome_version.split(".")[0]
+            same_major = [e for e in candidates if (e.get("chrome_version") or "").split(".")[0] == major]
+            if same_major:
+                candidates = same_major
+        candidates.sort(key=lambda e: e.get("resolved_at", ""))
+        return candidates[-1]["driver_path"]
+
+
+def resolve_chromedriver():
+    """取得 ChromeDriver 路徑"""
+    return DriverResolver().resolve()
@@ -4,18 +4,19 @@
 """
 import os
 import datetime
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from config import Config
+from mail_queue import get_mail_queue
+from notification_digest import get_notification_digest
 
 
 class EmailService:
     """郵件服務類別"""
 
     @staticmethod
-    def send_email(subject, body):
-        """發送郵件"""
+    def send_email(subject, body, wait=False):
+        """發送郵件（放入背景佇列，wait=True 時等待寄出結果）"""
         # 檢查環境變數
         if not all([Config.SMTP_SERVER, Config.SMTP_USER, Config.SMTP_PASS, Config.EMAIL_TO]):
             print("❌ 郵件配置不完整，跳過發送")
@@ -32,30 +33,12 @@ class EmailService:
         msg['Subject'] = subject
         msg.attach(MIMEText(body, 'plain'))
 
-        try:
-            print("🔌 連接到 SMTP 伺服器...")
-            server = smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT)
-            print("🔐 啟動 TLS 加密...")
-            server.starttls()
-            print("🔑 登入 SMTP 伺服器...")
-            server.login(Config.SMTP_USER, Config.SMTP_PASS)
-            print("📤 發送郵件...")
-            server.send_message(msg)
-            server.quit()
-            print(f"✅ 已寄出通知信: {subject}")
+        # 由背景佇列以重複使用的 SMTP 連線寄出，打卡流程不必等待郵件伺服器
+        job = get_mail_queue().send(msg)
+        if not wait:
             return True
-        except smtplib.SMTPAuthenticationError as e:
-            print(f"❌ SMTP 認證失敗: {e}")
-            print("💡 請檢查 SMTP_USER 和 SMTP_PASS 是否正確")
-        except smtplib.SMTPConnectError as e:
-            print(f"❌ SMTP 連線失敗: {e}")
-            print("💡 請檢查 SMTP_SERVER 和 SMTP_PORT 是否正確")
-        except smtplib.SMTPException as e:
-            print(f"❌ SMTP 錯誤: {e}")
-        except Exception as e:
-            print(f"❌ 寄信失敗: {e}")
-            print(f"   錯誤類型: {type(e).__name__}")
-        return False
+        job.done.wait()
+        return job.success
 
     @staticmethod
     def test_email():
@@ -114,17 +97,17 @@ class EmailService:
 自動打卡系統
         """
 
-        try:
-            EmailService.send_email(subject, body)
+        # 測試時等待實際寄出結果
+        if EmailService.send_email(subject, body, wait=True):
             print("✅ 測試寄信成功！")
             return True
-        except Exception as e:
-            print(f"❌ 測試寄信失敗: {e}")
-            return False
+        print("❌ 測試寄信失敗")
+        return False
 
     @staticmethod
-    def send_checkin_notification(result, label, work_hours=None, source=None, attendance_records=None):
-        """發送打卡通知郵件"""
+    def send_checkin_notification(result, label, work_hours=None, source=None, attendance_records=None,
+                                  urgent=False):
+        """發送打卡通知郵件（啟用摘要模式時，非緊急通知會合併寄出）"""
         # 在 GitHub Actions 環境中顯示台灣時間，本地環境顯示本地時間
         if os.getenv("GITHUB_ACTIONS"):
             # GitHub Actions 使用 UTC 時間，台灣時間 = UTC + 8
@@ -177,4 +160,7 @@ class EmailService:
 自動打卡系統
         """
 
-        EmailService.send_email(subject, body)
+        if urgent or not Config.NOTIFY_DIGEST_ENABLED:
+            EmailService.send_email(subject, body)
+        else:
+            get_notification_digest().add(subject, body)
@@ -0,0 +1,120 @@
+"""
+事件推送模組
+將打卡狀態變化、新的日誌與背景工作進度推送給所有以 Server-Sent Events 連線的頁面
+"""
+import os
+import json
+import queue
+import threading
+
+
+def format_sse(event, data):
+    """將事件轉成 text/event-stream 格式"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class Subscription:
+    """單一連線的事件佇列，連線太慢時丟棄最舊的事件"""
+
+    def __init__(self, maxsize=100):
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """取得下一個事件 (event, data)，逾時回傳 None"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """簡單的發布/訂閱事件匯流排"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        subscription = Subscription()
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event, data):
+        """推送事件給所有訂閱者"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put((event, data))
+
+
+class LogFollower:
+    """追蹤日誌檔新增的內容並以 log 事件推送（包含其他程式寫入的記錄）"""
+
+    def __init__(self, path, bus, interval=2.0):
+        self.path = path
+        self.bus = bus
+        self.interval = interval
+        self._offset = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        """啟動追蹤執行緒（重複呼叫不會啟動第二個）"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            self._thread = threading.Thread(target=self._run, name="log-follower", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self):
+        """讀取上次位置之後新增的行並推送，回傳新的行"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self._offset:
+            # 檔案被截斷或輪替，從頭開始
+            self._offset = 0
+        if size == self._offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # 只處理完整的行，未寫完的部分留到下次
+        end = chunk.rfind(b"\n") + 1
+        self._offset += end
+        lines = [line for line in chunk[:end].decode("utf-8", errors="replace").splitlines() if line.strip()]
+        for line in lines:
+            self.bus.publish("log", line)
+        return lines
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
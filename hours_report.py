@@ -0,0 +1,82 @@
+"""
+工時報告模組
+由打卡記錄計算並顯示今天的工時與滿 8 小時的下班時間，不需要瀏覽器
+"""
+import os
+from attendance_parser import AttendanceParser
+import work_hours
+from work_hours import current_time
+
+
+def print_work_segments(attendance_records, summary):
+    """逐筆顯示打卡記錄與各時段工時"""
+    for i, (record, segment) in enumerate(zip(attendance_records, summary.segments), 1):
+        check_in = record.get('check_in', 'N/A')
+        check_out = record.get('check_out', 'N/A')
+        print(f"  第 {i} 次:")
+        print(f"    Check in:  {check_in}")
+        print(f"    Check out: {check_out}")
+        if segment is not None:
+            minutes, in_progress = segment
+            print(f"    工時: {minutes / 60:.2f} 小時 ({'進行中' if in_progress else '已完成'})")
+
+
+def report_work_hours(attendance_records, now=None):
+    """顯示今天的工時，以及滿8小時工時需要什麼時候下班"""
+    print(f"📊 打卡記錄數量: {len(attendance_records)}")
+
+    if not attendance_records:
+        print("❌ 沒有找到今天的打卡記錄")
+        return
+
+    # 顯示所有打卡記錄
+    print("\n📝 今天的打卡記錄:")
+    now = now or current_time()
+    if os.getenv("GITHUB_ACTIONS"):
+        print(f"🕐 當前時間 (台灣時間): {now.strftime('%H:%M:%S')}")
+    else:
+        print(f"🕐 當前時間: {now.strftime('%H:%M:%S')}")
+
+    summary = work_hours.summarize(attendance_records, now)
+    print_work_segments(attendance_records, summary)
+    total_work_hours = summary.total_hours
+
+    print(f"\n📊 已完成工時: {summary.completed_hours:.2f} 小時")
+    print(f"📊 當前工時: {summary.current_hours:.2f} 小時")
+    print(f"📊 總工時: {total_work_hours:.2f} 小時")
+
+    # 檢查當前狀態
+    current_status = AttendanceParser.get_current_status(attendance_records)
+    print(f"📱 當前狀態: {current_status}")
+
+    if current_status == "checked_out":
+        print("✅ 今天已經下班了")
+        if total_work_hours >= 8:
+            print(f"🎉 恭喜！今天工時充足 ({total_work_hours:.2f} 小時)")
+        else:
+            print(f"⚠️ 今天工時不足 ({total_work_hours:.2f} 小時 < 8 小時)")
+        return
+
+    # 計算還需要多少工時
+    remaining_hours = summary.remaining_hours()
+    print(f"⏰ 還需要工時: {remaining_hours:.2f} 小時")
+
+    if remaining_hours <= 0:
+        print("🎉 已經滿8小時了！可以下班了！")
+        return
+
+    # 計算下班時間
+    if current_status == "checked_in":
+        # 從現在開始，還需要工作 remaining_hours 小時
+        checkout_time = summary.checkout_time(now)
+        print(f"⏰ 滿8小時的下班時間: {checkout_time.strftime('%H:%M')}")
+
+        # 計算還需要多少時間
+        time_remaining = checkout_time - now
+        if time_remaining.total_seconds() > 0:
+            remaining_minutes = int(time_remaining.total_seconds() / 60)
+            print(f"⏳ 還需要工作: {remaining_minutes} 分鐘")
+        else:
+            print("🎉 已經可以下班了！")
+    else:
+        print("ℹ️ 當前未在上班狀態，無法計算下班時間")
@@ -0,0 +1,208 @@
+"""
+HTTP 打卡模組
+以共用連線池的 requests.Session 直接呼叫打卡網站的登入、打卡記錄與打卡 API，不需要啟動瀏覽器
+
+API 路徑由環境變數設定（HTTP_LOGIN_PATH 等），需依照瀏覽器開發者工具中看到的實際請求填寫；
+無法以 HTTP 完成的情況會拋出 HttpBackendError，由呼叫端改用瀏覽器打卡。
+"""
+import threading
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+from attendance_parser import AttendanceParser
+from email_service import EmailService
+import attendance_store
+from attendance_store import get_attendance_store
+import work_hours
+from work_hours import current_time
+from timing import timed
+
+# 各打卡動作允許打卡的狀態（與 WebAutomation.punch_in 的判斷相同）
+PUNCH_STATUSES = {
+    "上班": ("not_checked_in",),
+    "午休下班": ("checked_in",),
+    "午休上班": ("checked_out", "not_checked_in"),
+    "下班": ("checked_in",),
+}
+
+
+class HttpBackendError(Exception):
+    """無法以 HTTP 完成打卡，應改用瀏覽器"""
+
+
+class PunchUncertainError(Exception):
+    """打卡請求可能已送達網站但結果不明，不能改用瀏覽器再打一次"""
+
+
+def new_session():
+    """建立有連線池與重試設定的 Session（重試只用於冪等的 GET）"""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Config.HTTP_POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HttpPunchClient:
+    """打卡網站的 HTTP 用戶端，登入後重複使用同一個連線"""
+
+    def __init__(self, session=None, base_url=None):
+        self.session = session or new_session()
+        self.base_url = base_url or Config.HTTP_API_BASE or Config.LOGIN_URL
+
+    def _url(self, path):
+        if not self.base_url:
+            raise HttpBackendError("未設定 HTTP_API_BASE 或 LOGIN_URL")
+        return urljoin(self.base_url, path)
+
+    @staticmethod
+    def _path(name):
+        """取得 API 路徑設定；未設定時不猜測路徑，交由瀏覽器打卡"""
+        path = getattr(Config, name)
+        if not path:
+            raise HttpBackendError(f"未設定 {name}")
+        return path
+
+    def _request(self, method, path, **kwargs):
+        try:
+            response = self.session.request(method, self._url(path), timeout=Config.HTTP_TIMEOUT, **kwargs)
+        except requests.RequestException as e:
+            raise HttpBackendError(f"{method} {path} 失敗: {e}")
+        if response.status_code in (401, 403):
+            raise HttpBackendError(f"{method} {path} 未授權 ({response.status_code})")
+        if response.status_code >= 400:
+            raise HttpBackendError(f"{method} {path} 回應 {response.status_code}")
+        return response
+
+    @staticmethod
+    def _json(response):
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    @timed("login")
+    def login(self):
+        """以目前 Config 的帳號登入；先清除上一個帳號的 cookie 與 token"""
+        path = self._path("HTTP_LOGIN_PATH")
+        self.session.cookies.clear()
+        self.session.headers.pop("Authorization", None)
+        response = self._request("POST", path,
+                                 json={"username": Config.USERNAME, "password": Config.PASSWORD})
+        data = self._json(response)
+        if not isinstance(data, dict) or not 200 <= response.status_code < 300:
+            # 導回登入頁的 HTML 或匿名的 session cookie 都不代表登入成功
+            raise HttpBackendError(f"登入回應不是 JSON ({response.status_code})")
+        token = data.get(Config.HTTP_TOKEN_FIELD)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        elif not self.session.cookies:
+            raise HttpBackendError(f"登入回應中沒有 {Config.HTTP_TOKEN_FIELD} 或 cookie")
+        print("✅ HTTP 登入成功")
+
+    @timed("records")
+    def records(self):
+        """取得今天的打卡記錄，格式與 AttendanceParser 相同"""
+        data = self._json(self._request("GET", self._path("HTTP_RECORDS_PATH")))
+        if isinstance(data, dict):
+            data = data.get("records")
+        if not isinstance(data, list):
+            raise HttpBackendError("打卡記錄 API 回應格式無法辨識")
+        return [
+            {
+                "check_in": item.get("check_in", item.get("checkIn")) or "",
+                "check_out": item.get("check_out", item.get("checkOut")) or "",
+            }
+            for item in data
+        ]
+
+    @timed("punch")
+    def punch(self):
+        """送出打卡（網站依目前狀態決定是上班或下班）
+
+        打卡不是冪等操作：連線建立後的逾時、斷線或 5xx 無法確定網站是否已打卡，拋出 PunchUncertainError。
+        """
+        path = self._path("HTTP_PUNCH_PATH")
+        try:
+            response = self.session.request("POST", self._url(path), timeout=Config.HTTP_TIMEOUT)
+        except requests.ConnectTimeout as e:
+            # 連線都還沒建立，請求沒有送出
+            raise HttpBackendError(f"POST {path} 連線逾時: {e}")
+        except requests.RequestException as e:
+            raise PunchUncertainError(f"POST {path} 失敗: {e}")
+        if response.status_code >= 500:
+            raise PunchUncertainError(f"POST {path} 回應 {response.status_code}")
+        if response.status_code >= 400:
+            raise HttpBackendError(f"POST {path} 回應 {response.status_code}")
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """取得全域共用的 Session，同一個行程中依序打卡的帳號共用連線池"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = new_session()
+        return _session
+
+
+def punch_via_http(label, source="打卡系統", client=None):
+    """以 HTTP 執行打卡，回傳打卡結果；需要瀏覽器流程處理的情況拋出 HttpBackendError"""
+    if not Config.AUTO_CHECKIN_ENABLED:
+        print("⏸ 已停用自動打卡 (AUTO_CHECKIN_ENABLED=false)")
+        return attendance_store.SKIPPED
+    if Config.is_skip_today():
+        return attendance_store.SKIPPED
+    if not Config.is_workday(current_time().date()):
+        print(f"⏸ 今天不是工作日，跳過 {label}")
+        return attendance_store.SKIPPED
+    if label not in PUNCH_STATUSES:
+        raise HttpBackendError(f"不支援的打卡動作: {label}")
+
+    source = f"{source or '打卡系統'} (HTTP)"
+    client = client or HttpPunchClient(get_http_session())
+    client.login()
+    records = client.records()
+    get_attendance_store().save_records(records)
+    current_status = AttendanceParser.get_current_status(records)
+
+    total_hours = None
+    if current_status not in PUNCH_STATUSES[label]:
+        outcome = attendance_store.SKIPPED
+        result = f"{label}打卡 - 當前狀態: {current_status}，略過"
+        print(f"⏸ {result}")
+    else:
+        if label == "下班":
+            total_hours = work_hours.summarize(records, current_time()).total_hours
+            if total_hours < 8:
+                # 延後打卡與工時不足通知沿用瀏覽器流程
+                raise HttpBackendError(f"工時不足 ({total_hours:.1f}小時)，交由瀏覽器流程處理")
+        try:
+            client.punch()
+        except PunchUncertainError as e:
+            # 網站可能已經打卡，改用瀏覽器可能重複打卡，回報失敗讓使用者確認
+            outcome = attendance_store.FAILED
+            result = f"{label}打卡結果不明，請到打卡網站確認: {e}"
+            print(f"❌ {result}")
+        else:
+            outcome = attendance_store.SUCCESS
+            result = f"{label}打卡成功"
+            print(f"✅ {result} (HTTP)")
+            # 打卡已送出，之後的錯誤不能再讓呼叫端改用瀏覽器重打一次
+            try:
+                records = client.records()
+                get_attendance_store().save_records(records)
+            except HttpBackendError as e:
+                print(f"⚠️ 打卡後重新取得打卡記錄失敗: {e}")
+
+    get_attendance_store().record_punch(label, outcome, result, work_hours=total_hours, source=source)
+    EmailService.send_checkin_notification(result, label, work_hours=total_hours, source=source,
+                                           attendance_records=records,
+                                           urgent=outcome == attendance_store.FAILED)
+    return outcome
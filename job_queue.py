@@ -0,0 +1,121 @@
+"""
+背景工作佇列模組
+將手動打卡等耗時的瀏覽器操作交給背景執行緒，請求立即回傳工作編號
+"""
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    """單一背景工作"""
+
+    def __init__(self, kind, description=""):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.description = description
+        self.status = QUEUED
+        self.progress = "等待執行"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._queue = None
+
+    @property
+    def finished(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def update(self, progress):
+        """更新目前進度說明"""
+        self.progress = progress
+        if self._queue:
+            self._queue._notify(self)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "description": self.description,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """以執行緒池執行背景工作，並保留最近完成的工作結果供查詢"""
+
+    def __init__(self, workers=None, retention=None):
+        self.workers = max(1, workers or Config.JOB_WORKERS)
+        self.retention = Config.JOB_RETENTION if retention is None else retention
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def submit(self, kind, fn, *args, description="", **kwargs):
+        """加入工作並立即回傳 Job；fn 的第一個參數為 Job，可用來回報進度"""
+        job = Job(kind, description)
+        job._queue = self
+        with self._lock:
+            self._prune_locked()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        self._notify(job)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.update("執行中")
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = SUCCEEDED
+            job.progress = "完成"
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            job.progress = "失敗"
+            print(f"❌ 背景工作 {job.kind} ({job.id}) 失敗: {e}")
+        finally:
+            job.finished_at = time.time()
+            self._notify(job)
+
+    def get(self, job_id):
+        """依編號取得工作，找不到時回傳 None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune_locked(self):
+        """移除完成超過 retention 秒的工作"""
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def add_listener(self, callback):
+        """註冊工作狀態變化的回呼，callback(job)"""
+        self._listeners.append(callback)
+
+    def _notify(self, job):
+        for callback in list(self._listeners):
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"⚠️ 工作通知失敗: {e}")
+
+    def shutdown(self, wait=True):
+        """停止接受新工作並等待執行中的工作完成"""
+        self._executor.shutdown(wait=wait)
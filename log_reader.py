@@ -0,0 +1,80 @@
+"""
+日誌讀取模組
+從檔案尾端往回讀取區塊取得最新的記錄，讀取量只與頁面大小有關，不受日誌檔總長度影響
+"""
+import os
+import threading
+
+BLOCK_SIZE = 8192
+
+
+def read_tail(path, count, skip=0, block_size=BLOCK_SIZE):
+    """讀取倒數第 skip+1 到 skip+count 筆非空白的行
+
+    回傳 (依時間順序排列的行, 是否還有更舊的記錄)。
+    """
+    needed = skip + count + 1  # 多讀一行用來判斷是否還有更舊的記錄
+    lines = []
+    carry = b""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        while position > 0 and len(lines) < needed:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            parts = (f.read(read_size) + carry).split(b"\n")
+            # 第一段可能是被區塊切斷的行，留到讀取前一個區塊時再處理
+            carry = parts[0]
+            lines[:0] = [part for part in parts[1:] if part.strip()]
+        if position == 0 and carry.strip():
+            lines.insert(0, carry)
+
+    end = max(0, len(lines) - skip)
+    start = max(0, end - count)
+    page = [line.decode("utf-8", errors="replace").strip() for line in lines[start:end]]
+    return page, start > 0
+
+
+class LogReader:
+    """以檔案 inode、大小與修改時間為鍵快取分頁結果的日誌讀取器"""
+
+    def __init__(self, path, per_page=50, max_cached_pages=16):
+        self.path = path
+        self.per_page = per_page
+        self.max_cached_pages = max_cached_pages
+        self._lock = threading.Lock()
+        self._signature = None
+        self._pages = {}
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def page(self, page=1, per_page=None):
+        """取得第 page 頁（第 1 頁為最新的記錄），回傳 (行列表, 是否還有更舊的記錄)"""
+        page = max(1, page)
+        per_page = per_page or self.per_page
+        signature = self._stat_signature()
+        if signature is None:
+            return [], False
+
+        key = (page, per_page)
+        with self._lock:
+            if signature != self._signature:
+                self._signature = signature
+                self._pages = {}
+            cached = self._pages.get(key)
+        if cached is not None:
+            return cached
+
+        result = read_tail(self.path, per_page, skip=(page - 1) * per_page)
+        with self._lock:
+            if signature == self._signature:
+                if len(self._pages) >= self.max_cached_pages:
+                    self._pages.pop(next(iter(self._pages)))
+                self._pages[key] = result
+        return result
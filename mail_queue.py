@@ -0,0 +1,193 @@
+"""
+郵件佇列模組
+在背景執行緒以重複使用的 SMTP 連線寄送郵件，失敗時以指數退避重試，程式結束前送完佇列
+"""
+import time
+import queue
+import atexit
+import smtplib
+import threading
+from config import Config
+from timing import current_timer
+
+
+class SMTPConnection:
+    """可重複使用的 SMTP 連線，斷線時自動重新連線"""
+
+    def __init__(self, factory=None):
+        self._factory = factory or (lambda: smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT, timeout=30))
+        self._server = None
+
+    def _connect(self):
+        print("🔌 連接到 SMTP 伺服器...")
+        server = self._factory()
+        print("🔐 啟動 TLS 加密...")
+        server.starttls()
+        print("🔑 登入 SMTP 伺服器...")
+        server.login(Config.SMTP_USER, Config.SMTP_PASS)
+        self._server = server
+
+    def _alive(self):
+        if self._server is None:
+            return False
+        try:
+            return self._server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def send(self, msg):
+        """寄出郵件；連線已中斷時重新連線一次"""
+        if not self._alive():
+            self.close()
+            self._connect()
+        try:
+            self._server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self.close()
+            self._connect()
+            self._server.send_message(msg)
+
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._server = None
+
+    @property
+    def connected(self):
+        return self._server is not None
+
+
+class MailJob:
+    """佇列中的單一郵件"""
+
+    def __init__(self, msg):
+        self.msg = msg
+        self.attempts = 0
+        self.done = threading.Event()
+        self.success = False
+        # 打卡過程中寄出的郵件，實際寄送的耗時記入該次打卡的 send_email 階段
+        self.timer = current_timer()
+        if self.timer is not None:
+            self.timer.mail_queued()
+
+
+class MailQueue:
+    """背景寄信佇列
+
+    send() 只把郵件放進佇列就返回；背景執行緒依序寄出，連線閒置超過 idle_timeout 秒後關閉。
+    認證錯誤不重試，其他錯誤最多重試 max_retries 次。
+    """
+
+    def __init__(self, connection=None, max_retries=None, backoff_base=None, backoff_max=None, idle_timeout=None):
+        self.connection = connection or SMTPConnection()
+        self.max_retries = Config.EMAIL_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = Config.EMAIL_RETRY_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = Config.EMAIL_RETRY_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.idle_timeout = Config.SMTP_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mail-queue", daemon=True)
+                self._thread.start()
+
+    def send(self, msg):
+        """將郵件放入佇列，回傳可等待結果的 MailJob"""
+        job = MailJob(msg)
+        self._queue.put(job)
+        self._ensure_worker()
+        return job
+
+    def backoff(self, attempt):
+        """第 attempt 次重試前的等待秒數"""
+        return min(self.backoff_max, self.backoff_base * (2 ** max(0, attempt - 1)))
+
+    def _deliver(self, job):
+        subject = job.msg["Subject"]
+        while True:
+            job.attempts += 1
+            try:
+                print("📤 發送郵件...")
+                self.connection.send(job.msg)
+                print(f"✅ 已寄出通知信: {subject}")
+                return True
+            except smtplib.SMTPAuthenticationError as e:
+                print(f"❌ SMTP 認證失敗: {e}")
+                print("💡 請檢查 SMTP_USER 和 SMTP_PASS 是否正確")
+                self.connection.close()
+                return False
+            except (smtplib.SMTPException, OSError) as e:
+                self.connection.close()
+                if job.attempts > self.max_retries:
+                    print(f"❌ 寄信失敗，已重試 {self.max_retries} 次: {e}")
+                    return False
+                delay = self.backoff(job.attempts)
+                print(f"⚠️ 寄信失敗: {e}，{delay:.0f} 秒後重試 ({job.attempts}/{self.max_retries})")
+                time.sleep(delay)
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                if self.connection.connected:
+                    print("🔌 SMTP 連線閒置，關閉連線")
+                    self.connection.close()
+                continue
+            started = job.timer.clock() if job.timer else None
+            try:
+                job.success = self._deliver(job)
+            except Exception as e:
+                print(f"❌ 寄信失敗: {e}")
+                print(f"   錯誤類型: {type(e).__name__}")
+            finally:
+                if job.timer:
+                    job.timer.mail_sent(started, job.timer.clock() - started,
+                                        None if job.success else "SendFailed")
+                job.done.set()
+                self._queue.task_done()
+
+    def pending(self):
+        """尚未寄出的郵件數量"""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout=None):
+        """等待佇列中的郵件寄完，回傳是否全部處理完畢"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """程式結束前送完佇列並關閉連線"""
+        timeout = Config.EMAIL_FLUSH_TIMEOUT if timeout is None else timeout
+        if self.pending():
+            print(f"📧 等待 {self.pending()} 封郵件寄出...")
+            if not self.flush(timeout):
+                print(f"⚠️ 仍有 {self.pending()} 封郵件未寄出")
+        self.connection.close()
+
+
+_mail_queue = None
+_mail_queue_lock = threading.Lock()
+
+
+def get_mail_queue():
+    """取得全域共用的寄信佇列"""
+    global _mail_queue
+    with _mail_queue_lock:
+        if _mail_queue is None:
+            _mail_queue = MailQueue()
+            atexit.register(_mail_queue.close)
+        return _mail_queue
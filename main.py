@@ -4,12 +4,17 @@
 """
 import os
 import sys
-import time
+import signal
 import datetime
-import schedule
+from dotenv import load_dotenv
 from config import Config
-from web_automation import WebAutomation
 from email_service import EmailService
+from scheduler import PunchScheduler, set_scheduler
+from deferred_jobs import AUTO_CHECKOUT_SOURCE, DeferredJobStore
+from attendance_store import FAILED, LOGIN_FAILED, get_attendance_store
+from work_hours import current_time
+from schedule_config import get_schedule_config
+import timing
 
 
 def main():
@@ -20,8 +25,12 @@ def main():
     print("   - 使用 'python main.py debug' 來調試 HTML 結構")
     print("   - 使用 'python main.py email' 來測試寄信功能")
     print("   - 使用 'python main.py hours' 來計算今天滿8小時的下班時間")
+    print("   - 使用 'python main.py hours --cached' 以已保存的打卡記錄計算，不開啟瀏覽器")
+    print("   - 使用 'python main.py check' 來檢查環境變數設定")
     print("   - 使用 'python main.py force <動作>' 來強制打卡")
     print("   - 使用 'python main.py auto' 來自動偵測下班時間並打卡")
+    print("   - 使用 'python main.py report [天數]' 來查看打卡報表")
+    print("   - 使用 'python main.py timing [次數]' 來查看最近打卡各階段的耗時")
 
     # 顯示當前時間資訊
     current_time = datetime.datetime.now()
@@ -73,60 +82,126 @@ def main():
             print("⏸ 跳過執行，等待下次排程時間")
     else:
         print("💻 本地環境，啟動排程模式...")
-        setup_schedule()
-
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        scheduler = setup_schedule()
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            print("👋 排程已停止")
 
 
 def run_checkin(label, source=None):
-    """執行打卡動作"""
-    automation = WebAutomation()
+    """執行打卡動作，回傳打卡結果；各階段耗時寫入 TIMING_LOG_FILE"""
+    with timing.punch_run(label, source) as timer:
+        timer.outcome = _run_checkin(label, source)
+        return timer.outcome
+
+
+def _run_checkin(label, source=None):
+    """PUNCH_BACKEND=http 時先以 HTTP 打卡，失敗再改用瀏覽器"""
+    if Config.PUNCH_BACKEND == "http":
+        from http_backend import HttpBackendError, punch_via_http
+
+        try:
+            return punch_via_http(label, source)
+        except HttpBackendError as e:
+            print(f"⚠️ HTTP 打卡無法完成，改用瀏覽器: {e}")
+
+    from driver_pool import DriverPoolError, LoginFailedError, get_driver_pool
+
     try:
-        automation.setup_driver()
-        if automation.login():
-            automation.punch_in(label)
+        with get_driver_pool().lease() as automation:
+            return automation.punch_in(label)
+    except LoginFailedError as e:
+        print(f"❌ 無法取得瀏覽器: {e}")
+        get_attendance_store().record_punch(label, LOGIN_FAILED, str(e), source=source)
+        return LOGIN_FAILED
+    except DriverPoolError as e:
+        print(f"❌ 無法取得瀏覽器: {e}")
     except Exception as e:
         print(f"❌ 打卡過程出錯: {e}")
         EmailService.send_checkin_notification(
-            f"打卡失敗: {e}", label, source=source)
-    finally:
-        automation.quit()
+            f"打卡失敗: {e}", label, source=source, urgent=True)
+    return FAILED
 
 
-def setup_schedule():
-    """設置本地排程"""     
+def run_scheduled_checkin(label):
+    """排程器到期時執行打卡，並移除已到期的延後工作（自動下班偵測的工作由它自己的行程處理）"""
+    run_checkin(label, source="本地環境")
+    DeferredJobStore().remove_due(label, exclude_source=AUTO_CHECKOUT_SOURCE)
+
+
+def plan_day(date):
+    """計算指定日期的打卡排程，非工作日、請假日或停用時回傳空排程"""
     # 檢查是否為工作日
-    if not Config.is_workday():
-        print("📅 今天不是工作日，跳過排程設置")
-        return
+    if not Config.is_workday(date):
+        print(f"📅 {date} 不是工作日，今天不排程")
+        return []
 
     # 檢查是否為請假日
-    if Config.is_skip_today():
-        return
+    if Config.is_skip_today(date):
+        return []
 
     # 檢查自動打卡是否啟用
     if not Config.AUTO_CHECKIN_ENABLED:
         print("⏸ 自動打卡已停用")
-        return
+        return []
+
+    # 打卡時間來自 Web 介面的設定（schedule_config.json）
+    punches = get_schedule_config().punches()
+    if not punches:
+        print("⏸ 打卡時間設定已停用")
+    return punches
 
+
+def setup_schedule():
+    """設置本地排程，每天換日時重新計算當天的打卡時間"""
     print("⏰ 設置排程...")
-    schedule.every().day.at("08:50").do(lambda: run_checkin("上班", source="本地環境"))
-    schedule.every().day.at("12:15").do(lambda: run_checkin("午休下班", source="本地環境"))
-    schedule.every().day.at("13:15").do(lambda: run_checkin("午休上班", source="本地環境"))
-    schedule.every().day.at("18:15").do(lambda: run_checkin("下班", source="本地環境"))
+    scheduler = PunchScheduler(runner=run_scheduled_checkin, planner=plan_day)
+    set_scheduler(scheduler)
+
+    # 接續上次未完成的延後打卡；自動下班偵測的工作由 'main.py auto' 行程自己接續
+    for job in DeferredJobStore().pending():
+        if job.get("source") == AUTO_CHECKOUT_SOURCE:
+            continue
+        fire_at = max(DeferredJobStore.fire_time(job), current_time())
+        print(f"📌 接續延後打卡: {job['label']} ({fire_at:%H:%M})")
+        scheduler.schedule_once(fire_at, job["label"])
+
+    # 打卡時間設定檔變更時重新計算排程
+    get_schedule_config().watch(scheduler.reload, interval=Config.SCHEDULE_WATCH_INTERVAL)
+
+    # 收到 SIGHUP 時重新載入設定並重新計算排程
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: _reload_schedule(scheduler))
+
+    next_time = scheduler.next_fire_time()
     print("✅ 排程設置完成")
+    if next_time:
+        print(f"⏭️ 下次打卡時間: {next_time:%Y-%m-%d %H:%M}")
+    return scheduler
+
+
+def _reload_schedule(scheduler):
+    """重新讀取 .env 的請假日與啟用設定並喚醒排程器"""
+    print("🔄 重新載入排程設定...")
+    load_dotenv(override=True)
+    Config.AUTO_CHECKIN_ENABLED = os.getenv("AUTO_CHECKIN_ENABLED", "true").lower() == "true"
+    Config.load_skip_dates()
+    scheduler.reload()
 
 
 def test_mode():
     """測試模式"""
+    from web_automation import WebAutomation
+
     automation = WebAutomation()
     automation.test_attendance_records()
 
 
 def debug_mode():
     """調試模式"""
+    from web_automation import WebAutomation
+
     automation = WebAutomation()
     automation.debug_html_structure()
 
@@ -138,18 +213,37 @@ def email_test_mode():
 
 def calculate_work_hours_mode():
     """計算工時模式"""
-    automation = WebAutomation()
+    if "--cached" in sys.argv[2:]:
+        cached_work_hours_mode()
+        return
+
+    from driver_pool import DriverPoolError, get_driver_pool
+
     try:
-        automation.setup_driver()
-        if automation.login():
+        with get_driver_pool().lease() as automation:
             print("✅ 登入成功，開始計算工時...")
             automation.calculate_work_hours()
-        else:
-            print("❌ 登入失敗，無法計算工時")
+    except DriverPoolError as e:
+        print(f"❌ {e}，無法計算工時")
     except Exception as e:
         print(f"❌ 計算工時過程出錯: {e}")
-    finally:
-        automation.quit()
+
+
+def cached_work_hours_mode():
+    """以打卡資料庫中保存的今天打卡記錄計算工時，不開啟瀏覽器"""
+    from hours_report import report_work_hours
+
+    records = get_attendance_store().records(current_time().date())
+    print("🗄 使用已保存的打卡記錄計算工時（最後一次打卡或查詢時的資料）")
+    report_work_hours(records)
+
+
+def check_config_mode():
+    """檢查環境變數設定"""
+    if Config.validate_config():
+        print("✅ 必要的環境變數已設定")
+    else:
+        sys.exit(1)
 
 
 def force_punch_mode():
@@ -168,6 +262,8 @@ def force_punch_mode():
         print(f"💡 可用動作: {', '.join(valid_actions)}")
         return
     
+    from web_automation import WebAutomation
+
     automation = WebAutomation()
     try:
         automation.setup_driver()
@@ -188,8 +284,21 @@ def force_punch_mode():
 
 def auto_checkout_mode():
     """自動下班偵測模式"""
+    from web_automation import WebAutomation
+
     automation = WebAutomation()
     try:
+        # 上次的等待被中斷時，不需開啟瀏覽器，直接接續等待
+        pending = DeferredJobStore().pending(source=AUTO_CHECKOUT_SOURCE)
+        if pending:
+            job = pending[0]
+            print(f"📌 接續未完成的自動下班工作，預計 {job['fire_at']} 打卡")
+            if automation.run_deferred_checkout(job):
+                print("🎉 自動下班打卡完成")
+            else:
+                print("❌ 自動下班打卡失敗")
+            return
+
         automation.setup_driver()
         if automation.login():
             print("✅ 登入成功，開始自動下班偵測...")
@@ -206,6 +315,36 @@ def auto_checkout_mode():
         automation.quit()
 
 
+def report_mode():
+    """打卡報表模式：從打卡資料庫統計最近幾天的工時與打卡結果"""
+    days = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 7
+    end = current_time().date()
+    start = end - datetime.timedelta(days=days - 1)
+    store = get_attendance_store()
+
+    print(f"📊 打卡報表: {start} ~ {end}")
+    hours = store.daily_hours(start, end)
+    if hours:
+        print("🕐 每日工時:")
+        for date, value in hours.items():
+            print(f"   {date} ({date.strftime('%a')}): {value:.2f} 小時")
+        print(f"   平均: {sum(hours.values()) / len(hours):.2f} 小時")
+    else:
+        print("   沒有打卡記錄")
+
+    summary = store.outcome_summary(start, end)
+    if summary:
+        print("📌 打卡結果:")
+        for (action, outcome), count in sorted(summary.items()):
+            print(f"   {action} - {outcome}: {count} 次")
+
+
+def timing_mode():
+    """耗時報表模式：統計最近幾次打卡各階段的耗時"""
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 20
+    timing.print_report(timing.load_records(limit=limit))
+
+
 if __name__ == "__main__":
     # 檢查是否為測試模式
     if len(sys.argv) > 1:
@@ -221,7 +360,13 @@ if __name__ == "__main__":
             force_punch_mode()
         elif sys.argv[1] == "auto":
             auto_checkout_mode()
+        elif sys.argv[1] == "report":
+            report_mode()
+        elif sys.argv[1] == "check":
+            check_config_mode()
+        elif sys.argv[1] == "timing":
+            timing_mode()
         else:
-            print("❌ 未知的參數。可用參數: test, debug, email, hours, force, auto")
+            print("❌ 未知的參數。可用參數: test, debug, email, hours, force, auto, report, check, timing")
     else:
         main()
@@ -0,0 +1,88 @@
+"""
+通知摘要模組
+把一段時間內的非緊急打卡通知合併成一封郵件，減少每天的寄信次數
+"""
+import atexit
+import threading
+from config import Config
+from work_hours import current_time
+
+
+class NotificationDigest:
+    """累積通知，第一則通知進來後等待 window 秒再合併寄出
+
+    send(subject, body, wait) 負責實際寄信，與 EmailService.send_email 相同。
+    """
+
+    def __init__(self, send, window=None):
+        self._send = send
+        self.window = Config.NOTIFY_DIGEST_WINDOW if window is None else window
+        self._items = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, subject, body):
+        """加入一則通知，必要時啟動計時器"""
+        with self._lock:
+            self._items.append((current_time(), subject, body))
+            count = len(self._items)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        print(f"🗂 通知已加入摘要，目前累積 {count} 則")
+
+    def pending(self):
+        """尚未寄出的通知數量"""
+        with self._lock:
+            return len(self._items)
+
+    def flush(self, wait=False):
+        """立即合併寄出累積的通知，沒有通知時回傳 False"""
+        with self._lock:
+            items, self._items = self._items, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not items:
+            return False
+        subject, body = self.compose(items)
+        return self._send(subject, body, wait=wait)
+
+    def close(self):
+        """程式結束前寄出剩餘的通知"""
+        if self.pending():
+            print(f"📧 寄出剩餘的 {self.pending()} 則摘要通知...")
+            self.flush(wait=True)
+
+    @staticmethod
+    def compose(items):
+        """將 [(時間, 主旨, 內容), ...] 合併成一封郵件的主旨與內容"""
+        first, last = items[0][0], items[-1][0]
+        period = f"{first.strftime('%Y-%m-%d %H:%M')} ~ {last.strftime('%H:%M')}"
+        subject = f"📅 自動打卡摘要 - {len(items)} 則通知 - {period}"
+
+        lines = ["自動打卡系統通知摘要", "", f"期間: {period}", f"通知數量: {len(items)}", ""]
+        for i, (when, item_subject, item_body) in enumerate(items, 1):
+            lines.append(f"===== {i}. {when.strftime('%H:%M:%S')} {item_subject} =====")
+            # 去掉每則通知重複的頁尾
+            lines.append(item_body.strip().split("\n---\n")[0].strip())
+            lines.append("")
+        lines += ["---", "自動打卡系統"]
+        return subject, "\n".join(lines)
+
+
+_digest = None
+_digest_lock = threading.Lock()
+
+
+def get_notification_digest():
+    """取得全域共用的通知摘要"""
+    global _digest
+    with _digest_lock:
+        if _digest is None:
+            # 延遲匯入，避免與 email_service 互相匯入
+            from email_service import EmailService
+            _digest = NotificationDigest(EmailService.send_email)
+            atexit.register(_digest.close)
+        return _digest
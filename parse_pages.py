@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+離線批次解析打卡頁面
+平行解析目錄中已儲存的 HTML 頁面，不需要啟動瀏覽器
+
+用法:
+    python parse_pages.py <目錄> [--date MM/DD] [--workers N] [--output 結果.jsonl]
+
+未指定 --date 時，會從檔名中的 YYYY-MM-DD 或 MMDD 推斷日期，否則使用檔案修改日期。
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+from attendance_parser import AttendanceParser
+
+FILENAME_DATE_PATTERNS = [
+    re.compile(r"(\d{4})-(\d{2})-(\d{2})"),
+    re.compile(r"(?<!\d)(\d{2})(\d{2})(?!\d)"),
+]
+
+
+def infer_date(path):
+    """從檔名或修改時間推斷頁面日期 (MM/DD)"""
+    name = os.path.basename(path)
+    for pattern in FILENAME_DATE_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            month, day = match.groups()[-2:]
+            if 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
+                return f"{month}/{day}"
+    return datetime.datetime.fromtimestamp(os.path.getmtime(path)).strftime("%m/%d")
+
+
+def parse_file(args):
+    """解析單一檔案，回傳可序列化的結果"""
+    path, date = args
+    date = date or infer_date(path)
+    try:
+        with open(path, "rb") as f:
+            records = AttendanceParser.parse_html(f.read(), date)
+        return {
+            "file": path,
+            "date": date,
+            "records": records,
+            "work_hours": round(AttendanceParser.calculate_work_hours(records), 2),
+        }
+    except Exception as e:
+        return {"file": path, "date": date, "error": str(e)}
+
+
+def find_pages(directory):
+    """列出目錄下所有 HTML 檔案"""
+    pages = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith((".html", ".htm")):
+                pages.append(os.path.join(root, name))
+    return sorted(pages)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="離線批次解析打卡頁面")
+    parser.add_argument("directory", help="存放 HTML 頁面的目錄")
+    parser.add_argument("--date", help="要解析的日期 (MM/DD)，預設從檔名推斷")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="平行處理的行程數")
+    parser.add_argument("--output", help="輸出 JSON lines 檔案，預設輸出到終端機")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers 至少要 1")
+
+    pages = find_pages(args.directory)
+    if not pages:
+        print(f"❌ 在 {args.directory} 找不到 HTML 檔案", file=sys.stderr)
+        return 1
+
+    print(f"📂 找到 {len(pages)} 個頁面，使用 {args.workers} 個行程解析...", file=sys.stderr)
+    started = time.perf_counter()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        chunksize = max(1, len(pages) // (args.workers * 4))
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for result in executor.map(parse_file, [(p, args.date) for p in pages], chunksize=chunksize):
+                failed += "error" in result
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ 完成: {len(pages)} 個頁面, 失敗 {failed} 個, 耗時 {elapsed:.2f} 秒 "
+          f"({len(pages) / elapsed:.0f} 頁/秒)", file=sys.stderr)
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+頁面就緒偵測模組
+以明確等待取代固定的 time.sleep：偵測打卡按鈕、網址變化與網路閒置
+"""
+import json
+import time
+import random
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from config import Config
+
+CHECK_BUTTON_XPATH = "//button[contains(text(),'Check')]"
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """第 attempt 次重試前的等待秒數（指數退避加上少量隨機抖動）"""
+    base = Config.LOGIN_RETRY_BACKOFF_BASE if base is None else base
+    cap = Config.LOGIN_RETRY_BACKOFF_MAX if cap is None else cap
+    delay = min(cap, base * (2 ** max(0, attempt - 1)))
+    return delay * random.uniform(0.9, 1.1)
+
+
+class NetworkIdle:
+    """追蹤進行中的網路請求，判斷頁面是否已閒置
+
+    優先使用 CDP performance log 計算進行中的請求；
+    driver 未開啟 performance log 時改用 Resource Timing 的資源數量是否穩定來判斷。
+    """
+
+    def __init__(self, driver, idle_time=0.5):
+        self.driver = driver
+        self.idle_time = idle_time
+        self.inflight = set()
+        self.last_activity = time.monotonic()
+        self._use_cdp = True
+        self._resource_count = None
+
+    def _poll_cdp(self):
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method", "")
+            request_id = message.get("params", {}).get("requestId")
+            if method == "Network.requestWillBeSent":
+                self.inflight.add(request_id)
+                self.last_activity = time.monotonic()
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                self.inflight.discard(request_id)
+                self.last_activity = time.monotonic()
+        return not self.inflight
+
+    def _poll_resource_timing(self):
+        state, count = self.driver.execute_script(
+            "return [document.readyState, performance.getEntriesByType('resource').length];"
+        )
+        if count != self._resource_count:
+            self._resource_count = count
+            self.last_activity = time.monotonic()
+        return state == "complete"
+
+    def is_idle(self):
+        """目前是否已超過 idle_time 秒沒有網路活動"""
+        if self._use_cdp:
+            try:
+                quiet = self._poll_cdp()
+            except (WebDriverException, ValueError, KeyError):
+                self._use_cdp = False
+                quiet = self._poll_resource_timing()
+        else:
+            quiet = self._poll_resource_timing()
+        return quiet and time.monotonic() - self.last_activity >= self.idle_time
+
+
+class Readiness:
+    """頁面就緒偵測類別"""
+
+    def __init__(self, driver, timeout=None, poll_interval=None):
+        self.driver = driver
+        self.timeout = Config.READY_TIMEOUT if timeout is None else timeout
+        self.poll_interval = Config.READY_POLL_INTERVAL if poll_interval is None else poll_interval
+
+    def wait_until(self, condition, timeout=None, message=""):
+        """等待 condition(driver) 回傳真值，逾時拋出 TimeoutException"""
+        wait = WebDriverWait(
+            self.driver,
+            self.timeout if timeout is None else timeout,
+            poll_frequency=self.poll_interval,
+            ignored_exceptions=(WebDriverException,),
+        )
+        return wait.until(condition, message)
+
+    def element(self, by, value, timeout=None):
+        """等待元素出現並回傳"""
+        def find(driver):
+            elements = driver.find_elements(by, value)
+            return elements[0] if elements else False
+        return self.wait_until(find, timeout, f"找不到元素 {value}")
+
+    def check_button(self, timeout=None):
+        """等待打卡按鈕出現，找不到時回傳 None"""
+        try:
+            return self.element(By.XPATH, CHECK_BUTTON_XPATH, timeout)
+        except TimeoutException:
+            return None
+
+    def wait_for_login(self, from_url, timeout=None, settle_time=None):
+        """點擊登入後等待結果
+
+        找到打卡按鈕即視為成功；若網路已閒置且持續 settle_time 秒仍沒有按鈕
+        （例如密碼錯誤停留在登入頁），提早判定失敗而不必等到逾時。
+        """
+        settle_time = Config.LOGIN_SETTLE_TIME if settle_time is None else settle_time
+        network = NetworkIdle(self.driver)
+        state = {"settled_at": None}
+
+        def outcome(driver):
+            if driver.find_elements(By.XPATH, CHECK_BUTTON_XPATH):
+                return "ready"
+            if not network.is_idle():
+                state["settled_at"] = None
+                return False
+            if state["settled_at"] is None:
+                state["settled_at"] = time.monotonic()
+                if driver.current_url != from_url:
+                    print("   ↪️ 網址已變更，等待打卡按鈕...")
+            elif time.monotonic() - state["settled_at"] >= settle_time:
+                return "settled"
+            return False
+
+        started = time.monotonic()
+        try:
+            result = self.wait_until(outcome, timeout, "等待登入結果逾時")
+        except TimeoutException:
+            result = "timeout"
+        print(f"   ⏱️ 登入等待 {(time.monotonic() - started) * 1000:.0f} ms ({result})")
+        return result == "ready"
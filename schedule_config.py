@@ -0,0 +1,125 @@
+"""
+打卡時間設定模組
+Web 介面與本地排程共用的打卡時間設定，依檔案 mtime/inode 快取，儲存時以暫存檔改名確保完整寫入
+"""
+import os
+import json
+import time
+import threading
+from work_hours import to_minutes
+
+SCHEDULE_FILE = 'schedule_config.json'
+
+DEFAULT_SCHEDULE = {
+    "check_in_time": "08:45",
+    "lunch_out_time": "12:00",
+    "lunch_in_time": "13:00",
+    "check_out_time": "17:46",
+    "enabled": True
+}
+
+# 設定欄位與對應的打卡動作
+PUNCH_FIELDS = [
+    ("check_in_time", "上班"),
+    ("lunch_out_time", "午休下班"),
+    ("lunch_in_time", "午休上班"),
+    ("check_out_time", "下班"),
+]
+
+
+class ScheduleConfig:
+    """以檔案 inode、大小與修改時間為鍵快取的打卡時間設定"""
+
+    def __init__(self, path=SCHEDULE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._config = None
+        self._watcher = None
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def load(self):
+        """載入打卡時間設定，檔案沒有變更時直接回傳快取"""
+        signature = self._stat_signature()
+        with self._lock:
+            if self._config is not None and signature == self._signature:
+                return dict(self._config)
+
+            config = dict(DEFAULT_SCHEDULE)
+            if signature is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        config.update(json.load(f))
+                except Exception as e:
+                    print(f"載入設定檔案失敗: {e}")
+            self._config = config
+            self._signature = signature
+            return dict(config)
+
+    def save(self, config):
+        """以先寫暫存檔再改名的方式儲存打卡時間設定"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"儲存設定檔案失敗: {e}")
+            return False
+
+        with self._lock:
+            self._config = dict(DEFAULT_SCHEDULE, **config)
+            self._signature = self._stat_signature()
+        return True
+
+    def changed(self):
+        """檢查檔案是否在上次載入後被修改"""
+        with self._lock:
+            loaded = self._config is not None
+            signature = self._signature
+        return loaded and self._stat_signature() != signature
+
+    def punches(self):
+        """回傳 [("HH:MM", 動作), ...]；停用時回傳空列表，格式錯誤的時間會被略過"""
+        config = self.load()
+        if not config.get("enabled", True):
+            return []
+        punches = []
+        for field, label in PUNCH_FIELDS:
+            time_str = config.get(field)
+            if to_minutes(time_str) is None:
+                print(f"⚠️ 打卡時間格式錯誤，略過 {label}: {time_str}")
+                continue
+            punches.append((time_str, label))
+        return punches
+
+    def watch(self, callback, interval=5.0):
+        """啟動背景執行緒，設定檔變更時呼叫 callback()"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self.load()
+
+        def run():
+            while True:
+                time.sleep(interval)
+                if self.changed():
+                    print("🔄 打卡時間設定已變更")
+                    self.load()
+                    callback()
+
+        self._watcher = threading.Thread(target=run, name="schedule-config-watcher", daemon=True)
+        self._watcher.start()
+
+
+_schedule_config = ScheduleConfig()
+
+
+def get_schedule_config():
+    """取得全域共用的打卡時間設定"""
+    return _schedule_config
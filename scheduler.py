@@ -0,0 +1,160 @@
+"""
+打卡排程模組
+以 heap 依時間排序打卡工作，睡眠到下一個工作到期為止，取代每秒輪詢的 schedule 迴圈
+"""
+import heapq
+import datetime
+import itertools
+import threading
+
+# 即使沒有工作也至少每小時醒來一次，避免系統時間調整或休眠後錯過換日
+MAX_SLEEP_SECONDS = 3600
+
+
+class ScheduledJob:
+    """排程中的單一打卡工作"""
+    __slots__ = ("when", "label", "daily", "cancelled")
+
+    def __init__(self, when, label, daily):
+        self.when = when
+        self.label = label
+        self.daily = daily
+        self.cancelled = False
+
+    def __repr__(self):
+        return f"ScheduledJob({self.when:%Y-%m-%d %H:%M}, {self.label})"
+
+
+class PunchScheduler:
+    """以 heap 為基礎的打卡排程器
+
+    planner(date) 回傳當天的 [("HH:MM", 動作), ...]，每天換日或呼叫 reload() 時重新計算；
+    runner(動作) 在工作到期時執行實際的打卡。
+    """
+
+    def __init__(self, runner, planner, clock=None):
+        self._runner = runner
+        self._planner = planner
+        self._clock = clock or datetime.datetime.now
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._planned_date = None
+        self._reload = False
+        self._stopped = False
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.when, next(self._seq), job))
+
+    def _plan_day(self, now):
+        """移除舊的每日工作，依 planner 加入今天尚未到期的打卡"""
+        for _, _, job in self._heap:
+            if job.daily:
+                job.cancelled = True
+        self._heap = [item for item in self._heap if not item[2].cancelled]
+        heapq.heapify(self._heap)
+
+        today = now.date()
+        for time_str, label in self._planner(today):
+            hour, minute = map(int, time_str.split(":"))
+            when = datetime.datetime.combine(today, datetime.time(hour, minute))
+            if when > now:
+                self._push(ScheduledJob(when, label, daily=True))
+        self._planned_date = today
+        self._reload = False
+
+    def _ensure_planned(self, now):
+        if self._reload or self._planned_date != now.date():
+            self._plan_day(now)
+
+    def schedule_once(self, when, label):
+        """加入一次性的打卡工作（例如工時不足時延後的下班打卡）"""
+        job = ScheduledJob(when, label, daily=False)
+        with self._cond:
+            self._push(job)
+            self._cond.notify()
+        return job
+
+    def reload(self):
+        """設定變更時呼叫，喚醒排程器並重新計算今天的排程"""
+        with self._cond:
+            self._reload = True
+            self._cond.notify()
+
+    def stop(self):
+        """停止 run_forever"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def jobs(self):
+        """依時間排序回傳尚未執行的工作"""
+        with self._cond:
+            return [job for _, _, job in sorted(self._heap) if not job.cancelled]
+
+    def next_fire_time(self):
+        """下一個打卡工作的時間，沒有工作時回傳 None"""
+        with self._cond:
+            self._ensure_planned(self._clock())
+            for when, _, job in sorted(self._heap):
+                if not job.cancelled:
+                    return when
+            return None
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job = heapq.heappop(self._heap)
+            if not job.cancelled:
+                due.append(job)
+        return due
+
+    def run_pending(self):
+        """執行所有已到期的工作，回傳執行數量"""
+        with self._cond:
+            now = self._clock()
+            self._ensure_planned(now)
+            due = self._pop_due(now)
+        for job in due:
+            print(f"⏰ 執行排程打卡: {job.label} ({job.when:%H:%M})")
+            try:
+                self._runner(job.label)
+            except Exception as e:
+                print(f"❌ 排程工作執行失敗: {e}")
+        return len(due)
+
+    def _seconds_until_next_wakeup(self, now):
+        tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        target = min(self._heap[0][0], tomorrow) if self._heap else tomorrow
+        return min(MAX_SLEEP_SECONDS, max(0.0, (target - now).total_seconds()))
+
+    def run_forever(self):
+        """睡眠到下一個工作到期、換日或被 reload() 喚醒為止"""
+        while True:
+            if self.run_pending():
+                next_time = self.next_fire_time()
+                if next_time:
+                    print(f"⏭️ 下次打卡時間: {next_time:%Y-%m-%d %H:%M}")
+            with self._cond:
+                if self._stopped:
+                    return
+                if self._reload:
+                    continue
+                timeout = self._seconds_until_next_wakeup(self._clock())
+                self._cond.wait(timeout)
+                if self._stopped:
+                    return
+
+
+_scheduler = None
+
+
+def set_scheduler(scheduler):
+    """設定全域排程器，讓其他模組可以加入一次性工作"""
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_scheduler():
+    """取得全域排程器，未啟動排程模式時回傳 None"""
+    return _scheduler
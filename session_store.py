@@ -0,0 +1,207 @@
+"""
+登入狀態保存模組
+將登入後的 cookies 與 localStorage 加密存到磁碟，讓新的瀏覽器不必再填寫登入表單
+"""
+import os
+import json
+import time
+import hmac
+import base64
+import hashlib
+from urllib.parse import urlparse
+from cryptography.fernet import Fernet, InvalidToken
+from selenium.common.exceptions import WebDriverException
+from config import Config
+
+# 密碼檢查值使用的 scrypt 參數（加鹽且刻意放慢，避免被用來離線猜密碼）
+SCRYPT_PARAMS = {"n": 2 ** 14, "r": 8, "p": 1, "dklen": 32}
+KEY_FILE = "session.key"
+
+
+class SessionStore:
+    """加密的登入狀態儲存類別"""
+
+    def __init__(self, username=None, store_dir=None, secret=None, password=None):
+        self.username = username or Config.USERNAME or ""
+        self.password = (password if password is not None else Config.PASSWORD) or ""
+        self.store_dir = os.path.expanduser(store_dir or Config.SESSION_STORE_DIR)
+        account_id = hashlib.sha256(self.username.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(self.store_dir, f"session_{account_id}.bin")
+        self.key_path = os.path.join(self.store_dir, KEY_FILE)
+        self._secret = secret or Config.SESSION_SECRET
+        self._cipher = None
+
+    @property
+    def _fernet(self):
+        """加密金鑰：有設定 SESSION_SECRET 時由它衍生，否則使用保存目錄中隨機產生的金鑰檔"""
+        if self._cipher is None:
+            if self._secret:
+                key = base64.urlsafe_b64encode(hashlib.sha256(self._secret.encode("utf-8")).digest())
+            else:
+                key = self._load_or_create_key()
+            self._cipher = Fernet(key)
+        return self._cipher
+
+    def _load_or_create_key(self):
+        """讀取金鑰檔；不存在時產生隨機金鑰並以 0600 權限保存"""
+        try:
+            with open(self.key_path, "rb") as f:
+                key = f.read().strip()
+            Fernet(key)
+            return key
+        except OSError:
+            pass
+        except ValueError:
+            print("⚠️ 登入狀態金鑰檔損毀，重新產生")
+            os.remove(self.key_path)
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        key = Fernet.generate_key()
+        try:
+            fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # 其他行程剛建立了金鑰檔
+            with open(self.key_path, "rb") as f:
+                return f.read().strip()
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def _password_check(self, salt):
+        """目前密碼的檢查值，用來讓密碼變更後舊的登入狀態失效"""
+        return hashlib.scrypt(self.password.encode("utf-8"), salt=salt, **SCRYPT_PARAMS).hex()
+
+    def save(self, driver):
+        """保存目前瀏覽器的 cookies 與 localStorage"""
+        try:
+            payload = {
+                "url": driver.current_url,
+                "cookies": driver.get_cookies(),
+                "local_storage": driver.execute_script(
+                    "var d = {}; for (var i = 0; i < localStorage.length; i++) {"
+                    " var k = localStorage.key(i); d[k] = localStorage.getItem(k); } return d;"
+                ) or {},
+                "saved_at": time.time(),
+            }
+            salt = os.urandom(16)
+            payload["password_salt"] = salt.hex()
+            payload["password_check"] = self._password_check(salt)
+        except WebDriverException as e:
+            print(f"⚠️ 無法讀取登入狀態: {e}")
+            return False
+
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            token = self._fernet.encrypt(json.dumps(payload).encode("utf-8"))
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(token)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 無法保存登入狀態: {e}")
+            return False
+        print(f"💾 已保存登入狀態 ({len(payload['cookies'])} 個 cookies)")
+        return True
+
+    def load(self):
+        """讀取並解密登入狀態，過期或損毀時回傳 None"""
+        try:
+            with open(self.path, "rb") as f:
+                token = f.read()
+        except OSError:
+            return None
+
+        try:
+            payload = json.loads(self._fernet.decrypt(token).decode("utf-8"))
+        except (InvalidToken, ValueError):
+            print("⚠️ 登入狀態無法解密，已清除")
+            self.clear()
+            return None
+
+        try:
+            expected = self._password_check(bytes.fromhex(payload["password_salt"]))
+            password_matches = hmac.compare_digest(expected, payload["password_check"])
+        except (KeyError, TypeError, ValueError):
+            password_matches = False
+        if not password_matches:
+            print("🔑 密碼已變更，捨棄保存的登入狀態")
+            self.clear()
+            return None
+
+        now = time.time()
+        if now - payload.get("saved_at", 0) > Config.SESSION_MAX_AGE:
+            print("⏰ 登入狀態已超過保存期限")
+            self.clear()
+            return None
+
+        cookies = [c for c in payload.get("cookies", []) if c.get("expiry", now + 1) > now]
+        if not cookies:
+            self.clear()
+            return None
+        payload["cookies"] = cookies
+        return payload
+
+    def restore(self, driver, url):
+        """在第一次導覽前注入 cookies 與 localStorage，然後只導覽一次"""
+        payload = self.load()
+        if not payload:
+            return False
+
+        try:
+            script_id = self._inject_with_cdp(driver, payload)
+            driver.get(url)
+            if script_id:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+        except (AttributeError, WebDriverException):
+            # 不支援 CDP 的 driver：先進入網域再設定 cookies
+            try:
+                driver.get(url)
+                for cookie in payload["cookies"]:
+                    driver.add_cookie({k: v for k, v in cookie.items() if k != "sameSite"})
+                self._set_local_storage(driver, payload["local_storage"])
+                driver.refresh()
+            except WebDriverException as e:
+                print(f"⚠️ 還原登入狀態失敗: {e}")
+                return False
+        return True
+
+    @staticmethod
+    def _inject_with_cdp(driver, payload):
+        for cookie in payload["cookies"]:
+            params = {
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": cookie.get("domain"),
+                "path": cookie.get("path", "/"),
+                "secure": cookie.get("secure", False),
+                "httpOnly": cookie.get("httpOnly", False),
+            }
+            if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+                params["sameSite"] = cookie["sameSite"]
+            if "expiry" in cookie:
+                params["expires"] = cookie["expiry"]
+            driver.execute_cdp_cmd("Network.setCookie", params)
+
+        if payload["local_storage"]:
+            origin = "{0.scheme}://{0.netloc}".format(urlparse(payload["url"]))
+            script = (
+                f"if (location.origin === {json.dumps(origin)}) {{"
+                f" var d = {json.dumps(payload['local_storage'])};"
+                " for (var k in d) { localStorage.setItem(k, d[k]); } }"
+            )
+            result = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})
+            return result.get("identifier")
+        return None
+
+    @staticmethod
+    def _set_local_storage(driver, local_storage):
+        for key, value in local_storage.items():
+            driver.execute_script("localStorage.setItem(arguments[0], arguments[1]);", key, value)
+
+    def clear(self):
+        """刪除保存的登入狀態"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,89 @@
+"""
+請求合併模組
+同時間的相同請求共用一次執行結果 (single-flight)，並讓同一帳號的打卡依序執行
+"""
+import threading
+from contextlib import contextmanager
+
+
+class _Call:
+    """執行中的單一請求"""
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """相同 key 的並行呼叫只執行一次，其他呼叫等待並共用結果或例外"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """執行 fn，若相同 key 已在執行中則等待其結果"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                # forget() 之後同一個 key 可能已有新的呼叫，只移除自己的記錄
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            if call.waiters:
+                print(f"🔗 合併了 {call.waiters} 個相同的請求: {key}")
+            call.done.set()
+
+    def forget(self, key):
+        """讓之後的呼叫不再共用執行中的結果（例如打卡後，打卡前開始的抓取已過時）"""
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def in_flight(self, key):
+        """檢查 key 是否正在執行中"""
+        with self._lock:
+            return key in self._calls
+
+
+class KeyedLock:
+    """依 key 分開的互斥鎖，用來讓同一帳號的打卡依序執行"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+
+    @contextmanager
+    def hold(self, key):
+        """以 with 區塊持有 key 對應的鎖"""
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
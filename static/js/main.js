@@ -2,6 +2,8 @@
 
 // 全域變數
 let autoRefreshInterval;
+let eventSource;
+const eventHandlers = {};
 
 // 頁面載入完成後執行
 document.addEventListener('DOMContentLoaded', function() {
@@ -37,7 +39,13 @@ function initializePage() {
 
 // 設定自動重新整理
 function setupAutoRefresh() {
-    // 每30秒自動重新整理打卡狀態
+    // 瀏覽器支援 Server-Sent Events 時由伺服器推送更新
+    if (window.EventSource) {
+        connectEvents();
+        return;
+    }
+
+    // 否則每30秒自動重新整理打卡狀態
     autoRefreshInterval = setInterval(() => {
         if (typeof getAttendanceStatus === 'function') {
             getAttendanceStatus();
@@ -45,6 +53,97 @@ function setupAutoRefresh() {
     }, 30000);
 }
 
+// 連線到伺服器事件推送
+function connectEvents() {
+    eventSource = new EventSource('/events');
+    ['status', 'status_error', 'log', 'job'].forEach(name => {
+        eventSource.addEventListener(name, event => {
+            const data = JSON.parse(event.data);
+            (eventHandlers[name] || []).slice().forEach(handler => handler(data));
+        });
+    });
+}
+
+// 註冊伺服器事件的處理函式
+function onServerEvent(name, handler) {
+    if (!eventHandlers[name]) {
+        eventHandlers[name] = [];
+    }
+    eventHandlers[name].push(handler);
+}
+
+// 移除伺服器事件的處理函式
+function offServerEvent(name, handler) {
+    const handlers = eventHandlers[name] || [];
+    const index = handlers.indexOf(handler);
+    if (index >= 0) {
+        handlers.splice(index, 1);
+    }
+}
+
+// 等待背景工作完成（有事件推送時等待 job 事件，否則輪詢）
+function waitForJob(jobId, onDone, interval = 1000) {
+    let finished = false;
+    const isDone = job => job.status === 'succeeded' || job.status === 'failed';
+    const finish = job => {
+        if (finished) return;
+        finished = true;
+        offServerEvent('job', handleJobEvent);
+        onDone(job);
+    };
+    const handleJobEvent = job => {
+        if (job.id === jobId && isDone(job)) {
+            finish(job);
+        }
+    };
+
+    if (eventSource) {
+        onServerEvent('job', handleJobEvent);
+    }
+
+    const poll = () => {
+        fetch(`/jobs/${jobId}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    finish({ status: 'failed', error: data.message });
+                } else if (isDone(data.job)) {
+                    finish(data.job);
+                } else if (!eventSource && !finished) {
+                    setTimeout(poll, interval);
+                }
+            })
+            .catch(error => finish({ status: 'failed', error: `查詢工作失敗: ${error}` }));
+    };
+    // 先查詢一次，避免工作在註冊事件前就已完成
+    poll();
+}
+
+// 在日誌區塊加入一筆新的記錄
+function appendLogEntry(container, line, maxEntries) {
+    if (!container) return;
+    const entry = document.createElement('div');
+    entry.className = 'log-entry';
+    const time = document.createElement('span');
+    time.className = 'log-time';
+    time.textContent = line.slice(0, 19);
+    const message = document.createElement('span');
+    message.className = 'log-message';
+    message.textContent = line.slice(20);
+    entry.append(time, ' ', message);
+
+    const placeholder = container.querySelector('.text-muted');
+    if (placeholder) placeholder.remove();
+    container.appendChild(entry);
+
+    if (maxEntries) {
+        const entries = container.querySelectorAll('.log-entry');
+        for (let i = 0; i < entries.length - maxEntries; i++) {
+            entries[i].remove();
+        }
+    }
+}
+
 // 格式化時間
 function formatTime(timeString) {
     if (!timeString) return '-';
@@ -218,6 +317,9 @@ window.addEventListener('beforeunload', function() {
     if (autoRefreshInterval) {
         clearInterval(autoRefreshInterval);
     }
+    if (eventSource) {
+        eventSource.close();
+    }
 });
 
 // 錯誤處理
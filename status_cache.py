@@ -0,0 +1,95 @@
+"""
+打卡狀態快取模組
+快取最近一次抓取的打卡狀態，過期後先回傳舊資料並在背景更新 (stale-while-revalidate)
+"""
+import time
+import threading
+from config import Config
+
+
+class StatusCache:
+    """具 TTL 與背景更新的打卡狀態快取
+
+    資料在 ttl 秒內直接回傳；超過 ttl 但未超過 ttl + max_stale 時回傳舊資料並在背景更新；
+    更久或沒有資料時同步抓取。打卡後呼叫 invalidate() 讓下一次讀取重新抓取。
+    資料內容改變時會呼叫 on_update(新資料)。
+    """
+
+    def __init__(self, fetch, ttl=None, max_stale=None, on_update=None):
+        self._fetch = fetch
+        self._on_update = on_update
+        self._last_published = None
+        self.ttl = Config.STATUS_CACHE_TTL if ttl is None else ttl
+        self.max_stale = Config.STATUS_CACHE_MAX_STALE if max_stale is None else max_stale
+        self._lock = threading.Lock()
+        self._value = None
+        self._updated_at = None
+        self._generation = 0
+        self._refreshing = False
+        # 背景更新進行中又被 invalidate(refresh=True) 時，完成後要再抓一次的版本
+        self._rerun_generation = None
+
+    def _store(self, value, generation):
+        """只在期間沒有被 invalidate 時才寫入，避免打卡前開始的抓取覆蓋新狀態"""
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._value = value
+            self._updated_at = time.monotonic()
+            changed = value != self._last_published
+            self._last_published = value
+        if changed and self._on_update:
+            try:
+                self._on_update(value)
+            except Exception as e:
+                print(f"⚠️ 打卡狀態更新通知失敗: {e}")
+        return True
+
+    def _refresh_in_background(self, generation):
+        def refresh():
+            current = generation
+            while True:
+                try:
+                    self._store(self._fetch(), current)
+                except Exception as e:
+                    print(f"⚠️ 背景更新打卡狀態失敗: {e}")
+                with self._lock:
+                    # 抓取期間快取被清除（例如剛打卡），這次的結果已被捨棄，為新版本再抓一次
+                    if self._rerun_generation is None:
+                        self._refreshing = False
+                        return
+                    current, self._rerun_generation = self._rerun_generation, None
+
+        threading.Thread(target=refresh, name="status-cache-refresh", daemon=True).start()
+
+    def get(self):
+        """取得打卡狀態，回傳 (資料, 資料年齡秒數)"""
+        with self._lock:
+            generation = self._generation
+            age = None if self._updated_at is None else time.monotonic() - self._updated_at
+            if age is not None and age <= self.ttl:
+                return self._value, age
+            if age is not None and age <= self.ttl + self.max_stale:
+                if not self._refreshing:
+                    self._refreshing = True
+                    self._refresh_in_background(generation)
+                return self._value, age
+
+        value = self._fetch()
+        self._store(value, generation)
+        return value, 0.0
+
+    def invalidate(self, refresh=False):
+        """清除快取；refresh=True 時立即在背景抓取新狀態"""
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self._updated_at = None
+            generation = self._generation
+            start = refresh and not self._refreshing
+            if start:
+                self._refreshing = True
+            elif refresh:
+                self._rerun_generation = generation
+        if start:
+            self._refresh_in_background(generation)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+測試打卡資料庫
+驗證打卡結果與打卡記錄的寫入、每日工時統計、WAL 模式與索引查詢
+"""
+import os
+import time
+import sqlite3
+import datetime
+import tempfile
+from attendance_store import DEFERRED, SKIPPED, SUCCESS, AttendanceStore
+
+
+def test_punches_and_records():
+    """測試寫入與查詢"""
+    print("🧪 開始測試打卡資料寫入...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AttendanceStore(os.path.join(tmp, "attendance.db"))
+        day = datetime.date(2025, 9, 1)
+        store.record_punch("上班", SUCCESS, "上班打卡成功", account="john",
+                           when=datetime.datetime(2025, 9, 1, 8, 50))
+        store.record_punch("下班", DEFERRED, "未滿 8 小時", work_hours=7.5, account="john",
+                           when=datetime.datetime(2025, 9, 1, 18, 15))
+        store.save_records([{"check_in": "08:50", "check_out": ""}], date=day, account="john")
+        # 同一天再次寫入時以最新的解析結果取代
+        store.save_records([
+            {"check_in": "08:50", "check_out": "12:00"},
+            {"check_in": "13:00", "check_out": "18:00"},
+        ], date=day, account="john")
+        # 頁面尚未載入時解析到的空結果不會清掉已保存的記錄
+        store.save_records([], date=day, account="john")
+        store.flush()
+
+        punches = store.punches(account="john")
+        records = store.records(day, account="john")
+        hours = store.daily_hours(day, day, account="john")
+        summary = store.outcome_summary(day, day, account="john")
+        journal = store._query("PRAGMA journal_mode")[0][0]
+        store.close()
+
+        print(f"   打卡結果: {[(p['time'], p['action'], p['outcome']) for p in punches]}")
+        print(f"   打卡記錄: {records}")
+        print(f"   每日工時: {hours}")
+        print(f"   結果統計: {summary}, journal_mode: {journal}")
+        if (len(punches) == 2 and punches[0]["action"] == "下班" and len(records) == 2
+                and abs(hours[day] - 8.17) < 0.01 and summary[("上班", SUCCESS)] == 1 and journal == "wal"):
+            print("   ✅ 打卡資料正確寫入與查詢")
+        else:
+            print("   ❌ 打卡資料寫入錯誤")
+
+
+def test_batched_history_query():
+    """測試大量寫入以批次提交，歷史查詢使用索引"""
+    print("\n🧪 開始測試批次寫入與歷史查詢...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AttendanceStore(os.path.join(tmp, "attendance.db"), batch_size=500)
+        start = datetime.date(2023, 1, 1)
+        started = time.perf_counter()
+        for offset in range(3 * 365):
+            day = start + datetime.timedelta(days=offset)
+            for action in ("上班", "午休下班", "午休上班", "下班"):
+                store.record_punch(action, SUCCESS if offset % 10 else SKIPPED, account="john",
+                                   when=datetime.datetime.combine(day, datetime.time(9)))
+            store.save_records([{"check_in": "09:00", "check_out": "18:00"}], date=day, account="john")
+        store.flush()
+        write_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        month = store.punches(datetime.date(2024, 6, 1), datetime.date(2024, 6, 30), account="john", action="下班")
+        query_time = time.perf_counter() - started
+        plan = " ".join(str(row) for row in store._query(
+            "EXPLAIN QUERY PLAN SELECT * FROM punches WHERE account = ? AND date BETWEEN ? AND ?",
+            ("john", "2024-06-01", "2024-06-30"),
+        ))
+        store.close()
+
+        print(f"   寫入 {3 * 365 * 4} 筆打卡結果: {write_time * 1000:.0f} ms")
+        print(f"   查詢一個月: {len(month)} 筆, {query_time * 1000:.2f} ms")
+        if len(month) == 30 and "USING INDEX" in plan:
+            print("   ✅ 歷史查詢使用索引")
+        else:
+            print(f"   ❌ 查詢計畫未使用索引: {plan}")
+
+
+def test_failed_write_isolated():
+    """測試寫入失敗時只捨棄出錯的那一項，且刪除與寫入一起回復"""
+    print("\n🧪 開始測試寫入失敗的處理...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AttendanceStore(os.path.join(tmp, "attendance.db"))
+        day = datetime.date(2025, 9, 1)
+        store.save_records([{"check_in": "08:50", "check_out": "18:00"}], date=day, account="john")
+        store.flush()
+
+        put = store._queue.put
+        writes = []
+        store._queue.put = writes.append
+        store.record_punch("上班", SUCCESS, account="john", when=datetime.datetime(2025, 9, 1, 8, 50))
+        # 刪除成功但寫入失敗的記錄更新：整項回復，不能留下當天沒有記錄的狀態
+        store.save_records([{"check_in": "09:00", "check_out": ""}], date=day, account="john")
+        writes[-1][1] = ("INSERT INTO missing_table VALUES (?)", [(1,)])
+        store.record_punch("下班", SUCCESS, account="john", when=datetime.datetime(2025, 9, 1, 18, 0))
+        store._queue.put = put
+
+        conn = store._connect()
+        store._commit(conn, writes)
+        conn.close()
+        punches = store.punches(account="john")
+        records = store.records(day, account="john")
+        store.close()
+
+    print(f"   打卡結果: {[p['action'] for p in punches]}, 打卡記錄: {records}")
+    if len(punches) == 2 and records == [{"check_in": "08:50", "check_out": "18:00"}]:
+        print("   ✅ 只捨棄出錯的寫入，原本的記錄保留")
+    else:
+        print("   ❌ 寫入失敗處理錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 打卡資料庫測試程式啟動...")
+    test_punches_and_records()
+    test_batched_history_query()
+    test_failed_write_isolated()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+測試多帳號批次打卡
+驗證帳號清單讀取、各帳號在工作行程中切換登入資訊，以及行程池平行處理的吞吐量
+"""
+import os
+import json
+import time
+import tempfile
+from config import Config
+from accounts import AccountsError, load_accounts
+from attendance_store import FAILED, SUCCESS
+import attendance_store
+import batch_checkin
+import mail_queue
+import notification_digest
+from batch_checkin import summarize
+from dispatcher import Dispatcher
+
+
+def fake_runner(label, source):
+    """模擬打卡：需時 0.3 秒，帳號名稱含 locked 時登入失敗"""
+    time.sleep(0.3)
+    if "locked" in Config.USERNAME:
+        raise RuntimeError(f"{Config.USERNAME} 登入失敗")
+    return SUCCESS
+
+
+def write_accounts(directory, accounts):
+    path = os.path.join(directory, "accounts.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(accounts, f)
+    return path
+
+
+def test_load_accounts():
+    """測試帳號清單讀取與驗證"""
+    print("🧪 開始測試帳號清單...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_accounts(tmp, [
+            {"username": "alice", "password": "a", "name": "Alice"},
+            {"username": "bob", "password": "b", "enabled": False},
+            {"username": "carol", "password": "c", "email_to": "carol@example.com"},
+        ])
+        accounts = load_accounts(path)
+        everyone = load_accounts(path, include_disabled=True)
+
+        errors = 0
+        for broken in ([{"username": "dave"}], [{"username": "x", "password": "1"}, {"username": "x", "password": "2"}]):
+            try:
+                load_accounts(write_accounts(tmp, broken))
+            except AccountsError as e:
+                print(f"   格式錯誤: {e}")
+                errors += 1
+
+    print(f"   啟用帳號: {[a['username'] for a in accounts]}")
+    if [a["username"] for a in accounts] == ["alice", "carol"] and len(everyone) == 3 and errors == 2:
+        print("   ✅ 帳號清單讀取正確，停用帳號被略過")
+    else:
+        print("   ❌ 帳號清單讀取錯誤")
+
+
+def test_parallel_batch():
+    """測試行程池平行打卡與每個帳號的結果"""
+    print("\n🧪 開始測試平行批次打卡...")
+    accounts = [{"username": f"user{i}", "password": "x"} for i in range(7)]
+    accounts.append({"username": "locked-user", "password": "x"})
+    # 不限速且不分散開始時間，只驗證行程池的平行處理
+    dispatcher = Dispatcher(rate_per_minute=0, window=0, workers=4, runner=fake_runner)
+    results, elapsed = dispatcher.run(accounts, "上班")
+    summary = summarize(results, elapsed)
+
+    by_user = {r["username"]: r for r in results}
+    print(f"   {len(accounts)} 個帳號, 4 個行程, 耗時 {elapsed:.2f} 秒 (逐一執行約需 {0.3 * len(accounts):.1f} 秒)")
+    print(f"   結果: {summary['outcomes']}, {summary['per_minute']:.0f} 帳號/分鐘")
+    if (len(results) == 8 and summary["outcomes"] == {SUCCESS: 7, FAILED: 1}
+            and "locked-user" in by_user["locked-user"].get("error", "")
+            and elapsed < 0.3 * len(accounts)):
+        print("   ✅ 各帳號以自己的登入資訊平行打卡")
+    else:
+        print(f"   ❌ 批次打卡結果錯誤: {results}")
+
+
+def test_worker_cleanup():
+    """測試工作行程結束時依順序關閉已建立的資源"""
+    print("\n🧪 開始測試工作行程清理...")
+    closed = []
+
+    class FakeResource:
+        def __init__(self, name):
+            self.name = name
+
+        def close(self):
+            closed.append(self.name)
+
+    originals = (notification_digest._digest, mail_queue._mail_queue, attendance_store._store)
+    notification_digest._digest = FakeResource("digest")
+    mail_queue._mail_queue = FakeResource("mail_queue")
+    attendance_store._store = None
+    try:
+        batch_checkin._close_worker_resources()
+    finally:
+        notification_digest._digest, mail_queue._mail_queue, attendance_store._store = originals
+
+    print(f"   關閉順序: {closed}")
+    if closed == ["digest", "mail_queue"]:
+        print("   ✅ 先送出通知摘要再關閉郵件佇列，未建立的資源略過")
+    else:
+        print("   ❌ 工作行程清理錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 多帳號批次打卡測試程式啟動...")
+    test_load_accounts()
+    test_parallel_batch()
+    test_worker_cleanup()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+測試精簡瀏覽器設定
+不啟動 Chrome，驗證 lean / standard 設定的參數、載入策略、資源封鎖與 RSS 計算
+"""
+import os
+from fnmatch import fnmatch
+from selenium.common.exceptions import WebDriverException
+from bench_browser_profile import process_tree_rss
+from web_automation import BLOCKED_URL_PATTERNS, LEAN_CHROME_ARGS, WebAutomation
+
+
+class FakeDriver:
+    """記錄收到的 CDP 指令"""
+
+    def __init__(self, fail=False):
+        self.commands = []
+        self.fail = fail
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.fail:
+            raise WebDriverException("cdp unavailable")
+        self.commands.append((cmd, params))
+
+
+def test_profile_options():
+    """測試兩種設定的 Chrome 參數與載入策略"""
+    print("🧪 開始測試瀏覽器設定...")
+    standard = WebAutomation.chrome_options("standard")
+    lean = WebAutomation.chrome_options("lean")
+
+    print(f"   standard: {len(standard.arguments)} 個參數, 載入策略 {standard.page_load_strategy}")
+    print(f"   lean: {len(lean.arguments)} 個參數, 載入策略 {lean.page_load_strategy}")
+    if (standard.page_load_strategy == "normal" and not set(LEAN_CHROME_ARGS) & set(standard.arguments)
+            and lean.page_load_strategy == "eager" and set(LEAN_CHROME_ARGS) <= set(lean.arguments)
+            and "--headless" in lean.arguments
+            and lean.to_capabilities()["goog:loggingPrefs"] == {"performance": "ALL"}):
+        print("   ✅ lean 設定加上精簡參數與 eager 載入，仍保留 performance log")
+    else:
+        print("   ❌ 瀏覽器設定錯誤")
+
+
+def test_block_resources():
+    """測試以 CDP 封鎖圖片、字型與分析追蹤"""
+    print("\n🧪 開始測試資源封鎖...")
+    driver = FakeDriver()
+    WebAutomation.block_resources(driver)
+    blocked = dict(driver.commands).get("Network.setBlockedURLs", {}).get("urls", [])
+    print(f"   封鎖 {len(blocked)} 種網址")
+    # 帶查詢字串的網址也要符合，頁面本身不能被擋
+    urls = ["https://attendance.example.com/logo.png?v=3", "https://attendance.example.com/fonts/a.woff2#iefix",
+            "https://www.google-analytics.com/analytics.js"]
+    page = "https://attendance.example.com/checkin"
+    if (blocked == BLOCKED_URL_PATTERNS and all(any(fnmatch(url, p) for p in blocked) for url in urls)
+            and not any(fnmatch(page, p) for p in blocked)):
+        print("   ✅ 已設定資源封鎖")
+    else:
+        print("   ❌ 資源封鎖設定錯誤")
+
+    # CDP 無法使用時不影響打卡
+    WebAutomation.block_resources(FakeDriver(fail=True))
+    print("   ✅ CDP 無法使用時略過封鎖")
+
+
+def test_process_tree_rss():
+    """測試 RSS 計算"""
+    print("\n🧪 開始測試 RSS 計算...")
+    rss = process_tree_rss(os.getpid())
+    if rss is None:
+        print("   ⚠️ 沒有 /proc，略過")
+    elif rss > 0:
+        print(f"   ✅ 目前行程 RSS: {rss / 1024 / 1024:.1f} MB")
+    else:
+        print("   ❌ RSS 計算錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 精簡瀏覽器設定測試程式啟動...")
+    test_profile_options()
+    test_block_resources()
+    test_process_tree_rss()
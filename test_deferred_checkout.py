@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+測試延後下班打卡
+驗證延後工作的保存與清除，以及等待期間瀏覽器會被關閉、到時間才重新啟動
+"""
+import os
+import datetime
+import tempfile
+from contextlib import contextmanager
+from config import Config
+from deferred_jobs import AUTO_CHECKOUT_SOURCE, UNDER_HOURS_SOURCE, DeferredJobStore
+from attendance_parser import AttendanceParser
+from email_service import EmailService
+from web_automation import WebAutomation
+
+
+class FakeButton:
+    text = "Check out"
+
+    def __init__(self):
+        self.clicked = False
+
+    def click(self):
+        self.clicked = True
+
+
+class FakeDriver:
+    def __init__(self):
+        self.button = FakeButton()
+
+    def find_elements(self, by, value):
+        return [self.button]
+
+    def quit(self):
+        pass
+
+
+class FakeAutomation(WebAutomation):
+    """記錄瀏覽器啟動與關閉時機的 WebAutomation"""
+
+    def __init__(self, events):
+        super().__init__()
+        self.session_store = None
+        self.events = events
+
+    def setup_driver(self):
+        self.events.append("setup")
+        self.driver = FakeDriver()
+
+    def login(self):
+        self.events.append("login")
+        return True
+
+    def quit(self):
+        if self.driver:
+            self.events.append("quit")
+        self.driver = None
+
+    def _sleep_until(self, target_time):
+        self.events.append(f"sleep {'browser' if self.driver else 'no-browser'}")
+
+
+def test_store_roundtrip():
+    """測試延後工作的保存、取代與清除"""
+    print("🧪 開始測試延後工作保存...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DeferredJobStore(os.path.join(tmp, "jobs.json"))
+        now = datetime.datetime(2025, 9, 1, 15, 0)
+        store.add(datetime.datetime(2025, 8, 29, 18, 0), "下班", "舊工作")
+        store.add(datetime.datetime(2025, 9, 1, 17, 0), "下班", AUTO_CHECKOUT_SOURCE)
+        job = store.add(datetime.datetime(2025, 9, 1, 17, 30), "下班", AUTO_CHECKOUT_SOURCE)
+
+        pending = store.pending(now=now)
+        print(f"   待執行工作: {[(j['fire_at'], j['source']) for j in pending]}")
+        store.remove(job["id"])
+        after = store.pending(now=now)
+
+        if len(pending) == 1 and pending[0]["id"] == job["id"] and after == []:
+            print("   ✅ 舊工作被清除、同來源工作被取代")
+        else:
+            print("   ❌ 延後工作保存錯誤")
+
+        # 排程打卡只移除一般的到期工作，自動下班偵測的工作保留
+        auto = store.add(datetime.datetime(2025, 9, 1, 17, 0), "下班", AUTO_CHECKOUT_SOURCE)
+        store.add(datetime.datetime(2025, 9, 1, 17, 0), "下班", UNDER_HOURS_SOURCE)
+        store.remove_due("下班", now=datetime.datetime(2025, 9, 1, 18, 0), exclude_source=AUTO_CHECKOUT_SOURCE)
+        left = store.pending(now=now)
+        if [j["id"] for j in left] == [auto["id"]]:
+            print("   ✅ 到期工作被移除，自動下班偵測的工作保留")
+        else:
+            print(f"   ❌ 到期工作移除錯誤: {left}")
+
+
+@contextmanager
+def checkin_settings(enabled=True, skip_today=False):
+    """讓今天視為工作日，並設定自動打卡開關與請假日"""
+    originals = (Config.WORK_DAYS, Config.AUTO_CHECKIN_ENABLED, set(Config.SKIP_DATES))
+    Config.WORK_DAYS = list(range(7))
+    Config.AUTO_CHECKIN_ENABLED = enabled
+    Config.SKIP_DATES.clear()
+    if skip_today:
+        Config.SKIP_DATES.add(datetime.date.today())
+    try:
+        yield
+    finally:
+        Config.WORK_DAYS, Config.AUTO_CHECKIN_ENABLED, skip_dates = originals
+        Config.SKIP_DATES.clear()
+        Config.SKIP_DATES.update(skip_dates)
+
+
+@contextmanager
+def temporary_job_store():
+    """讓 DeferredJobStore() 使用暫存檔案"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DeferredJobStore(os.path.join(tmp, "jobs.json"))
+        original_init = DeferredJobStore.__init__
+        DeferredJobStore.__init__ = lambda self, path=None: original_init(self, store.path)
+        try:
+            yield store
+        finally:
+            DeferredJobStore.__init__ = original_init
+
+
+def test_skip_rechecked_on_resume():
+    """測試接續延後打卡時重新檢查請假日與自動打卡開關"""
+    print("\n🧪 開始測試接續時重新檢查請假日...")
+    results = {}
+    for name, settings in {"請假日": {"skip_today": True}, "已停用": {"enabled": False}}.items():
+        with checkin_settings(**settings), temporary_job_store() as store:
+            job = store.add(datetime.datetime.now(), "下班", AUTO_CHECKOUT_SOURCE)
+            events = []
+            success = FakeAutomation(events).run_deferred_checkout(job)
+            results[name] = (success, events, len(store.pending()))
+
+    print(f"   結果: {results}")
+    if results == {"請假日": (False, [], 0), "已停用": (False, [], 1)}:
+        print("   ✅ 請假日取消延後工作，停用時保留工作，都不啟動瀏覽器")
+    else:
+        print("   ❌ 接續延後打卡時沒有重新檢查")
+
+
+def test_browser_released_while_waiting():
+    """測試等待期間不保留瀏覽器"""
+    print("\n🧪 開始測試等待期間釋放瀏覽器...")
+    original_records = AttendanceParser.get_today_attendance_records
+    original_notify = EmailService.send_checkin_notification
+    AttendanceParser.get_today_attendance_records = staticmethod(
+        lambda driver, mode=None: [{"check_in": "09:00", "check_out": ""}]
+    )
+    EmailService.send_checkin_notification = staticmethod(lambda *args, **kwargs: True)
+    try:
+        with checkin_settings(), temporary_job_store() as store:
+            job = store.add(datetime.datetime.now(), "下班", AUTO_CHECKOUT_SOURCE)
+
+            events = []
+            automation = FakeAutomation(events)
+            automation.driver = FakeDriver()
+            success = automation.run_deferred_checkout(job)
+
+            print(f"   事件順序: {events}")
+            print(f"   剩餘工作: {len(store.pending())}")
+            if success and events == ["quit", "sleep no-browser", "setup", "login"] and not store.pending():
+                print("   ✅ 等待前關閉瀏覽器，到時間才重新登入打卡")
+            else:
+                print("   ❌ 延後打卡流程錯誤")
+    finally:
+        AttendanceParser.get_today_attendance_records = original_records
+        EmailService.send_checkin_notification = original_notify
+
+
+if __name__ == "__main__":
+    print("🔔 延後下班打卡測試程式啟動...")
+    test_store_roundtrip()
+    test_browser_released_while_waiting()
+    test_skip_rechecked_on_resume()
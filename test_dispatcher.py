@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+測試批次打卡調度
+驗證令牌桶限速、登入失敗時的自動放慢、時間窗內的隨機分散，以及實際行程池調度
+"""
+import time
+import random
+from config import Config
+from attendance_store import LOGIN_FAILED, SUCCESS
+from dispatcher import AdaptiveRate, Dispatcher, TokenBucket, jitter_schedule
+
+
+class FakeClock:
+    """可控制的時鐘，sleep 只會推進時間"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def fake_runner(label, source):
+    """模擬打卡：帳號名稱含 locked 時登入失敗"""
+    time.sleep(0.05)
+    return LOGIN_FAILED if "locked" in Config.USERNAME else SUCCESS
+
+
+def test_token_bucket():
+    """測試令牌桶允許短暫連續登入，之後依速率放行"""
+    print("🧪 開始測試令牌桶...")
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=clock, sleep=clock.sleep)
+    times = []
+    for _ in range(5):
+        bucket.acquire()
+        times.append(round(clock.now, 2))
+    print(f"   取得令牌的時間: {times}")
+    if times == [0.0, 0.0, 1.0, 2.0, 3.0]:
+        print("   ✅ 連續兩次後每秒放行一次")
+    else:
+        print("   ❌ 令牌桶速率錯誤")
+
+    bucket.rate = 0.5
+    bucket.acquire()
+    print(f"   降速後下一次: {clock.now:.2f}")
+    if round(clock.now, 2) == 5.0:
+        print("   ✅ 調整速率立即生效")
+    else:
+        print("   ❌ 調整速率未生效")
+
+
+def test_adaptive_rate():
+    """測試登入失敗時減半、成功時逐步恢復"""
+    print("\n🧪 開始測試自動放慢...")
+    rate = AdaptiveRate(max_rate=1.0, min_rate=0.2)
+    after_failures = [round(rate.on_failure(), 3) for _ in range(4)]
+    after_successes = [round(rate.on_success(), 3) for _ in range(10)]
+    print(f"   連續失敗: {after_failures}")
+    print(f"   之後成功: {after_successes}")
+    if after_failures == [0.5, 0.25, 0.2, 0.2] and after_successes[0] == 0.3 and after_successes[-1] == 1.0:
+        print("   ✅ 失敗時減半且不低於下限，成功時逐步恢復到上限")
+    else:
+        print("   ❌ 速率調整錯誤")
+
+
+def test_jitter_schedule():
+    """測試每個帳號在時間窗內隨機分散開始"""
+    print("\n🧪 開始測試隨機分散...")
+    accounts = [{"username": f"user{i}"} for i in range(100)]
+    schedule = jitter_schedule(accounts, 300, random.Random(7))
+    offsets = [offset for offset, _ in schedule]
+    print(f"   最早 {offsets[0]:.1f} 秒, 最晚 {offsets[-1]:.1f} 秒")
+    if (offsets == sorted(offsets) and 0 <= offsets[0] and offsets[-1] < 300
+            and len({a["username"] for _, a in schedule}) == 100 and offsets[-1] - offsets[0] > 200):
+        print("   ✅ 開始時間分散在時間窗內")
+    else:
+        print("   ❌ 開始時間分散錯誤")
+
+
+def test_dispatch_with_process_pool():
+    """測試實際以行程池調度，限速並在登入失敗後放慢"""
+    print("\n🧪 開始測試行程池調度...")
+    accounts = [{"username": f"user{i}", "password": "x"} for i in range(5)]
+    accounts.insert(0, {"username": "locked-user", "password": "x"})
+    dispatcher = Dispatcher(rate_per_minute=600, burst=1, window=0, min_rate_per_minute=60,
+                            workers=4, runner=fake_runner)
+    rates = []
+    results, elapsed = dispatcher.run(accounts, "上班", on_result=lambda r: rates.append(dispatcher.bucket.rate * 60))
+
+    outcomes = sorted(r["outcome"] for r in results)
+    print(f"   結果: {outcomes}, 耗時 {elapsed:.2f} 秒")
+    print(f"   每個結果後的登入速率 (次/分鐘): {[round(r) for r in rates]}")
+    # 每秒 10 次且不能連續登入時，6 個帳號至少需要 0.5 秒；登入失敗後速率減半，之後逐步恢復
+    if (outcomes == [LOGIN_FAILED] + [SUCCESS] * 5 and elapsed >= 0.5
+            and min(rates) <= 300 and rates[-1] > min(rates)):
+        print("   ✅ 依速率送出登入，登入失敗後放慢")
+    else:
+        print("   ❌ 調度結果錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 批次打卡調度測試程式啟動...")
+    test_token_bucket()
+    test_adaptive_rate()
+    test_jitter_schedule()
+    test_dispatch_with_process_pool()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+測試瀏覽器驅動池
+使用假的瀏覽器驗證借出、歸還、健康檢查與閒置回收邏輯
+"""
+import time
+from selenium.common.exceptions import WebDriverException
+from config import Config
+from driver_pool import DriverPool, LoginFailedError
+
+
+class FakeDriver:
+    """模擬 Selenium driver"""
+
+    def __init__(self):
+        self.alive = True
+        self.refreshes = 0
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise WebDriverException("browser closed")
+        return "https://attendance.example.com"
+
+    @property
+    def window_handles(self):
+        return ["main"] if self.alive else []
+
+    def refresh(self):
+        self.refreshes += 1
+
+    def find_elements(self, by, value):
+        return ["Check in"]
+
+    def quit(self):
+        self.alive = False
+
+
+class FakeAutomation:
+    """模擬 WebAutomation"""
+    launched = 0
+
+    def __init__(self):
+        self.driver = None
+        self.logins = 0
+        self.resets = 0
+
+    def setup_driver(self):
+        FakeAutomation.launched += 1
+        self.driver = FakeDriver()
+
+    def login(self):
+        self.logins += 1
+        return Config.PASSWORD != "wrong"
+
+    def reset_session(self):
+        self.resets += 1
+
+    def quit(self):
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+
+
+def test_driver_reuse():
+    """測試同一個瀏覽器會被重複使用"""
+    print("🧪 開始測試驅動池重複使用...")
+    FakeAutomation.launched = 0
+    pool = DriverPool(size=1, idle_timeout=0, factory=FakeAutomation)
+
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    print(f"   啟動次數: {FakeAutomation.launched}")
+    print(f"   重新整理次數: {second.driver.refreshes}")
+    if FakeAutomation.launched == 1 and first is second and second.driver.refreshes == 1:
+        print("   ✅ 瀏覽器被重複使用，只需重新整理頁面")
+    else:
+        print("   ❌ 瀏覽器沒有被重複使用")
+    pool.shutdown()
+
+
+def test_unhealthy_driver_replaced():
+    """測試失效的瀏覽器會被替換"""
+    print("\n🧪 開始測試健康檢查...")
+    FakeAutomation.launched = 0
+    pool = DriverPool(size=1, idle_timeout=0, factory=FakeAutomation)
+
+    with pool.lease() as automation:
+        crashed_driver = automation.driver
+    crashed_driver.alive = False
+
+    with pool.lease() as automation:
+        replaced = automation.driver is not crashed_driver
+
+    print(f"   啟動次數: {FakeAutomation.launched}")
+    if replaced and FakeAutomation.launched == 2:
+        print("   ✅ 失效的瀏覽器已被替換")
+    else:
+        print("   ❌ 失效的瀏覽器沒有被替換")
+    pool.shutdown()
+
+
+def test_idle_eviction():
+    """測試閒置瀏覽器會被回收"""
+    print("\n🧪 開始測試閒置回收...")
+    pool = DriverPool(size=2, idle_timeout=0.05, factory=FakeAutomation)
+    pool.warm_up()
+    print(f"   預熱後狀態: {pool.stats()}")
+
+    time.sleep(0.1)
+    pool.evict_idle()
+    stats = pool.stats()
+    print(f"   回收後狀態: {stats}")
+    if stats["total"] == 0 and stats["idle"] == 0:
+        print("   ✅ 閒置瀏覽器已被關閉")
+    else:
+        print("   ❌ 閒置瀏覽器沒有被關閉")
+    pool.shutdown()
+
+
+def test_error_discards_driver():
+    """測試使用過程出錯時不會歸還瀏覽器"""
+    print("\n🧪 開始測試錯誤處理...")
+    pool = DriverPool(size=1, idle_timeout=0, factory=FakeAutomation)
+
+    try:
+        with pool.lease():
+            raise RuntimeError("punch failed")
+    except RuntimeError:
+        pass
+
+    stats = pool.stats()
+    print(f"   出錯後狀態: {stats}")
+    if stats["total"] == 0:
+        print("   ✅ 出錯的瀏覽器已被關閉")
+    else:
+        print("   ❌ 出錯的瀏覽器被放回驅動池")
+    pool.shutdown()
+
+
+def test_account_switch():
+    """測試切換帳號時沿用同一個瀏覽器並重新登入"""
+    print("\n🧪 開始測試切換帳號...")
+    original_username = Config.USERNAME
+    pool = DriverPool(size=1, idle_timeout=0, factory=FakeAutomation)
+    try:
+        Config.USERNAME = "alice"
+        with pool.lease() as first:
+            pass
+        Config.USERNAME = "bob"
+        with pool.lease() as second:
+            pass
+        with pool.lease() as third:
+            pass
+    finally:
+        Config.USERNAME = original_username
+        pool.shutdown()
+
+    print(f"   同一個瀏覽器: {first is second is third}, 登入次數: {second.logins}, 清除登入狀態: {second.resets}")
+    if first is second is third and second.logins == 2 and second.resets == 1:
+        print("   ✅ 切換帳號時重新登入，相同帳號直接沿用")
+    else:
+        print("   ❌ 切換帳號處理錯誤")
+
+
+def test_account_switch_login_failure():
+    """測試切換帳號後登入失敗時直接回報，不另開瀏覽器重試"""
+    print("\n🧪 開始測試切換帳號登入失敗...")
+    original = (Config.USERNAME, Config.PASSWORD)
+    FakeAutomation.launched = 0
+    pool = DriverPool(size=1, idle_timeout=0, factory=FakeAutomation)
+    raised = False
+    try:
+        Config.USERNAME, Config.PASSWORD = "alice", "secret"
+        with pool.lease() as first:
+            pass
+        Config.USERNAME, Config.PASSWORD = "bob", "wrong"
+        try:
+            with pool.lease():
+                pass
+        except LoginFailedError:
+            raised = True
+        Config.USERNAME, Config.PASSWORD = "alice", "secret"
+        with pool.lease() as third:
+            pass
+    finally:
+        Config.USERNAME, Config.PASSWORD = original
+        pool.shutdown()
+
+    print(f"   登入失敗: {raised}, 啟動次數: {FakeAutomation.launched}, 登入次數: {first.logins}")
+    if raised and FakeAutomation.launched == 1 and first is third and first.logins == 3:
+        print("   ✅ 只登入一次就回報失敗，瀏覽器留給下一個帳號")
+    else:
+        print("   ❌ 登入失敗時仍另開瀏覽器重試")
+
+
+if __name__ == "__main__":
+    print("🔔 驅動池測試程式啟動...")
+    test_driver_reuse()
+    test_unhealthy_driver_replaced()
+    test_idle_eviction()
+    test_error_discards_driver()
+    test_account_switch()
+    test_account_switch_login_failure()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+測試 ChromeDriver 解析快取
+驗證 Chrome 未更新時直接使用 manifest，下載失敗時使用離線快取
+"""
+import os
+import tempfile
+from unittest.mock import patch
+from driver_resolver import DriverResolver
+
+
+def test_manifest_fast_path():
+    """測試第二次解析不會再呼叫 webdriver-manager"""
+    print("🧪 開始測試 manifest 快速路徑...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chrome = os.path.join(tmp, "chrome")
+        driver = os.path.join(tmp, "chromedriver")
+        for path in (chrome, driver):
+            with open(path, "w") as f:
+                f.write("bin")
+
+        resolver = DriverResolver(cache_dir=tmp)
+        with patch.object(DriverResolver, "find_chrome_binary", return_value=chrome), \
+             patch.object(DriverResolver, "probe_chrome_version", return_value="120.0.6099.109"), \
+             patch.object(DriverResolver, "_install", return_value=driver) as install:
+            first = resolver.resolve()
+            second = resolver.resolve()
+
+        print(f"   第一次: {first}")
+        print(f"   第二次: {second}")
+        print(f"   webdriver-manager 呼叫次數: {install.call_count}")
+        if first == second == driver and install.call_count == 1:
+            print("   ✅ 第二次解析直接使用快取")
+        else:
+            print("   ❌ 快取沒有生效")
+
+
+def test_offline_fallback():
+    """測試下載失敗時使用主版本相同的快取 driver"""
+    print("\n🧪 開始測試離線備援...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chrome = os.path.join(tmp, "chrome")
+        old_driver = os.path.join(tmp, "chromedriver-119")
+        for path in (chrome, old_driver):
+            with open(path, "w") as f:
+                f.write("bin")
+
+        resolver = DriverResolver(cache_dir=tmp)
+        resolver.save_manifest({"entries": {
+            "old-chrome": {
+                "chrome_version": "120.0.6099.71",
+                "driver_path": old_driver,
+                "resolved_at": "2024-01-01 00:00:00",
+            }
+        }})
+
+        with patch.object(DriverResolver, "find_chrome_binary", return_value=chrome), \
+             patch.object(DriverResolver, "probe_chrome_version", return_value="120.0.6099.109"), \
+             patch.object(DriverResolver, "_install", side_effect=ConnectionError("offline")):
+            result = resolver.resolve()
+
+        print(f"   解析結果: {result}")
+        if result == old_driver:
+            print("   ✅ 離線時使用快取的 driver")
+        else:
+            print("   ❌ 離線備援失敗")
+
+
+if __name__ == "__main__":
+    print("🔔 ChromeDriver 解析測試程式啟動...")
+    test_manifest_fast_path()
+    test_offline_fallback()
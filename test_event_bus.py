@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+測試事件推送
+驗證事件發布給所有訂閱者、日誌追蹤只推送新增的完整行，以及 /events 串流內容
+"""
+import os
+import tempfile
+from event_bus import EventBus, LogFollower, format_sse
+
+
+def test_publish_subscribe():
+    """測試事件送到每個訂閱者，慢速連線只保留最新事件"""
+    print("🧪 開始測試事件發布...")
+    bus = EventBus()
+    first = bus.subscribe()
+    second = bus.subscribe()
+    bus.publish("status", {"status": "checked_in"})
+    received = [first.get(timeout=1), second.get(timeout=1)]
+
+    for i in range(150):
+        bus.publish("log", f"line {i}")
+    backlog = []
+    while True:
+        item = first.get(timeout=0)
+        if item is None:
+            break
+        backlog.append(item)
+    bus.unsubscribe(second)
+
+    print(f"   收到的事件: {received}")
+    print(f"   慢速連線保留 {len(backlog)} 筆，最新: {backlog[-1][1]}")
+    if (received == [("status", {"status": "checked_in"})] * 2 and len(backlog) == 100
+            and backlog[-1] == ("log", "line 149") and bus.subscriber_count == 1):
+        print("   ✅ 事件正確推送")
+    else:
+        print("   ❌ 事件推送錯誤")
+
+
+def test_log_follower():
+    """測試只推送新增的完整日誌行"""
+    print("\n🧪 開始測試日誌追蹤...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "attendance_log.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[2025-09-01 08:50:00] 舊記錄\n")
+
+        bus = EventBus()
+        subscription = bus.subscribe()
+        follower = LogFollower(path, bus, interval=60)
+        follower.start()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("[2025-09-01 12:15:00] 手動午休下班\n[2025-09-01 13:1")
+        first = follower.poll()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("5:00] 手動午休上班\n")
+        second = follower.poll()
+        follower.stop()
+
+        print(f"   第一次: {first}")
+        print(f"   第二次: {second}")
+        if (first == ["[2025-09-01 12:15:00] 手動午休下班"]
+                and second == ["[2025-09-01 13:15:00] 手動午休上班"]
+                and subscription.get(timeout=0) == ("log", first[0])):
+            print("   ✅ 只推送新的完整行")
+        else:
+            print("   ❌ 日誌追蹤錯誤")
+
+
+def test_events_endpoint():
+    """測試 /events 連線後先送出狀態，再推送工作事件"""
+    print("\n🧪 開始測試 /events 串流...")
+    import app as web
+
+    original_get = web.status_cache.get
+    web.status_cache.get = lambda: ({"status": "checked_in", "records": [], "work_hours": 1.5}, 0.0)
+    try:
+        response = web.app.test_client().get("/events", buffered=False)
+        chunks = iter(response.response)
+        retry = next(chunks).decode("utf-8")
+        status = next(chunks).decode("utf-8")
+        web.event_bus.publish("job", {"id": "abc", "status": "succeeded"})
+        job = next(chunks).decode("utf-8")
+        response.close()
+
+        print(f"   Content-Type: {response.content_type}")
+        print(f"   狀態事件: {status.strip()}")
+        expected = format_sse("job", {"id": "abc", "status": "succeeded"})
+        if (response.content_type.startswith("text/event-stream") and retry.startswith("retry:")
+                and status.startswith("event: status") and job == expected):
+            print("   ✅ 串流送出狀態與工作事件")
+        else:
+            print("   ❌ 事件串流錯誤")
+    finally:
+        web.status_cache.get = original_get
+        web.log_follower.stop()
+
+
+if __name__ == "__main__":
+    print("🔔 事件推送測試程式啟動...")
+    test_publish_subscribe()
+    test_log_follower()
+    test_events_endpoint()
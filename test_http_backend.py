@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+測試 HTTP 打卡
+以假的 Session 模擬打卡網站 API，驗證登入、狀態判斷、打卡與改用瀏覽器的時機
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+import requests
+import attendance_store
+import driver_pool
+import http_backend
+from accounts import apply_account
+from attendance_store import AttendanceStore, FAILED, SKIPPED, SUCCESS
+from config import Config
+from email_service import EmailService
+from http_backend import HttpBackendError, HttpPunchClient, punch_via_http
+import main
+from work_hours import current_time
+
+# 測試用的 API 設定（實際使用時需依網站設定）
+API_SETTINGS = {
+    "HTTP_API_BASE": "https://attendance.example.com/",
+    "HTTP_LOGIN_PATH": "/api/login",
+    "HTTP_RECORDS_PATH": "/api/attendance/today",
+    "HTTP_PUNCH_PATH": "/api/attendance/punch",
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        if self._data is None:
+            raise ValueError("no json")
+        return self._data
+
+
+class FakeSession(requests.Session):
+    """模擬打卡網站：記錄收到的請求，依設定回應打卡記錄"""
+
+    def __init__(self, records, login_status=200, login_data=None, punch_status=200):
+        super().__init__()
+        self.records = records
+        self.login_status = login_status
+        self.punch_status = punch_status
+        self.login_data = {"token": "abc"} if login_data is None else login_data
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        if url.endswith(Config.HTTP_LOGIN_PATH):
+            # 網站不論登入成敗都會發 session cookie
+            self.cookies.set("sid", "anonymous")
+            return FakeResponse(self.login_status, self.login_data or None)
+        if url.endswith(Config.HTTP_RECORDS_PATH):
+            return FakeResponse(200, {"records": self.records})
+        if url.endswith(Config.HTTP_PUNCH_PATH):
+            if self.punch_status >= 500:
+                # 網站已打卡但回應錯誤
+                self.records = self.records + [{"checkIn": "08:50", "checkOut": ""}]
+                return FakeResponse(self.punch_status)
+            self.records = self.records + [{"checkIn": "08:50", "checkOut": ""}]
+            return FakeResponse(200, {})
+        return FakeResponse(404)
+
+    def punched(self):
+        return any(url.endswith(Config.HTTP_PUNCH_PATH) for _, url in self.calls)
+
+
+@contextmanager
+def fake_environment():
+    """使用暫存資料庫、記錄通知、設定 API，並讓今天視為工作日"""
+    originals = (attendance_store._store, EmailService.send_checkin_notification,
+                 Config.WORK_DAYS, Config.AUTO_CHECKIN_ENABLED, set(Config.SKIP_DATES))
+    original_settings = {name: getattr(Config, name) for name in API_SETTINGS}
+    notifications = []
+    with tempfile.TemporaryDirectory() as tmp:
+        attendance_store._store = AttendanceStore(os.path.join(tmp, "attendance.db"))
+        EmailService.send_checkin_notification = staticmethod(
+            lambda result, label, **kwargs: notifications.append((label, result)))
+        Config.WORK_DAYS = list(range(7))
+        Config.AUTO_CHECKIN_ENABLED = True
+        Config.SKIP_DATES.clear()
+        for name, path in API_SETTINGS.items():
+            setattr(Config, name, path)
+        try:
+            yield notifications
+        finally:
+            attendance_store._store.close()
+            (attendance_store._store, EmailService.send_checkin_notification,
+             Config.WORK_DAYS, Config.AUTO_CHECKIN_ENABLED, skip_dates) = originals
+            Config.SKIP_DATES.update(skip_dates)
+            for name, path in original_settings.items():
+                setattr(Config, name, path)
+
+
+def test_http_punch():
+    """測試依打卡狀態以 HTTP 打卡或略過"""
+    print("🧪 開始測試 HTTP 打卡...")
+    with fake_environment() as notifications:
+        session = FakeSession([])
+        outcome = punch_via_http("上班", client=HttpPunchClient(session, "https://attendance.example.com/login"))
+        print(f"   上班: {outcome}, 請求: {[m for m, _ in session.calls]}, 通知: {notifications}")
+        if outcome == SUCCESS and session.punched() and session.headers.get("Authorization") == "Bearer abc":
+            print("   ✅ 未上班時以 HTTP 打卡成功")
+        else:
+            print("   ❌ HTTP 打卡失敗")
+
+        session = FakeSession([{"check_in": "08:50", "check_out": ""}])
+        outcome = punch_via_http("上班", client=HttpPunchClient(session, "https://attendance.example.com/"))
+        if outcome == SKIPPED and not session.punched():
+            print("   ✅ 已上班時略過，不送出打卡")
+        else:
+            print("   ❌ 已上班時仍送出打卡")
+
+
+def test_fallback_cases():
+    """測試需要改用瀏覽器的情況"""
+    print("\n🧪 開始測試改用瀏覽器的情況...")
+    with fake_environment():
+        cases = {
+            "工時不足": ("下班", FakeSession([{"check_in": current_time().strftime("%H:%M"), "check_out": ""}])),
+            "登入失敗": ("上班", FakeSession([], login_status=401)),
+            "登入頁 HTML": ("上班", FakeSession([], login_data={})),
+        }
+        for name, (label, session) in cases.items():
+            try:
+                punch_via_http(label, client=HttpPunchClient(session, "https://attendance.example.com/"))
+                print(f"   ❌ {name}: 沒有要求改用瀏覽器")
+            except HttpBackendError as e:
+                if session.punched():
+                    print(f"   ❌ {name}: 已送出打卡")
+                else:
+                    print(f"   ✅ {name}: {e}")
+
+    # 未設定 API時不猜測路徑，也不送出任何請求
+    with fake_environment():
+        Config.HTTP_LOGIN_PATH = None
+        session = FakeSession([])
+        try:
+            punch_via_http("上班", client=HttpPunchClient(session, "https://attendance.example.com/"))
+            print("   ❌ 未設定路徑: 沒有要求改用瀏覽器")
+        except HttpBackendError as e:
+            if session.calls:
+                print(f"   ❌ 未設定路徑: 仍送出請求 {session.calls}")
+            else:
+                print(f"   ✅ 未設定路徑: {e}")
+
+
+def test_run_checkin_falls_back_to_browser():
+    """測試 run_checkin 在 HTTP 失敗時改用瀏覽器"""
+    print("\n🧪 開始測試 run_checkin 改用瀏覽器...")
+    used = []
+
+    class FakeAutomation:
+        def punch_in(self, label):
+            used.append(label)
+            return SUCCESS
+
+    class FakePool:
+        @contextmanager
+        def lease(self):
+            yield FakeAutomation()
+
+    originals = (Config.PUNCH_BACKEND, driver_pool.get_driver_pool, http_backend.get_http_session)
+    Config.PUNCH_BACKEND = "http"
+    driver_pool.get_driver_pool = lambda: FakePool()
+    http_backend.get_http_session = lambda: FakeSession([], login_status=500)
+    try:
+        with fake_environment():
+            outcome = main.run_checkin("上班", source="測試")
+    finally:
+        Config.PUNCH_BACKEND, driver_pool.get_driver_pool, http_backend.get_http_session = originals
+
+    if outcome == SUCCESS and used == ["上班"]:
+        print("   ✅ HTTP 無法打卡時改由瀏覽器完成")
+    else:
+        print(f"   ❌ 沒有改用瀏覽器: {outcome}, {used}")
+
+
+def test_uncertain_punch_not_retried():
+    """測試打卡請求送出後出錯時回報失敗，不改用瀏覽器再打一次"""
+    print("\n🧪 開始測試打卡結果不明...")
+    used = []
+
+    class FakeAutomation:
+        def punch_in(self, label):
+            used.append(label)
+            return SUCCESS
+
+    class FakePool:
+        @contextmanager
+        def lease(self):
+            yield FakeAutomation()
+
+    originals = (Config.PUNCH_BACKEND, driver_pool.get_driver_pool, http_backend.get_http_session)
+    Config.PUNCH_BACKEND = "http"
+    driver_pool.get_driver_pool = lambda: FakePool()
+    http_backend.get_http_session = lambda: FakeSession([], punch_status=503)
+    try:
+        with fake_environment() as notifications:
+            outcome = main.run_checkin("上班", source="測試")
+    finally:
+        Config.PUNCH_BACKEND, driver_pool.get_driver_pool, http_backend.get_http_session = originals
+
+    print(f"   結果: {outcome}, 通知: {notifications}")
+    if outcome == FAILED and not used and notifications:
+        print("   ✅ 回報失敗並通知，沒有改用瀏覽器重複打卡")
+    else:
+        print(f"   ❌ 打卡結果不明時仍改用瀏覽器: {outcome}, {used}")
+
+
+def test_backend_per_account():
+    """測試每個帳號可以選擇打卡方式，未指定時使用 .env 的設定"""
+    print("\n🧪 開始測試每個帳號的打卡方式...")
+    original = (Config.USERNAME, Config.PASSWORD, Config.PUNCH_BACKEND)
+    default_backend = Config.PUNCH_BACKEND
+    try:
+        apply_account({"username": "alice", "password": "a", "backend": "http"})
+        alice = Config.PUNCH_BACKEND
+        apply_account({"username": "bob", "password": "b"})
+        bob = Config.PUNCH_BACKEND
+    finally:
+        Config.USERNAME, Config.PASSWORD, Config.PUNCH_BACKEND = original
+    print(f"   alice: {alice}, bob: {bob}")
+    if alice == "http" and bob == default_backend:
+        print("   ✅ 切換帳號時打卡方式跟著切換")
+    else:
+        print("   ❌ 打卡方式沒有跟著帳號切換")
+
+
+if __name__ == "__main__":
+    print("🔔 HTTP 打卡測試程式啟動...")
+    test_http_punch()
+    test_fallback_cases()
+    test_run_checkin_falls_back_to_browser()
+    test_uncertain_punch_not_retried()
+    test_backend_per_account()
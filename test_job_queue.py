@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+測試背景工作佇列
+驗證手動打卡立即回傳工作編號、背景執行完成後可透過 /jobs/<id> 查詢結果
+"""
+import os
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from job_queue import FAILED, SUCCEEDED, Job, JobQueue
+
+
+def wait_finished(job, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_submit_returns_immediately():
+    """測試加入工作不等待執行完成"""
+    print("🧪 開始測試立即回傳...")
+    queue = JobQueue(workers=2)
+    release = threading.Event()
+    progress = []
+
+    def slow_punch(job, action):
+        job.update("打卡中")
+        progress.append(job.progress)
+        release.wait(2)
+        return f"{action} 打卡完成"
+
+    started = time.perf_counter()
+    job = queue.submit("manual_checkin", slow_punch, "上班")
+    elapsed = time.perf_counter() - started
+    status_before = job.status
+    release.set()
+    wait_finished(job)
+
+    print(f"   加入耗時: {elapsed * 1000:.1f} ms, 加入後狀態: {status_before}")
+    print(f"   進度: {progress}, 最終狀態: {job.status}, 結果: {job.result}")
+    if elapsed < 0.1 and job.status == SUCCEEDED and job.result == "上班 打卡完成" and progress == ["打卡中"]:
+        print("   ✅ 工作在背景執行並回報進度")
+    else:
+        print("   ❌ 背景工作執行錯誤")
+    queue.shutdown()
+
+
+def test_failure_recorded():
+    """測試失敗的工作保留錯誤訊息"""
+    print("\n🧪 開始測試失敗記錄...")
+    queue = JobQueue(workers=1)
+
+    def failing(job):
+        raise RuntimeError("登入失敗")
+
+    job = queue.submit("manual_checkin", failing)
+    wait_finished(job)
+    print(f"   狀態: {job.status}, 錯誤: {job.error}")
+    if job.status == FAILED and job.error == "登入失敗" and queue.get(job.id) is job:
+        print("   ✅ 失敗原因可供查詢")
+    else:
+        print("   ❌ 失敗記錄錯誤")
+    queue.shutdown()
+
+
+def test_jobs_endpoint():
+    """測試 /manual_checkin 與 /jobs/<id> 端點"""
+    print("\n🧪 開始測試工作查詢端點...")
+    import app as web
+
+    original = web.run_manual_checkin
+    web.run_manual_checkin = lambda job, action: f"打卡成功: {action} 打卡完成"
+    try:
+        client = web.app.test_client()
+        response = client.post("/manual_checkin", data={"action": "上班"})
+        job_id = response.get_json()["job_id"]
+        wait_finished(web.job_queue.get(job_id))
+        job = client.get(f"/jobs/{job_id}").get_json()["job"]
+        missing = client.get("/jobs/unknown")
+
+        print(f"   建立回應: {response.status_code}, 工作狀態: {job['status']}, 結果: {job['result']}")
+        if response.status_code == 202 and job["status"] == SUCCEEDED and missing.status_code == 404:
+            print("   ✅ 端點立即回傳並可查詢結果")
+        else:
+            print("   ❌ 工作查詢端點錯誤")
+    finally:
+        web.run_manual_checkin = original
+
+
+def test_manual_checkin_outcomes():
+    """測試手動打卡依 punch_in 的結果回報成功、略過或失敗"""
+    print("\n🧪 開始測試手動打卡結果...")
+    import app as web
+    from attendance_store import FAILED as PUNCH_FAILED, LOGIN_FAILED, SKIPPED, SUCCESS
+
+    class FakePool:
+        def __init__(self, outcome):
+            self.outcome = outcome
+
+        @contextmanager
+        def lease(self):
+            yield SimpleNamespace(punch_in=lambda action: self.outcome)
+
+    originals = (web.get_driver_pool, web.LOG_FILE, web.status_cache.invalidate)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        web.LOG_FILE = os.path.join(tmp, "attendance_log.txt")
+        web.status_cache.invalidate = lambda refresh=False: None
+        try:
+            for outcome in (SUCCESS, SKIPPED, PUNCH_FAILED, LOGIN_FAILED):
+                web.get_driver_pool = lambda: FakePool(outcome)
+                try:
+                    results[outcome] = web.run_manual_checkin(Job("manual_checkin"), "上班")
+                except RuntimeError as e:
+                    results[outcome] = f"錯誤: {e}"
+        finally:
+            web.get_driver_pool, web.LOG_FILE, web.status_cache.invalidate = originals
+
+    print(f"   結果: {results}")
+    if (results[SUCCESS].startswith("打卡成功") and "略過" in results[SKIPPED]
+            and results[PUNCH_FAILED].startswith("錯誤") and results[LOGIN_FAILED].startswith("錯誤")):
+        print("   ✅ 失敗的打卡讓工作失敗，略過時回報略過")
+    else:
+        print("   ❌ 手動打卡結果回報錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 背景工作佇列測試程式啟動...")
+    test_submit_returns_immediately()
+    test_failure_recorded()
+    test_jobs_endpoint()
+    test_manual_checkin_outcomes()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+測試延遲匯入
+驗證寄信、以已保存記錄計算工時與設定檢查都不會載入 Selenium，並比較冷啟動匯入時間
+"""
+import os
+import sys
+import tempfile
+import subprocess
+from bench_import_time import BROWSERLESS_MODULES, measure_import
+
+
+def test_browserless_modules():
+    """測試不需要瀏覽器的模組不會載入 Selenium"""
+    print("🧪 開始測試不需要瀏覽器的模組...")
+    for module in BROWSERLESS_MODULES:
+        seconds, heavy = measure_import(module, runs=1)
+        if heavy:
+            print(f"   ❌ {module} 載入了 {', '.join(heavy)}")
+        else:
+            print(f"   ✅ {module}: {seconds * 1000:.1f} ms，未載入 Selenium")
+
+
+def test_cold_start_budget():
+    """測試 main 的冷啟動匯入時間低於載入瀏覽器自動化的模組"""
+    print("\n🧪 開始測試冷啟動匯入時間...")
+    main_time, _ = measure_import("main", runs=3)
+    browser_time, heavy = measure_import("web_automation", runs=3)
+    print(f"   main: {main_time * 1000:.1f} ms, web_automation: {browser_time * 1000:.1f} ms ({', '.join(heavy) or '-'})")
+    if main_time < browser_time:
+        print("   ✅ main 的冷啟動不需等待 Selenium 載入")
+    else:
+        print("   ❌ main 的冷啟動時間沒有低於 web_automation")
+
+
+def test_cached_hours_mode():
+    """測試 hours --cached 以打卡資料庫計算工時且不載入 Selenium"""
+    print("\n🧪 開始測試 hours --cached...")
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, ATTENDANCE_DB=os.path.join(tmp, "attendance.db"))
+        env.pop("GITHUB_ACTIONS", None)
+        seed = (
+            "from attendance_store import get_attendance_store\n"
+            "store = get_attendance_store()\n"
+            "store.save_records([{'check_in': '08:50', 'check_out': '12:00'}, {'check_in': '13:00', 'check_out': ''}])\n"
+            "store.flush()\n"
+        )
+        subprocess.run([sys.executable, "-c", seed], cwd=here, env=env, check=True, capture_output=True)
+        probe = (
+            "import sys\n"
+            "sys.argv = ['main.py', 'hours', '--cached']\n"
+            "import main\n"
+            "main.calculate_work_hours_mode()\n"
+            "print('SELENIUM_LOADED' if 'selenium' in sys.modules else 'SELENIUM_NOT_LOADED')\n"
+        )
+        output = subprocess.run([sys.executable, "-c", probe], cwd=here, env=env,
+                                capture_output=True, text=True).stdout
+
+    ok = "打卡記錄數量: 2" in output and "SELENIUM_NOT_LOADED" in output
+    if ok:
+        print("   ✅ 以已保存的打卡記錄計算工時，未載入 Selenium")
+    else:
+        print(f"   ❌ hours --cached 錯誤:\n{output}")
+
+
+if __name__ == "__main__":
+    print("🔔 延遲匯入測試程式啟動...")
+    test_browserless_modules()
+    test_cold_start_budget()
+    test_cached_hours_mode()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+測試日誌尾端讀取
+驗證分頁結果與整檔讀取一致、檔案變更後快取失效，以及大型日誌的讀取時間
+"""
+import os
+import time
+import tempfile
+from log_reader import LogReader, read_tail
+
+
+def legacy_pages(path, per_page):
+    """原本的做法：整檔讀入後過濾空白行"""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f.readlines() if line.strip()]
+    pages = []
+    end = len(lines)
+    while end > 0:
+        pages.append(lines[max(0, end - per_page):end])
+        end -= per_page
+    return pages
+
+
+def write_sample(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(f"[2025-09-01 08:{i % 60:02d}:00] 手動上班: 上班 打卡完成 #{i}\n")
+            if i % 7 == 0:
+                f.write("\n")
+        f.write("[2025-09-02 09:00:00] 最後一筆沒有換行")
+
+
+def test_pages_match_legacy():
+    """測試每一頁都與整檔讀取的結果相同"""
+    print("🧪 開始測試分頁結果...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "attendance_log.txt")
+        write_sample(path, 237)
+        expected = legacy_pages(path, 50)
+
+        pages = []
+        page = 0
+        has_more = True
+        while has_more:
+            lines, has_more = read_tail(path, 50, skip=page * 50, block_size=64)
+            pages.append(lines)
+            page += 1
+
+        print(f"   頁數: {len(pages)} (預期 {len(expected)})")
+        print(f"   第一頁最後一筆: {pages[0][-1]}")
+        if pages == expected:
+            print("   ✅ 所有分頁與整檔讀取一致")
+        else:
+            print("   ❌ 分頁結果不一致")
+
+
+def test_cache_invalidation():
+    """測試檔案新增記錄後快取失效"""
+    print("\n🧪 開始測試快取失效...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "attendance_log.txt")
+        write_sample(path, 10)
+        reader = LogReader(path, per_page=5)
+        first, _ = reader.page(1)
+        cached, _ = reader.page(1)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n[2025-09-02 18:00:00] 手動下班: 下班 打卡完成\n")
+        updated, _ = reader.page(1)
+
+        print(f"   快取命中: {first is cached}")
+        print(f"   新增後最新一筆: {updated[-1]}")
+        if first is cached and updated[-1].endswith("下班 打卡完成"):
+            print("   ✅ 檔案改變後重新讀取")
+        else:
+            print("   ❌ 快取失效錯誤")
+
+
+def test_large_log():
+    """測試大型日誌只讀取尾端"""
+    print("\n🧪 開始測試大型日誌...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "attendance_log.txt")
+        write_sample(path, 200000)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+
+        started = time.perf_counter()
+        legacy = legacy_pages(path, 50)[0]
+        legacy_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        lines, has_more = read_tail(path, 50)
+        tail_time = time.perf_counter() - started
+
+        print(f"   日誌大小: {size_mb:.1f} MB")
+        print(f"   整檔讀取: {legacy_time * 1000:.1f} ms, 尾端讀取: {tail_time * 1000:.2f} ms")
+        if lines == legacy and has_more and tail_time < legacy_time:
+            print("   ✅ 尾端讀取結果相同且更快")
+        else:
+            print("   ❌ 尾端讀取錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 日誌尾端讀取測試程式啟動...")
+    test_pages_match_legacy()
+    test_cache_invalidation()
+    test_large_log()
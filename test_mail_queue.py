@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+測試寄信佇列
+驗證 SMTP 連線重複使用、斷線重連、失敗重試退避、認證錯誤不重試與結束前送完佇列
+"""
+import time
+import smtplib
+import threading
+from email.mime.text import MIMEText
+from mail_queue import MailQueue, SMTPConnection
+
+
+class FakeSMTP:
+    """模擬 SMTP 伺服器，記錄登入與寄出的郵件"""
+
+    def __init__(self, stats, fail_sends=0, auth_error=False, delay=0):
+        self.stats = stats
+        self.fail_sends = fail_sends
+        self.auth_error = auth_error
+        self.delay = delay
+        self.open = True
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        if self.auth_error:
+            raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+        self.stats["logins"] += 1
+
+    def noop(self):
+        if not self.open:
+            raise smtplib.SMTPServerDisconnected("closed")
+        return (250, b"OK")
+
+    def send_message(self, msg):
+        if self.stats["failures"] < self.fail_sends:
+            self.stats["failures"] += 1
+            raise smtplib.SMTPServerDisconnected("connection lost")
+        time.sleep(self.delay)
+        self.stats["sent"].append(msg["Subject"])
+
+    def quit(self):
+        self.open = False
+
+
+def make_queue(**kwargs):
+    stats = {"logins": 0, "failures": 0, "sent": []}
+    servers = []
+
+    def factory():
+        server = FakeSMTP(stats, **kwargs)
+        servers.append(server)
+        return server
+
+    mail_queue = MailQueue(SMTPConnection(factory), max_retries=3, backoff_base=0.01,
+                           backoff_max=0.05, idle_timeout=60)
+    return mail_queue, stats, servers
+
+
+def make_message(subject):
+    msg = MIMEText("body")
+    msg["Subject"] = subject
+    return msg
+
+
+def test_connection_reuse():
+    """測試多封郵件共用同一條連線，斷線後自動重連"""
+    print("🧪 開始測試 SMTP 連線重複使用...")
+    mail_queue, stats, servers = make_queue()
+    for i in range(5):
+        mail_queue.send(make_message(f"通知 {i}"))
+    mail_queue.flush(timeout=5)
+    logins_before = stats["logins"]
+
+    # 模擬伺服器關閉閒置連線
+    servers[-1].open = False
+    job = mail_queue.send(make_message("斷線後"))
+    job.done.wait(5)
+    mail_queue.close(timeout=5)
+
+    print(f"   寄出: {len(stats['sent'])} 封, 登入次數: {logins_before} -> {stats['logins']}")
+    if logins_before == 1 and stats["logins"] == 2 and job.success and len(stats["sent"]) == 6:
+        print("   ✅ 連線重複使用，斷線後重新連線")
+    else:
+        print("   ❌ 連線重複使用錯誤")
+
+
+def test_retry_with_backoff():
+    """測試寄信失敗時以退避重試，認證錯誤不重試"""
+    print("\n🧪 開始測試失敗重試...")
+    mail_queue, stats, _ = make_queue(fail_sends=3)
+    job = mail_queue.send(make_message("重試"))
+    job.done.wait(5)
+    backoffs = [mail_queue.backoff(n) for n in range(1, 5)]
+    print(f"   嘗試次數: {job.attempts}, 成功: {job.success}, 退避秒數: {backoffs}")
+    if job.success and job.attempts == 2 and backoffs == [0.01, 0.02, 0.04, 0.05]:
+        print("   ✅ 失敗後重試成功")
+    else:
+        print("   ❌ 重試行為錯誤")
+
+    mail_queue, stats, servers = make_queue(auth_error=True)
+    job = mail_queue.send(make_message("認證錯誤"))
+    job.done.wait(5)
+    print(f"   認證錯誤 嘗試次數: {job.attempts}, 連線次數: {len(servers)}")
+    if not job.success and job.attempts == 1 and len(servers) == 1:
+        print("   ✅ 認證錯誤不重試")
+    else:
+        print("   ❌ 認證錯誤仍重試")
+
+
+def test_send_is_async_and_flush():
+    """測試 send() 不等待伺服器，close() 會送完佇列"""
+    print("\n🧪 開始測試非同步寄信與結束前送完...")
+    mail_queue, stats, _ = make_queue(delay=0.1)
+    started = time.perf_counter()
+    for i in range(3):
+        mail_queue.send(make_message(f"非同步 {i}"))
+    enqueue_time = time.perf_counter() - started
+    pending = mail_queue.pending()
+    mail_queue.close(timeout=5)
+    print(f"   放入佇列耗時: {enqueue_time * 1000:.1f} ms, 放入後待寄: {pending}, 寄出: {len(stats['sent'])}")
+    if enqueue_time < 0.1 and pending == 3 and len(stats["sent"]) == 3 and mail_queue.pending() == 0:
+        print("   ✅ 打卡流程不等待郵件伺服器，結束前送完佇列")
+    else:
+        print("   ❌ 非同步寄信錯誤")
+
+    threads = [t.name for t in threading.enumerate()]
+    print(f"   背景執行緒: {[name for name in threads if name == 'mail-queue']}")
+
+
+if __name__ == "__main__":
+    print("🔔 寄信佇列測試程式啟動...")
+    test_connection_reuse()
+    test_retry_with_backoff()
+    test_send_is_async_and_flush()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+測試通知摘要
+驗證成功通知合併寄出、失敗通知立即寄出，以及摘要視窗到期自動寄出
+"""
+import time
+from config import Config
+from email_service import EmailService
+import notification_digest
+from notification_digest import NotificationDigest
+
+
+def test_compose_and_flush():
+    """測試累積的通知合併成一封郵件"""
+    print("🧪 開始測試通知合併...")
+    sent = []
+    digest = NotificationDigest(lambda subject, body, wait=False: sent.append((subject, body)) or True, window=60)
+    digest.add("📅 自動打卡通知 - 上班", "動作: 上班\n結果: 上班打卡成功\n\n---\n自動打卡系統")
+    digest.add("📅 自動打卡通知 - 午休下班", "動作: 午休下班\n結果: 午休下班打卡成功\n\n---\n自動打卡系統")
+    pending = digest.pending()
+    digest.flush()
+
+    subject, body = sent[0]
+    print(f"   主旨: {subject}")
+    if (pending == 2 and len(sent) == 1 and "2 則通知" in subject and "上班打卡成功" in body
+            and "午休下班打卡成功" in body and body.count("自動打卡系統\n") == 0 and digest.pending() == 0):
+        print("   ✅ 通知合併成一封郵件")
+    else:
+        print(f"   ❌ 通知合併錯誤: {body}")
+
+    if not digest.flush():
+        print("   ✅ 沒有通知時不寄信")
+    else:
+        print("   ❌ 沒有通知時仍寄信")
+
+
+def test_window_expiry():
+    """測試摘要視窗到期後自動寄出"""
+    print("\n🧪 開始測試摘要視窗...")
+    sent = []
+    digest = NotificationDigest(lambda subject, body, wait=False: sent.append(subject) or True, window=0.2)
+    digest.add("通知 1", "結果: 成功")
+    digest.add("通知 2", "結果: 成功")
+    time.sleep(0.1)
+    before = len(sent)
+    time.sleep(0.3)
+    print(f"   視窗內寄出: {before}, 視窗後寄出: {len(sent)}")
+    if before == 0 and len(sent) == 1:
+        print("   ✅ 視窗到期後寄出一封摘要")
+    else:
+        print("   ❌ 摘要視窗錯誤")
+
+
+def test_urgent_bypasses_digest():
+    """測試啟用摘要時失敗通知仍立即寄出"""
+    print("\n🧪 開始測試失敗通知立即寄出...")
+    sent = []
+    original_send = EmailService.send_email
+    original_enabled = Config.NOTIFY_DIGEST_ENABLED
+    original_digest = notification_digest._digest
+    EmailService.send_email = staticmethod(lambda subject, body, wait=False: sent.append(subject) or True)
+    Config.NOTIFY_DIGEST_ENABLED = True
+    notification_digest._digest = NotificationDigest(EmailService.send_email, window=60)
+    try:
+        EmailService.send_checkin_notification("上班打卡成功", "上班", source="測試")
+        EmailService.send_checkin_notification("下班打卡成功", "下班", source="測試")
+        after_success = len(sent)
+        EmailService.send_checkin_notification("午休上班 失敗: timeout", "午休上班", source="測試", urgent=True)
+        after_failure = len(sent)
+        notification_digest._digest.flush()
+    finally:
+        EmailService.send_email = original_send
+        Config.NOTIFY_DIGEST_ENABLED = original_enabled
+        notification_digest._digest = original_digest
+
+    print(f"   成功通知後: {after_success} 封, 失敗通知後: {after_failure} 封, 合併後: {len(sent)} 封")
+    if after_success == 0 and after_failure == 1 and len(sent) == 2 and "2 則通知" in sent[1]:
+        print("   ✅ 失敗通知立即寄出，成功通知合併寄出")
+    else:
+        print(f"   ❌ 通知分流錯誤: {sent}")
+
+
+if __name__ == "__main__":
+    print("🔔 通知摘要測試程式啟動...")
+    test_compose_and_flush()
+    test_window_expiry()
+    test_urgent_bypasses_digest()
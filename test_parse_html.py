@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+測試離線 HTML 解析
+驗證 parse_html 可直接從儲存的頁面解析打卡記錄，不需要瀏覽器
+"""
+import os
+import datetime
+import tempfile
+from contextlib import redirect_stderr
+from attendance_parser import AttendanceParser
+import parse_pages
+
+SAVED_PAGE = """
+<html><body>
+<script>var template = '<div class="border px-3">09/03</div>';</script>
+<div class="border border-bottom-0 px-3 mb-3">
+  <div class="d-flex"><div>09/03 (Wed)</div><div>Total: 3.18 hours | 03:11</div></div>
+  <div class="row border-bottom hover-bg-primary-light">
+    <div class="col">Check in: <span>08:50</span></div>
+    <div class="col">Check out: <span>12:01</span></div>
+    <div class="col">Subtotal: 03:11</div>
+  </div>
+  <div class="row border-bottom hover-bg-primary-light">
+    <div class="col">Check in: 13:01</div>
+    <div class="col">Check out:</div>
+  </div>
+  <div class="row border-bottom hover-bg-primary-light">Eastern Time Zone UTC-5 21:50</div>
+</div>
+<div class="border border-bottom-0 px-3 mb-3">
+  <div class="d-flex"><div>09/02 (Tue)</div></div>
+  <div class="row border-bottom hover-bg-primary-light">
+    <div class="col">Check in: 08:50</div><div class="col">Check out: 17:53</div>
+  </div>
+</div>
+</body></html>
+"""
+
+
+def test_parse_html():
+    """測試不同日期與輸入型態的解析結果"""
+    print("🧪 開始測試離線 HTML 解析...")
+
+    test_cases = [
+        {
+            "name": "字串 HTML - 今日有兩段記錄",
+            "html": SAVED_PAGE,
+            "date": "09/03",
+            "expected": [{"check_in": "08:50", "check_out": "12:01"}, {"check_in": "13:01", "check_out": ""}],
+        },
+        {
+            "name": "bytes HTML - 以 date 物件指定日期",
+            "html": SAVED_PAGE.encode("utf-8"),
+            "date": datetime.date(2024, 9, 2),
+            "expected": [{"check_in": "08:50", "check_out": "17:53"}],
+        },
+        {
+            "name": "頁面中沒有該日期",
+            "html": SAVED_PAGE,
+            "date": "09/04",
+            "expected": [],
+        },
+    ]
+
+    for i, case in enumerate(test_cases, 1):
+        print(f"\n📋 測試案例 {i}: {case['name']}")
+        records = AttendanceParser.parse_html(case["html"], case["date"])
+        print(f"   預期: {case['expected']}")
+        print(f"   實際: {records}")
+        if records == case["expected"]:
+            print("   ✅ 解析正確")
+        else:
+            print("   ❌ 解析錯誤")
+
+    print("\n✅ 離線 HTML 解析測試完成")
+
+
+def test_parse_pages_workers():
+    """測試批次解析拒絕 0 個行程"""
+    print("\n🧪 開始測試批次解析的行程數...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "2025-09-03.html"), "w", encoding="utf-8") as f:
+            f.write(SAVED_PAGE)
+        try:
+            with open(os.devnull, "w") as devnull, redirect_stderr(devnull):
+                parse_pages.main([tmp, "--workers", "0"])
+            print("   ❌ --workers 0 沒有被拒絕")
+        except SystemExit as e:
+            if e.code == 2:
+                print("   ✅ --workers 0 顯示參數錯誤")
+            else:
+                print(f"   ❌ 結束代碼錯誤: {e.code}")
+
+
+if __name__ == "__main__":
+    print("🔔 離線 HTML 解析測試程式啟動...")
+    test_parse_html()
+    test_parse_pages_workers()
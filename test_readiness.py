@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+測試頁面就緒偵測
+驗證登入等待在按鈕出現時立即返回、登入失敗時提早結束，以及重試的指數退避
+"""
+import time
+from readiness import Readiness, backoff_delay
+
+
+class FakeDriver:
+    """模擬登入後經過數次輪詢才出現打卡按鈕的頁面"""
+
+    def __init__(self, button_after=None):
+        self.button_after = button_after
+        self.polls = 0
+        self.current_url = "https://attendance.example.com/login"
+
+    def find_elements(self, by, value):
+        self.polls += 1
+        if self.button_after is not None and self.polls > self.button_after:
+            return ["Check in"]
+        return []
+
+    def get_log(self, log_type):
+        return []
+
+
+def test_fast_login():
+    """測試按鈕出現後立即返回"""
+    print("🧪 開始測試快速登入...")
+    driver = FakeDriver(button_after=3)
+    started = time.monotonic()
+    ready = Readiness(driver, timeout=5, poll_interval=0.01).wait_for_login(driver.current_url)
+    elapsed = time.monotonic() - started
+
+    print(f"   登入結果: {ready}")
+    print(f"   等待時間: {elapsed * 1000:.0f} ms")
+    if ready and elapsed < 1:
+        print("   ✅ 登入成功立即返回，不再固定等待3秒")
+    else:
+        print("   ❌ 登入等待時間過長")
+
+
+def test_failed_login_settles_early():
+    """測試登入失敗時在網路閒置後提早結束"""
+    print("\n🧪 開始測試登入失敗提早結束...")
+    driver = FakeDriver(button_after=None)
+    started = time.monotonic()
+    ready = Readiness(driver, timeout=5, poll_interval=0.01).wait_for_login(
+        driver.current_url, settle_time=0.1
+    )
+    elapsed = time.monotonic() - started
+
+    print(f"   登入結果: {ready}")
+    print(f"   等待時間: {elapsed * 1000:.0f} ms")
+    if not ready and elapsed < 5:
+        print("   ✅ 登入失敗在逾時前就判定")
+    else:
+        print("   ❌ 登入失敗判定錯誤")
+
+
+def test_backoff_delays():
+    """測試重試等待時間呈指數成長且有上限"""
+    print("\n🧪 開始測試指數退避...")
+    delays = [backoff_delay(attempt, base=1, cap=8) for attempt in range(1, 7)]
+    print(f"   等待時間: {[round(d, 2) for d in delays]}")
+
+    growing = all(delays[i] < delays[i + 1] for i in range(3))
+    capped = all(d <= 8 * 1.1 for d in delays)
+    if growing and capped:
+        print("   ✅ 重試等待時間正確")
+    else:
+        print("   ❌ 重試等待時間錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 頁面就緒偵測測試程式啟動...")
+    test_fast_login()
+    test_failed_login_settles_early()
+    test_backoff_delays()
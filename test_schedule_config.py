@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+測試打卡時間設定
+驗證設定檔未變更時不重新解析、儲存時完整寫入，以及本地排程依設定檔重新計算
+"""
+import os
+import json
+import datetime
+import tempfile
+import schedule_config
+from schedule_config import ScheduleConfig
+from scheduler import PunchScheduler
+
+
+class CountingLoads:
+    """計算 json.load 被呼叫的次數"""
+
+    def __init__(self):
+        self.calls = 0
+        self.original = json.load
+
+    def __call__(self, f):
+        self.calls += 1
+        return self.original(f)
+
+
+def test_cached_load():
+    """測試設定檔沒有變更時直接使用快取"""
+    print("🧪 開始測試設定快取...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "schedule_config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"check_in_time": "09:00"}, f)
+
+        counter = CountingLoads()
+        schedule_config.json.load = counter
+        try:
+            config = ScheduleConfig(path)
+            first = config.load()
+            for _ in range(100):
+                config.load()
+            first["check_in_time"] = "被修改"
+            cached = config.load()
+        finally:
+            schedule_config.json.load = counter.original
+
+        print(f"   解析次數: {counter.calls}, 上班時間: {cached['check_in_time']}, 下班時間: {cached['check_out_time']}")
+        if counter.calls == 1 and cached["check_in_time"] == "09:00" and cached["check_out_time"] == "17:46":
+            print("   ✅ 101 次載入只解析一次，回傳的設定可安全修改")
+        else:
+            print("   ❌ 設定快取錯誤")
+
+
+def test_atomic_save():
+    """測試儲存後沒有留下暫存檔，且其他實例能偵測到變更"""
+    print("\n🧪 開始測試設定儲存...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "schedule_config.json")
+        web = ScheduleConfig(path)
+        scheduler_side = ScheduleConfig(path)
+        scheduler_side.load()
+
+        saved = web.save({"check_in_time": "08:30", "lunch_out_time": "12:00",
+                          "lunch_in_time": "13:00", "check_out_time": "17:30", "enabled": True})
+        changed = scheduler_side.changed()
+        reloaded = scheduler_side.load()
+
+        print(f"   儲存結果: {saved}, 目錄內容: {sorted(os.listdir(tmp))}")
+        print(f"   另一個實例偵測到變更: {changed}, 上班時間: {reloaded['check_in_time']}")
+        if saved and os.listdir(tmp) == ["schedule_config.json"] and changed and reloaded["check_in_time"] == "08:30":
+            print("   ✅ 設定完整寫入並可被偵測")
+        else:
+            print("   ❌ 設定儲存錯誤")
+
+
+def test_scheduler_uses_config():
+    """測試本地排程依設定檔的時間排程並在變更後重新計算"""
+    print("\n🧪 開始測試排程套用設定...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "schedule_config.json")
+        config = ScheduleConfig(path)
+        now = datetime.datetime(2025, 9, 1, 7, 0)
+        scheduler = PunchScheduler(lambda label: None, lambda date: config.punches(), clock=lambda: now)
+
+        default_first = scheduler.next_fire_time()
+        config.save({"check_in_time": "09:10", "lunch_out_time": "bad",
+                     "lunch_in_time": "13:00", "check_out_time": "18:00", "enabled": True})
+        scheduler.reload()
+        scheduler.next_fire_time()  # 觸發重新計算
+        jobs = [(job.when.strftime("%H:%M"), job.label) for job in scheduler.jobs()]
+        config.save(dict(config.load(), enabled=False))
+        scheduler.reload()
+        disabled = scheduler.next_fire_time()
+
+        print(f"   預設第一次打卡: {default_first:%H:%M}")
+        print(f"   變更後排程: {jobs}")
+        print(f"   停用後: {disabled}")
+        if (default_first.strftime("%H:%M") == "08:45"
+                and jobs == [("09:10", "上班"), ("13:00", "午休上班"), ("18:00", "下班")] and disabled is None):
+            print("   ✅ 排程依設定檔重新計算")
+        else:
+            print("   ❌ 排程未套用設定")
+
+
+if __name__ == "__main__":
+    print("🔔 打卡時間設定測試程式啟動...")
+    test_cached_load()
+    test_atomic_save()
+    test_scheduler_uses_config()
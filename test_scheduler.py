@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+測試打卡排程器
+驗證依時間執行打卡、換日重新計算排程、一次性延後工作，以及設定變更時的喚醒
+"""
+import time
+import datetime
+import threading
+from scheduler import PunchScheduler
+
+DAILY = [("08:50", "上班"), ("12:15", "午休下班"), ("13:15", "午休上班"), ("18:15", "下班")]
+
+
+class FakeClock:
+    """可手動調整的時鐘"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def weekday_planner(date):
+    return DAILY if date.weekday() < 5 else []
+
+
+def test_runs_due_jobs():
+    """測試只執行已到期的打卡"""
+    print("🧪 開始測試到期執行...")
+    clock = FakeClock(datetime.datetime(2025, 9, 1, 8, 0))
+    ran = []
+    scheduler = PunchScheduler(ran.append, weekday_planner, clock=clock)
+
+    first = scheduler.next_fire_time()
+    clock.now = datetime.datetime(2025, 9, 1, 12, 30)
+    scheduler.run_pending()
+    second = scheduler.next_fire_time()
+
+    print(f"   第一次打卡時間: {first}")
+    print(f"   已執行: {ran}")
+    print(f"   下次打卡時間: {second}")
+    if first.strftime("%H:%M") == "08:50" and ran == ["上班", "午休下班"] and second.strftime("%H:%M") == "13:15":
+        print("   ✅ 到期工作依序執行")
+    else:
+        print("   ❌ 到期工作執行錯誤")
+
+
+def test_daily_recompute():
+    """測試換日後重新計算排程，週末不排程"""
+    print("\n🧪 開始測試換日重新計算...")
+    clock = FakeClock(datetime.datetime(2025, 9, 5, 19, 0))  # 週五下班後
+    ran = []
+    scheduler = PunchScheduler(ran.append, weekday_planner, clock=clock)
+
+    friday = scheduler.next_fire_time()
+    clock.now = datetime.datetime(2025, 9, 6, 9, 0)  # 週六
+    saturday = scheduler.next_fire_time()
+    clock.now = datetime.datetime(2025, 9, 8, 0, 0, 1)  # 週一
+    monday = scheduler.next_fire_time()
+
+    print(f"   週五晚上: {friday}, 週六: {saturday}, 週一: {monday}")
+    if friday is None and saturday is None and monday == datetime.datetime(2025, 9, 8, 8, 50):
+        print("   ✅ 每日排程正確重新計算")
+    else:
+        print("   ❌ 每日排程計算錯誤")
+
+
+def test_one_shot_job():
+    """測試延後的下班打卡只執行一次"""
+    print("\n🧪 開始測試一次性工作...")
+    clock = FakeClock(datetime.datetime(2025, 9, 1, 18, 20))
+    ran = []
+    scheduler = PunchScheduler(ran.append, weekday_planner, clock=clock)
+    scheduler.schedule_once(datetime.datetime(2025, 9, 1, 18, 45), "下班")
+
+    clock.now = datetime.datetime(2025, 9, 1, 18, 50)
+    scheduler.run_pending()
+    clock.now = datetime.datetime(2025, 9, 2, 0, 0, 1)
+    scheduler.run_pending()
+    clock.now = datetime.datetime(2025, 9, 2, 18, 50)
+    scheduler.run_pending()
+
+    print(f"   已執行: {ran}")
+    if ran == ["下班", "上班", "午休下班", "午休上班", "下班"]:
+        print("   ✅ 延後打卡只執行一次，隔天照常排程")
+    else:
+        print("   ❌ 一次性工作執行錯誤")
+
+
+def test_reload_wakes_up():
+    """測試設定變更時立即喚醒並重新計算"""
+    print("\n🧪 開始測試設定變更喚醒...")
+    enabled = {"value": False}
+
+    def planner(date):
+        return [("23:59", "下班")] if enabled["value"] else []
+
+    scheduler = PunchScheduler(lambda label: None, planner)
+    thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    thread.start()
+    time.sleep(0.1)
+
+    before = scheduler.next_fire_time()
+    enabled["value"] = True
+    started = time.monotonic()
+    scheduler.reload()
+    after = scheduler.next_fire_time()
+    scheduler.stop()
+    thread.join(timeout=2)
+    elapsed = time.monotonic() - started
+
+    print(f"   重新載入前: {before}, 重新載入後: {after}")
+    print(f"   停止耗時: {elapsed * 1000:.0f} ms")
+    now = datetime.datetime.now()
+    expected = after is None if now.strftime("%H:%M") >= "23:59" else after is not None
+    if before is None and expected and not thread.is_alive():
+        print("   ✅ 排程器被喚醒並重新計算，可立即停止")
+    else:
+        print("   ❌ 排程器喚醒失敗")
+
+
+if __name__ == "__main__":
+    print("🔔 打卡排程器測試程式啟動...")
+    test_runs_due_jobs()
+    test_daily_recompute()
+    test_one_shot_job()
+    test_reload_wakes_up()
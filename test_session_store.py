@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+測試登入狀態保存
+驗證 cookies 加密保存、過期判斷與還原時只導覽一次
+"""
+import os
+import stat
+import time
+import base64
+import hashlib
+import tempfile
+from cryptography.fernet import Fernet, InvalidToken
+from session_store import SessionStore
+
+
+class FakeDriver:
+    """模擬支援 CDP 的 Selenium driver"""
+
+    def __init__(self, cookies=None):
+        self.current_url = "https://attendance.example.com/home"
+        self.cookies = cookies or []
+        self.visited = []
+        self.cdp_calls = []
+
+    def get_cookies(self):
+        return self.cookies
+
+    def execute_script(self, script, *args):
+        return {"token": "abc"}
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_calls.append(cmd)
+        return {"identifier": "1"}
+
+    def get(self, url):
+        self.visited.append(url)
+
+
+def test_save_and_restore():
+    """測試保存後可在新瀏覽器還原"""
+    print("🧪 開始測試登入狀態保存與還原...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(username="john", store_dir=tmp, secret="secret")
+        cookie = {"name": "sid", "value": "xyz", "domain": "attendance.example.com",
+                  "path": "/", "expiry": int(time.time()) + 3600}
+        store.save(FakeDriver(cookies=[cookie]))
+
+        with open(store.path, "rb") as f:
+            encrypted = b"xyz" not in f.read()
+        print(f"   檔案已加密: {encrypted}")
+
+        new_driver = FakeDriver()
+        restored = store.restore(new_driver, "https://attendance.example.com")
+        print(f"   還原結果: {restored}")
+        print(f"   導覽次數: {len(new_driver.visited)}")
+        print(f"   CDP 指令: {new_driver.cdp_calls}")
+
+        if encrypted and restored and len(new_driver.visited) == 1:
+            print("   ✅ 登入狀態還原只需一次導覽")
+        else:
+            print("   ❌ 登入狀態還原失敗")
+
+
+def test_expired_and_tampered_session():
+    """測試過期或被竄改的登入狀態不會被使用"""
+    print("\n🧪 開始測試過期與竄改...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(username="john", store_dir=tmp, secret="secret")
+        expired = {"name": "sid", "value": "old", "expiry": int(time.time()) - 10}
+        store.save(FakeDriver(cookies=[expired]))
+        expired_result = store.load()
+        print(f"   過期 cookies 讀取結果: {expired_result}")
+
+        store.save(FakeDriver(cookies=[{"name": "sid", "value": "new"}]))
+        other_key = SessionStore(username="john", store_dir=tmp, secret="another-secret")
+        tampered_result = other_key.load()
+        print(f"   錯誤金鑰讀取結果: {tampered_result}")
+        print(f"   檔案已清除: {not os.path.exists(store.path)}")
+
+        if expired_result is None and tampered_result is None:
+            print("   ✅ 無效的登入狀態已被捨棄")
+        else:
+            print("   ❌ 無效的登入狀態被使用")
+
+
+def test_random_key_and_password_change():
+    """測試未設定 SESSION_SECRET 時使用隨機金鑰檔，且密碼變更後登入狀態失效"""
+    print("\n🧪 開始測試隨機金鑰與密碼變更...")
+    cookie = {"name": "sid", "value": "xyz", "expiry": int(time.time()) + 3600}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(username="john", store_dir=tmp, password="hunter2")
+        store.save(FakeDriver(cookies=[cookie]))
+        mode = stat.S_IMODE(os.stat(store.key_path).st_mode)
+
+        # 不能再以帳號密碼推導出金鑰
+        guessed = Fernet(base64.urlsafe_b64encode(hashlib.sha256(b"john:hunter2").digest()))
+        with open(store.path, "rb") as f:
+            token = f.read()
+        try:
+            guessed.decrypt(token)
+            guessable = True
+        except InvalidToken:
+            guessable = False
+
+        same_password = SessionStore(username="john", store_dir=tmp, password="hunter2").load()
+        changed = SessionStore(username="john", store_dir=tmp, password="new-password").load()
+
+    print(f"   金鑰檔權限: {oct(mode)}, 可由密碼推導: {guessable}")
+    print(f"   相同密碼: {same_password is not None}, 變更密碼: {changed}")
+    if mode == 0o600 and not guessable and same_password is not None and changed is None:
+        print("   ✅ 金鑰與密碼無關，密碼變更後舊的登入狀態失效")
+    else:
+        print("   ❌ 登入狀態金鑰處理錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 登入狀態保存測試程式啟動...")
+    test_save_and_restore()
+    test_expired_and_tampered_session()
+    test_random_key_and_password_change()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+測試請求合併
+驗證並行的相同請求只執行一次並共用結果，以及同一帳號的打卡依序執行
+"""
+import time
+import threading
+from single_flight import KeyedLock, SingleFlight
+
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_coalesce_status():
+    """測試同時查詢狀態只抓取一次"""
+    print("🧪 開始測試狀態查詢合併...")
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def scrape():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"status": "checked_in"}
+
+    run_concurrently(5, lambda: results.append(flight.do(("status", "user"), scrape)))
+
+    print(f"   抓取次數: {len(calls)}, 取得結果數: {len(results)}")
+    if len(calls) == 1 and len(results) == 5 and all(r is results[0] for r in results):
+        print("   ✅ 5 個並行請求共用一次抓取")
+    else:
+        print("   ❌ 請求合併失敗")
+
+
+def test_shared_error():
+    """測試失敗時所有等待者都收到例外，之後可重新執行"""
+    print("\n🧪 開始測試失敗共用...")
+    flight = SingleFlight()
+    errors = []
+
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("登入失敗")
+
+    def call():
+        try:
+            flight.do("status", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    run_concurrently(3, call)
+    retry = flight.do("status", lambda: "ok")
+
+    print(f"   收到的例外: {errors}, 重新執行: {retry}")
+    if errors == ["登入失敗"] * 3 and retry == "ok" and not flight.in_flight("status"):
+        print("   ✅ 例外共用且不會卡住後續請求")
+    else:
+        print("   ❌ 例外處理錯誤")
+
+
+def test_forget_after_punch():
+    """測試 forget 後的呼叫不共用打卡前開始的抓取"""
+    print("\n🧪 開始測試打卡後不共用舊抓取...")
+    flight = SingleFlight()
+    release = threading.Event()
+    results = []
+
+    def old_scrape():
+        release.wait(2)
+        return "打卡前"
+
+    thread = threading.Thread(target=lambda: results.append(flight.do("status", old_scrape)))
+    thread.start()
+    time.sleep(0.05)
+    flight.forget("status")
+    fresh = flight.do("status", lambda: "打卡後")
+    release.set()
+    thread.join()
+
+    print(f"   舊呼叫: {results}, 新呼叫: {fresh}, 仍在執行: {flight.in_flight('status')}")
+    if results == ["打卡前"] and fresh == "打卡後" and not flight.in_flight("status"):
+        print("   ✅ 打卡後重新抓取，不拿到打卡前的結果")
+    else:
+        print("   ❌ 打卡後仍共用舊抓取")
+
+
+def test_serialize_punches():
+    """測試同一帳號的打卡不會同時執行"""
+    print("\n🧪 開始測試打卡依序執行...")
+    locks = KeyedLock()
+    active = {"user": 0, "other": 0}
+    overlap = {"user": 0, "other": 0}
+    guard = threading.Lock()
+
+    def punch(account):
+        with locks.hold(account):
+            with guard:
+                active[account] += 1
+                overlap[account] = max(overlap[account], active[account])
+            time.sleep(0.02)
+            with guard:
+                active[account] -= 1
+
+    threads = [threading.Thread(target=punch, args=(account,)) for account in ["user", "other"] * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"   同帳號最大並行數: {overlap}")
+    if overlap == {"user": 1, "other": 1} and not locks._locks:
+        print("   ✅ 同一帳號的打卡依序執行，鎖在使用後釋放")
+    else:
+        print("   ❌ 打卡並行控制錯誤")
+
+
+if __name__ == "__main__":
+    print("🔔 請求合併測試程式啟動...")
+    test_coalesce_status()
+    test_shared_error()
+    test_forget_after_punch()
+    test_serialize_punches()
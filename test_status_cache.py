@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+測試打卡狀態快取
+驗證 TTL 內不重新抓取、過期後先回傳舊資料並背景更新，以及打卡後清除快取
+"""
+import time
+import threading
+from status_cache import StatusCache
+
+
+class FakeFetcher:
+    """模擬需要一段時間的瀏覽器抓取"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.done = threading.Event()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        self.calls += 1
+        self.done.set()
+        return {"status": "checked_in", "version": self.calls}
+
+
+def test_fresh_hit():
+    """測試 TTL 內直接回傳快取"""
+    print("🧪 開始測試快取命中...")
+    fetcher = FakeFetcher()
+    cache = StatusCache(fetcher, ttl=60, max_stale=60)
+    cache.get()
+    started = time.perf_counter()
+    data, age = cache.get()
+    elapsed = time.perf_counter() - started
+
+    print(f"   抓取次數: {fetcher.calls}, 回應時間: {elapsed * 1000:.3f} ms")
+    if fetcher.calls == 1 and data["version"] == 1 and elapsed < 0.01:
+        print("   ✅ TTL 內不重新抓取")
+    else:
+        print("   ❌ 快取命中錯誤")
+
+
+def test_stale_while_revalidate():
+    """測試過期後先回傳舊資料並在背景更新"""
+    print("\n🧪 開始測試背景更新...")
+    fetcher = FakeFetcher(delay=0.1)
+    cache = StatusCache(fetcher, ttl=0.05, max_stale=60)
+    cache.get()
+    time.sleep(0.06)
+
+    fetcher.done.clear()
+    started = time.perf_counter()
+    stale, age = cache.get()
+    elapsed = time.perf_counter() - started
+    fetcher.done.wait(2)
+    time.sleep(0.01)
+    fresh, _ = cache.get()
+
+    print(f"   舊資料版本: {stale['version']}, 回應時間: {elapsed * 1000:.1f} ms")
+    print(f"   背景更新後版本: {fresh['version']}")
+    if stale["version"] == 1 and elapsed < 0.05 and fresh["version"] == 2:
+        print("   ✅ 過期資料立即回傳，背景完成更新")
+    else:
+        print("   ❌ 背景更新錯誤")
+
+
+def test_invalidate_after_punch():
+    """測試打卡後清除快取，且打卡前開始的抓取不會覆蓋"""
+    print("\n🧪 開始測試打卡後清除快取...")
+    fetcher = FakeFetcher()
+    cache = StatusCache(fetcher, ttl=60, max_stale=60)
+    cache.get()
+    generation = cache._generation
+    cache.invalidate()
+    stored = cache._store({"status": "old"}, generation)
+    data, age = cache.get()
+
+    print(f"   舊抓取寫入: {stored}, 重新抓取版本: {data['version']}")
+    if not stored and data["version"] == 2 and age == 0:
+        print("   ✅ 打卡後重新抓取最新狀態")
+    else:
+        print("   ❌ 快取清除錯誤")
+
+
+def test_invalidate_during_refresh():
+    """測試背景更新進行中打卡時，完成後會為打卡後的狀態再抓一次"""
+    print("\n🧪 開始測試背景更新中打卡...")
+    fetcher = FakeFetcher(delay=0.1)
+    published = []
+    cache = StatusCache(fetcher, ttl=60, max_stale=60, on_update=published.append)
+    cache.invalidate(refresh=True)
+    time.sleep(0.03)
+    # 打卡完成，第一次背景抓取的結果已過時
+    cache.invalidate(refresh=True)
+    deadline = time.monotonic() + 2
+    while fetcher.calls < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.02)
+
+    data, age = cache.get()
+    print(f"   抓取次數: {fetcher.calls}, 推送版本: {[d['version'] for d in published]}, 快取版本: {data['version']}")
+    if fetcher.calls == 2 and [d["version"] for d in published] == [2] and data["version"] == 2 and age > 0:
+        print("   ✅ 打卡後的狀態已抓取並推送")
+    else:
+        print("   ❌ 打卡後沒有重新抓取")
+
+
+if __name__ == "__main__":
+    print("🔔 打卡狀態快取測試程式啟動...")
+    test_fresh_hit()
+    test_stale_while_revalidate()
+    test_invalidate_after_punch()
+    test_invalidate_during_refresh()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+測試預先編譯的時區行分類器
+驗證單一正則表達式與舊版逐一比對的判斷結果完全一致
+"""
+import random
+import string
+from attendance_parser import TIMEZONE_ROW_RE
+from bench_timezone_classifier import legacy_is_timezone_row
+
+
+def test_known_rows():
+    """測試已知的打卡行與時區行"""
+    print("🧪 開始測試已知案例...")
+
+    test_cases = [
+        ("Check in: 08:50 Check out: 12:00 Subtotal: 3:10", False),
+        ("Check in: 13:01\nCheck out:\nSubtotal:", False),
+        ("Eastern Time Zone UTC-5", True),
+        ("EST UTC+8 GMT", True),
+        ("Taiwan 09:50", True),
+        ("asia/taipei 09:50", True),
+        ("the pacific time zone 09:50", True),
+        ("TESTING 09:50", True),
+    ]
+
+    for text, expected in test_cases:
+        actual = TIMEZONE_ROW_RE.search(text) is not None
+        status = "✅" if actual == expected == legacy_is_timezone_row(text) else "❌"
+        print(f"   {status} {text!r}: {'時區行' if actual else '正常行'}")
+
+
+def test_random_rows_match_legacy():
+    """以隨機組合的文字比對新舊判斷結果"""
+    print("\n🧪 開始隨機比對新舊分類器...")
+
+    rng = random.Random(20240903)
+    fragments = [
+        "Check in:", "Check out:", "08:50", "Subtotal:", "Time Zone", "time zone", "A Time Zone",
+        "UTC+8", "utc-5", "gmt", "est", "TESTING", "Asia/Taipei", "america/x", "asia/", "Taiwan",
+        "tz", "TZ", "offset", "Offset", "Europe/", "New York",
+    ]
+    alphabet = string.ascii_letters + string.digits + " +-/:_"
+
+    mismatches = []
+    for _ in range(20000):
+        parts = [
+            rng.choice(fragments) if rng.random() < 0.7
+            else "".join(rng.choices(alphabet, k=rng.randint(1, 6)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        text = " ".join(parts)
+        if (TIMEZONE_ROW_RE.search(text) is not None) != legacy_is_timezone_row(text):
+            mismatches.append(text)
+
+    print(f"   不一致數量: {len(mismatches)}")
+    if not mismatches:
+        print("   ✅ 新舊分類器結果一致")
+    else:
+        print(f"   ❌ 不一致案例: {mismatches[:5]}")
+
+
+if __name__ == "__main__":
+    print("🔔 時區行分類器測試程式啟動...")
+    test_known_rows()
+    test_random_rows_match_legacy()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+測試打卡階段計時
+以假的時鐘驗證 span 記錄、JSON lines 輸出、摘要統計，以及 run_checkin 會為每次打卡寫一筆計時記錄
+"""
+import os
+import json
+import time
+import tempfile
+from contextlib import contextmanager
+import driver_pool
+import mail_queue
+import main
+import timing
+from attendance_store import SUCCESS
+from config import Config
+from email_service import EmailService
+from mail_queue import MailQueue
+
+
+class SlowConnection:
+    """寄一封信需要 0.1 秒的 SMTP 連線"""
+    connected = False
+
+    def send(self, msg):
+        time.sleep(0.1)
+
+    def close(self):
+        pass
+
+
+class FakeClock:
+    """每次讀取前進固定秒數的時鐘"""
+
+    def __init__(self, step=0.5):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def test_span_without_run():
+    """測試沒有進行中的打卡時 span 不做任何事"""
+    print("🧪 開始測試沒有打卡時的 span...")
+    with timing.span("login"):
+        pass
+    if timing.current_timer() is None:
+        print("   ✅ 沒有打卡時不記錄")
+    else:
+        print("   ❌ 沒有打卡時仍建立計時")
+
+
+def test_punch_run_record():
+    """測試一次打卡的 span 記錄與 JSON lines 輸出"""
+    print("\n🧪 開始測試打卡計時記錄...")
+
+    @timing.timed("login")
+    def login():
+        return True
+
+    @timing.timed("records")
+    def records():
+        raise ValueError("parse failed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "logs", "timing.jsonl")
+        with timing.punch_run("上班", "測試", path=path, clock=FakeClock()) as timer:
+            login()
+            try:
+                records()
+            except ValueError:
+                pass
+            with timing.punch_run("巢狀") as inner:
+                with timing.span("records"):
+                    pass
+            timer.outcome = SUCCESS
+
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+
+    record = lines[0] if lines else {}
+    print(f"   記錄: {record.get('phases')}, 總耗時 {record.get('duration')}")
+    errors = [s.get("error") for s in record.get("spans", [])]
+    if (len(lines) == 1 and inner is timer and record["label"] == "上班" and record["outcome"] == SUCCESS
+            and record["phases"] == {"login": 0.5, "records": 1.0} and "ValueError" in errors):
+        print("   ✅ 各階段耗時與錯誤都已記錄，巢狀打卡沿用外層計時")
+    else:
+        print(f"   ❌ 計時記錄錯誤: {lines}")
+
+
+def test_summarize_records():
+    """測試多次打卡的中位數與 p95 統計"""
+    print("\n🧪 開始測試耗時統計...")
+    records = [{"duration": float(i), "phases": {"send_email": 0.01, "login": float(i)}} for i in range(1, 21)]
+    summary = timing.summarize_records(records)
+    timing.print_report([dict(r, started_at="2025-09-01T08:50:00") for r in records])
+    if list(summary) == ["login", "send_email", "total"] and summary["login"] == (20, 10.5, 19.0):
+        print("   ✅ 統計結果正確")
+    else:
+        print(f"   ❌ 統計結果錯誤: {summary}")
+
+
+def test_run_checkin_writes_timing():
+    """測試 run_checkin 不等待寄信，郵件寄出後補寫實際 SMTP 寄送時間"""
+    print("\n🧪 開始測試 run_checkin 計時...")
+
+    class FakeAutomation:
+        def punch_in(self, label):
+            with timing.span("punch"):
+                pass
+            EmailService.send_email(f"{label}打卡成功", "")
+            return SUCCESS
+
+    class FakePool:
+        @contextmanager
+        def lease(self):
+            yield FakeAutomation()
+
+    smtp_settings = ("SMTP_SERVER", "SMTP_USER", "SMTP_PASS", "EMAIL_TO")
+    originals = (Config.PUNCH_BACKEND, Config.TIMING_LOG_FILE, driver_pool.get_driver_pool, mail_queue._mail_queue)
+    original_smtp = {name: getattr(Config, name) for name in smtp_settings}
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.PUNCH_BACKEND = "selenium"
+        Config.TIMING_LOG_FILE = os.path.join(tmp, "timing.jsonl")
+        for name in smtp_settings:
+            setattr(Config, name, "test@example.com")
+        driver_pool.get_driver_pool = lambda: FakePool()
+        queue = mail_queue._mail_queue = MailQueue(connection=SlowConnection())
+        try:
+            started = time.perf_counter()
+            main.run_checkin("上班", source="測試")
+            elapsed = time.perf_counter() - started
+            queue.flush(timeout=2)
+            time.sleep(0.05)
+            with open(Config.TIMING_LOG_FILE, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+            records = timing.load_records()
+        finally:
+            (Config.PUNCH_BACKEND, Config.TIMING_LOG_FILE, driver_pool.get_driver_pool,
+             mail_queue._mail_queue) = originals
+            for name, value in original_smtp.items():
+                setattr(Config, name, value)
+
+    phases = records[0]["phases"] if records else {}
+    print(f"   打卡耗時: {elapsed * 1000:.0f} ms, 記錄行數: {len(lines)}, 合併後: {phases}")
+    if (elapsed < 0.1 and len(lines) == 2 and "send_email" not in lines[0]["phases"]
+            and lines[1].get("kind") == "mail" and lines[1]["run_id"] == lines[0]["run_id"]
+            and len(records) == 1 and records[0]["outcome"] == SUCCESS and set(phases) == {"punch", "send_email"}
+            and phases["send_email"] >= 0.1):
+        print("   ✅ 打卡不等待寄信，寄出後補寫的寄信時間併回同一次打卡")
+    else:
+        print(f"   ❌ 計時記錄錯誤: {records}")
+
+
+if __name__ == "__main__":
+    print("🔔 打卡階段計時測試程式啟動...")
+    test_span_without_run()
+    test_punch_run_record()
+    test_summarize_records()
+    test_run_checkin_writes_timing()
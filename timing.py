@@ -0,0 +1,273 @@
+"""
+打卡階段計時模組
+以 span 記錄每次打卡各階段（啟動瀏覽器、登入、讀取打卡記錄、打卡、寄信）花費的時間，
+打卡結束後寫一行 JSON 到 TIMING_LOG_FILE 並印出摘要表
+
+郵件由背景佇列寄出，打卡不等待寄信：打卡結束時尚未寄完的郵件，
+會在這次打卡的最後一封郵件寄出後補寫一行 kind=mail 的記錄，以 run_id 對應回該次打卡。
+
+沒有進行中的打卡時 span 不做任何事，因此可以直接包在共用的函式上。
+"""
+import os
+import json
+import time
+import uuid
+import functools
+import statistics
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config import Config
+from work_hours import current_time
+
+# 摘要表中各階段的顯示順序
+PHASES = ("setup_driver", "login", "records", "punch", "send_email")
+
+_current = ContextVar("punch_timer", default=None)
+_write_lock = threading.Lock()
+
+
+class PunchTimer:
+    """一次打卡的計時記錄"""
+
+    def __init__(self, label, source=None, clock=time.perf_counter):
+        self.label = label
+        self.source = source
+        self.clock = clock
+        self.started_at = current_time().isoformat(timespec="seconds")
+        self.run_id = uuid.uuid4().hex[:12]
+        # 批次打卡時郵件寄出前可能已切換帳號，先記下這次打卡的帳號
+        self.account = Config.USERNAME
+        self.path = None
+        self.outcome = None
+        self.spans = []
+        self._start = clock()
+        self.duration = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._mail_pending = 0
+        # 打卡記錄寫入後才寄出的郵件
+        self._late_spans = []
+
+    @staticmethod
+    def _span(name, offset, duration, error=None):
+        span = {"name": name, "start": round(offset, 4), "duration": round(duration, 4)}
+        if error:
+            span["error"] = error
+        return span
+
+    def add(self, name, start, duration, error=None):
+        self.spans.append(self._span(name, start - self._start, duration, error))
+
+    def mail_queued(self):
+        """這次打卡有一封郵件放進寄信佇列"""
+        with self._lock:
+            self._mail_pending += 1
+
+    def mail_sent(self, start, duration, error=None):
+        """寄信佇列寄完這次打卡的一封郵件（在寄信執行緒呼叫）
+
+        打卡尚未結束時併入這次打卡的記錄；已結束時等最後一封寄出後補寫一行寄信記錄。
+        """
+        span = self._span("send_email", start - self._start, duration, error)
+        with self._lock:
+            self._mail_pending -= 1
+            if not self._closed:
+                self.spans.append(span)
+                return
+            self._late_spans.append(span)
+            if self._mail_pending > 0:
+                return
+            spans, self._late_spans = self._late_spans, []
+        write_record(self.mail_record(spans), self.path)
+
+    def finish(self):
+        """結束計時；之後寄出的郵件改寫成另一行記錄"""
+        with self._lock:
+            self.duration = self.clock() - self._start
+            self._closed = True
+
+    def phase_totals(self):
+        """各階段的 (次數, 總秒數)，依 PHASES 排序，其他階段排在後面"""
+        totals = {}
+        for span in self.spans:
+            count, seconds = totals.get(span["name"], (0, 0.0))
+            totals[span["name"]] = (count + 1, seconds + span["duration"])
+        order = {name: i for i, name in enumerate(PHASES)}
+        return dict(sorted(totals.items(), key=lambda item: order.get(item[0], len(PHASES))))
+
+    def record(self):
+        """可寫入 JSON lines 的記錄"""
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "label": self.label,
+            "source": self.source,
+            "account": self.account,
+            "outcome": self.outcome,
+            "duration": round(self.duration or 0.0, 4),
+            "phases": {name: round(seconds, 4) for name, (_, seconds) in self.phase_totals().items()},
+            "spans": list(self.spans),
+        }
+
+    def mail_record(self, spans):
+        """打卡記錄寫入後才寄出的郵件耗時"""
+        return {
+            "kind": "mail",
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "label": self.label,
+            "account": self.account,
+            "phases": {"send_email": round(sum(span["duration"] for span in spans), 4)},
+            "spans": spans,
+        }
+
+
+def current_timer():
+    """目前這個執行緒進行中的打卡計時，沒有時回傳 None"""
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """記錄一個階段的耗時；例外會記下類型後繼續往外拋"""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    start = timer.clock()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        timer.add(name, start, timer.clock() - start, error)
+
+
+def timed(name):
+    """以 span 包住整個函式的裝飾器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def punch_run(label, source=None, path=None, clock=time.perf_counter):
+    """計時一次打卡；結束時寫入計時記錄並印出摘要表（不等待郵件寄出）。巢狀呼叫時沿用外層的計時"""
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    timer = PunchTimer(label, source, clock)
+    timer.path = path
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        timer.finish()
+        write_record(timer.record(), path)
+        print_summary(timer)
+
+
+def write_record(record, path=None):
+    """附加一行計時記錄；TIMING_LOG_FILE 設為空字串時不寫入"""
+    path = Config.TIMING_LOG_FILE if path is None else path
+    if not path:
+        return
+    path = os.path.expanduser(path)
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"⚠️ 無法寫入計時記錄 {path}: {e}")
+
+
+def print_summary(timer):
+    """印出一次打卡各階段的耗時"""
+    total = timer.duration or 0.0
+    print(f"⏱️ {timer.label}打卡耗時 {total:.2f} 秒")
+    print(f"   {'階段':<14} {'次數':>4} {'耗時 (ms)':>10} {'佔比':>6}")
+    measured = 0.0
+    for name, (count, seconds) in timer.phase_totals().items():
+        measured += seconds
+        share = seconds / total * 100 if total else 0
+        print(f"   {name:<14} {count:>4} {seconds * 1000:>10.0f} {share:>5.0f}%")
+    other = max(total - measured, 0.0)
+    share = other / total * 100 if total else 0
+    print(f"   {'其他':<14} {'':>4} {other * 1000:>10.0f} {share:>5.0f}%")
+
+
+def merge_records(records):
+    """把打卡結束後補寫的寄信記錄 (kind=mail) 併入同一次打卡的記錄"""
+    runs = {}
+    merged = []
+    for record in records:
+        if record.get("kind") == "mail":
+            run = runs.get(record.get("run_id"))
+            if run is not None:
+                for name, seconds in record.get("phases", {}).items():
+                    run["phases"][name] = round(run["phases"].get(name, 0.0) + seconds, 4)
+                run["spans"] = run.get("spans", []) + record.get("spans", [])
+            continue
+        record = dict(record, phases=dict(record.get("phases", {})))
+        runs[record.get("run_id")] = record
+        merged.append(record)
+    return merged
+
+
+def load_records(path=None, limit=None):
+    """讀取計時記錄（最近的 limit 次打卡，已併入補寫的寄信記錄），略過無法解析的行"""
+    path = os.path.expanduser(path or Config.TIMING_LOG_FILE)
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        return []
+    records = merge_records(records)
+    return records[-limit:] if limit else records
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def summarize_records(records):
+    """統計多次打卡各階段的中位數與 p95 秒數，回傳 {階段: (次數, 中位數, p95)}"""
+    samples = {}
+    for record in records:
+        for name, seconds in record.get("phases", {}).items():
+            samples.setdefault(name, []).append(seconds)
+        if "duration" in record:
+            samples.setdefault("total", []).append(record["duration"])
+    order = {name: i for i, name in enumerate(PHASES)}
+    order["total"] = len(PHASES) + 1
+    return {
+        name: (len(values), statistics.median(values), _percentile(values, 0.95))
+        for name, values in sorted(samples.items(), key=lambda item: order.get(item[0], len(PHASES)))
+    }
+
+
+def print_report(records):
+    """印出多次打卡的耗時統計表"""
+    if not records:
+        print("   沒有計時記錄")
+        return
+    print(f"⏱️ 最近 {len(records)} 次打卡耗時 ({records[0].get('started_at')} ~ {records[-1].get('started_at')})")
+    print(f"   {'階段':<14} {'次數':>4} {'中位數 (ms)':>12} {'p95 (ms)':>10}")
+    for name, (count, median, p95) in summarize_records(records).items():
+        print(f"   {name:<14} {count:>4} {median * 1000:>12.0f} {p95 * 1000:>10.0f}")
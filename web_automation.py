@@ -5,15 +5,52 @@
 import os
 import time
 import datetime
-import schedule
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException
 from config import Config
+from driver_resolver import resolve_chromedriver
 from attendance_parser import AttendanceParser
+import hours_report
 from email_service import EmailService
+from session_store import SessionStore
+from readiness import Readiness, backoff_delay
+from scheduler import get_scheduler
+from deferred_jobs import AUTO_CHECKOUT_SOURCE, UNDER_HOURS_SOURCE, DeferredJobStore
+import attendance_store
+from attendance_store import get_attendance_store
+import work_hours
+from work_hours import current_time
+from timing import span, timed
+
+# 精簡瀏覽器設定：關閉打卡用不到的擴充功能、GPU、背景連線與圖片
+LEAN_CHROME_ARGS = [
+    "--disable-extensions",
+    "--disable-gpu",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--blink-settings=imagesEnabled=false",
+]
+
+# 精簡模式下以 CDP Network.setBlockedURLs 擋掉的資源（圖片、字型與分析追蹤）
+BLOCKED_URL_PATTERNS = [
+    # 結尾的 * 讓帶查詢字串的網址 (logo.png?v=3) 也會被擋下
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*clarity.ms*", "*segment.io*", "*connect.facebook.net*",
+]
+
 
 class WebAutomation:
     """網頁自動化類別"""
@@ -22,92 +59,125 @@ class WebAutomation:
         self.driver = None
         self.work_start_time = None
         self.today_log = []
+        self.session_store = SessionStore() if Config.SESSION_PERSISTENCE_ENABLED else None
     
-    def setup_driver(self):
-        """設置 Chrome 瀏覽器"""
+    @staticmethod
+    def chrome_options(profile=None):
+        """建立 Chrome 設定；profile 為 standard（預設）或 lean（精簡）"""
+        profile = profile or Config.BROWSER_PROFILE
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
+        # 開啟 performance log 讓就緒偵測可以透過 CDP 網路事件判斷頁面是否閒置
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+        if profile == "lean":
+            for argument in LEAN_CHROME_ARGS:
+                chrome_options.add_argument(argument)
+            # DOMContentLoaded 後就交回控制權，打卡按鈕由就緒偵測等待
+            chrome_options.page_load_strategy = "eager"
+        return chrome_options
+
+    @staticmethod
+    def block_resources(driver, patterns=None):
+        """以 CDP 擋掉不影響打卡的資源請求"""
+        patterns = BLOCKED_URL_PATTERNS if patterns is None else patterns
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except WebDriverException as e:
+            print(f"⚠️ 無法設定資源封鎖: {e}")
+
+    @timed("setup_driver")
+    def setup_driver(self, profile=None):
+        """設置 Chrome 瀏覽器"""
+        profile = profile or Config.BROWSER_PROFILE
+        chrome_options = self.chrome_options(profile)
         
-        # 使用 webdriver-manager 自動下載和管理 ChromeDriver
-        service = Service(ChromeDriverManager().install())
+        # 使用本機 manifest 快取的 ChromeDriver，Chrome 更新時才透過 webdriver-manager 重新下載
+        driver_path = resolve_chromedriver()
+        service = Service(driver_path) if driver_path else Service()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        if profile == "lean":
+            self.block_resources(self.driver)
         return self.driver
     
+    def restore_session(self):
+        """以保存的登入狀態登入，成功時不需填寫登入表單"""
+        if not self.session_store:
+            return False
+        if not self.session_store.restore(self.driver, Config.LOGIN_URL):
+            return False
+        if Readiness(self.driver).check_button(timeout=Config.SESSION_PROBE_TIMEOUT):
+            print("✅ 已還原登入狀態 - 找到打卡按鈕")
+            return True
+        print("⚠️ 保存的登入狀態已失效，改用登入表單")
+        self.session_store.clear()
+        return False
+
+    @timed("login")
     def login(self, max_retries=2):
         """登入系統，支援重試機制"""
+        if self.restore_session():
+            return True
+
+        readiness = Readiness(self.driver)
         for attempt in range(max_retries + 1):
             try:
                 if attempt > 0:
-                    print(f"🔄 第 {attempt + 1} 次登入嘗試...")
-                    time.sleep(5)  # 重試前等待5秒
+                    delay = backoff_delay(attempt)
+                    print(f"🔄 第 {attempt + 1} 次登入嘗試... (等待 {delay:.1f} 秒)")
+                    time.sleep(delay)
                 else:
                     print("🌐 正在連接網站...")
                 
                 self.driver.get(Config.LOGIN_URL)
                 
                 print("🔐 正在登入...")
-                self.driver.find_element(By.ID, "__BVID__6").send_keys(Config.USERNAME)
+                readiness.element(By.ID, "__BVID__6").send_keys(Config.USERNAME)
                 self.driver.find_element(By.ID, "__BVID__8").send_keys(Config.PASSWORD)
+                login_page_url = self.driver.current_url
                 self.driver.find_element(By.XPATH, "//button[contains(text(),'Log In')]").click()
-                time.sleep(3)
                 
-                # 檢查是否登入成功 - 檢查頁面是否包含打卡相關元素
-                try:
-                    # 檢查是否有打卡按鈕或相關元素
-                    check_buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(),'Check')]")
-                    if check_buttons:
-                        if attempt > 0:
-                            print(f"✅ 登入成功 - 第 {attempt + 1} 次嘗試成功，找到打卡按鈕")
-                        else:
-                            print("✅ 登入成功 - 找到打卡按鈕")
-                        return True
-                    
-                    print(f"❌ 登入失敗 - 第 {attempt + 1} 次嘗試，未找到登入成功指標")
-                    
-                    # 如果不是最後一次嘗試，繼續重試
-                    if attempt < max_retries:
-                        print(f"⏳ 等待5秒後重試...")
-                        continue
-                    else:
-                        print("❌ 所有登入嘗試都失敗了")
-                        return False
-                    
-                except Exception as e:
-                    print(f"❌ 檢查登入狀態時出錯: {e}")
-                    if attempt < max_retries:
-                        print(f"⏳ 等待5秒後重試...")
-                        continue
+                # 檢查是否登入成功 - 等待打卡按鈕出現，而不是固定等待
+                if readiness.wait_for_login(login_page_url):
+                    if attempt > 0:
+                        print(f"✅ 登入成功 - 第 {attempt + 1} 次嘗試成功，找到打卡按鈕")
                     else:
-                        return False
+                        print("✅ 登入成功 - 找到打卡按鈕")
+                    if self.session_store:
+                        self.session_store.save(self.driver)
+                    return True
+                
+                print(f"❌ 登入失敗 - 第 {attempt + 1} 次嘗試，未找到登入成功指標")
                     
             except Exception as e:
                 print(f"❌ 登入過程出錯: {e}")
-                if attempt < max_retries:
-                    print(f"⏳ 等待5秒後重試...")
-                    continue
-                else:
-                    return False
+            
+            if attempt >= max_retries:
+                print("❌ 所有登入嘗試都失敗了")
         
         return False
     
     def punch_in(self, label=""):
-        """執行打卡動作"""
+        """執行打卡動作，回傳打卡結果（attendance_store 的 SUCCESS / SKIPPED / DEFERRED / FAILED）"""
         if not Config.AUTO_CHECKIN_ENABLED:
             print("⏸ 已停用自動打卡 (AUTO_CHECKIN_ENABLED=false)")
-            return
+            return attendance_store.SKIPPED
 
         if Config.is_skip_today():
-            return
+            return attendance_store.SKIPPED
 
         today = datetime.datetime.today().weekday()
         if today not in Config.WORK_DAYS:
             print(f"⏸ 今天不是工作日，跳過 {label}")
-            return
+            return attendance_store.SKIPPED
 
         # 獲取當天的打卡記錄來判斷當前狀態
         attendance_records = AttendanceParser.get_today_attendance_records(self.driver)
+        self._store_records(attendance_records)
         
         # 優先使用當天第一筆打卡記錄的 Check in 時間作為上班時間
         if attendance_records:
@@ -151,14 +221,15 @@ class WebAutomation:
         if not buttons:
             log_entry = f"{label}: 找不到打卡按鈕"
             self.today_log.append(log_entry)
+            self._record_punch(label, attendance_store.FAILED, "找不到打卡按鈕")
             EmailService.send_checkin_notification(
                 "找不到打卡按鈕", 
                 label, 
                 source="系統檢查",
-                attendance_records=attendance_records
+                attendance_records=attendance_records,
+                urgent=True
             )
-            self.driver.quit()
-            return
+            return attendance_store.FAILED
 
         btn = buttons[0]
         btn_text = btn.text.strip()
@@ -201,7 +272,7 @@ class WebAutomation:
                     
                     if work_hours_result is None:
                         print("❌ 工時計算失敗，無法執行下班打卡")
-                        return
+                        return attendance_store.FAILED
                     
                     total_work_hours, current_work_hours = work_hours_result
                     
@@ -218,20 +289,28 @@ class WebAutomation:
                                 "下班打卡 - 工時不足", 
                                 work_hours=total_work_hours,
                                 source="GitHub Actions 工時檢查",
-                                attendance_records=attendance_records
+                                attendance_records=attendance_records,
+                                urgent=True
                             )
                             result = f"工時不足 ({total_work_hours:.1f}小時)，已發送通知郵件"
-                            self.driver.quit()
-                            return
+                            self._record_punch(label, attendance_store.SKIPPED, result, total_work_hours)
+                            return attendance_store.SKIPPED
                         else:
                             # 本地環境：延後打卡
                             delay_minutes = int((8 - total_work_hours) * 60) + 1
                             now = datetime.datetime.now()
                             new_time = now + datetime.timedelta(minutes=delay_minutes)
                             print(f"⏳ 未滿 8 小時，延後到 {new_time.strftime('%H:%M')} 下班打卡")
-                            schedule.every().day.at(new_time.strftime("%H:%M")).do(self.punch_in, label="下班")
-                            self.driver.quit()
-                            return
+                            self._record_punch(label, attendance_store.DEFERRED,
+                                               f"未滿 8 小時，延後到 {new_time.strftime('%H:%M')}", total_work_hours)
+                            DeferredJobStore().add(new_time, "下班", UNDER_HOURS_SOURCE)
+                            scheduler = get_scheduler()
+                            if scheduler:
+                                # 只排一次，到時由排程器重新取得瀏覽器打卡
+                                scheduler.schedule_once(new_time, "下班")
+                            else:
+                                print("⚠️ 排程器未啟動，延後工作已保存，啟動排程模式後會接續執行")
+                            return attendance_store.DEFERRED
                     else:
                         print(f"✅ 工時充足 ({total_work_hours:.1f}小時)，可以下班打卡")
                     
@@ -242,14 +321,18 @@ class WebAutomation:
             
             # 執行打卡
             if should_punch:
-                btn.click()
+                with span("punch"):
+                    btn.click()
+                outcome = attendance_store.SUCCESS
                 if label == "上班":
                     self.work_start_time = datetime.datetime.now()
             else:
+                outcome = attendance_store.SKIPPED
                 print(f"⏸ {result}")
                 
         except Exception as e:
             result = f"{label} 失敗: {e}"
+            outcome = attendance_store.FAILED
 
         # 更新 log
         # 從已獲取的打卡記錄中獲取上班時間
@@ -258,18 +341,35 @@ class WebAutomation:
             check_in_time = attendance_records[0]['check_in']
         log_entry = f"{label}: {result}, Check in: {check_in_time}, Check out: 未抓取"
         self.today_log.append(log_entry)
+        self._record_punch(label, outcome, result)
 
         # 寄信通知
         EmailService.send_checkin_notification(
             result, 
             label, 
             source="打卡系統",
-            attendance_records=attendance_records
+            attendance_records=attendance_records,
+            urgent=outcome == attendance_store.FAILED
         )
-
         print(f"📌 {label} 完成: {result}")
-        self.driver.quit()
+        return outcome
     
+    @staticmethod
+    def _record_punch(label, outcome, message, work_hours=None, source="打卡系統"):
+        """將打卡結果寫入打卡資料庫，資料庫錯誤不影響打卡"""
+        try:
+            get_attendance_store().record_punch(label, outcome, message, work_hours=work_hours, source=source)
+        except Exception as e:
+            print(f"⚠️ 打卡結果寫入資料庫失敗: {e}")
+
+    @staticmethod
+    def _store_records(attendance_records):
+        """將當天的打卡記錄寫入打卡資料庫"""
+        try:
+            get_attendance_store().save_records(attendance_records)
+        except Exception as e:
+            print(f"⚠️ 打卡記錄寫入資料庫失敗: {e}")
+
     def test_attendance_records(self):
         """測試打卡記錄解析功能"""
         try:
@@ -495,60 +595,19 @@ class WebAutomation:
                 print("❌ 沒有找到今天的打卡記錄")
                 return None
             
-            # 計算工時 - 使用與 calculate_work_hours 完全相同的邏輯
-            total_work_hours = 0
-            current_work_hours = 0  # 當前正在進行的工時
-            
-            # 在 GitHub Actions 環境中使用台灣時間
+            # 計算工時 - 使用與 calculate_work_hours 相同的工時引擎
+            now = current_time()
             if os.getenv("GITHUB_ACTIONS"):
-                # GitHub Actions 使用 UTC 時間，台灣時間 = UTC + 8
-                now = datetime.datetime.now() + datetime.timedelta(hours=8)
                 print(f"🕐 當前時間 (台灣時間): {now.strftime('%H:%M:%S')}")
             else:
-                now = datetime.datetime.now()
                 print(f"🕐 當前時間: {now.strftime('%H:%M:%S')}")
             
-            for i, record in enumerate(attendance_records, 1):
-                check_in = record.get('check_in', 'N/A')
-                check_out = record.get('check_out', 'N/A')
-                
-                print(f"  第 {i} 次:")
-                print(f"    Check in:  {check_in}")
-                print(f"    Check out: {check_out}")
-                
-                # 計算這段的工時
-                if check_in != 'N/A' and check_out != 'N/A' and check_out:
-                    # 已完成的工時段
-                    try:
-                        in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                        out_time = datetime.datetime.strptime(check_out, "%H:%M").time()
-                        today = datetime.datetime.now().date()
-                        in_datetime = datetime.datetime.combine(today, in_time)
-                        out_datetime = datetime.datetime.combine(today, out_time)
-                        duration = out_datetime - in_datetime
-                        hours = duration.total_seconds() / 3600
-                        total_work_hours += hours
-                        print(f"    工時: {hours:.2f} 小時 (已完成)")
-                    except Exception as e:
-                        print(f"    工時計算失敗: {e}")
-                elif check_in != 'N/A' and check_out == '':
-                    # 正在進行的工時段
-                    try:
-                        in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                        today = datetime.datetime.now().date()
-                        in_datetime = datetime.datetime.combine(today, in_time)
-                        duration = now - in_datetime
-                        hours = duration.total_seconds() / 3600
-                        current_work_hours = hours
-                        print(f"    工時: {hours:.2f} 小時 (進行中)")
-                    except Exception as e:
-                        print(f"    當前工時計算失敗: {e}")
-                        current_work_hours = 0
+            summary = work_hours.summarize(attendance_records, now)
+            hours_report.print_work_segments(attendance_records, summary)
+            total_work_hours = summary.total_hours
+            current_work_hours = summary.current_hours
             
-            # 總工時 = 已完成的工時 + 當前正在進行的工時
-            total_work_hours += current_work_hours
-            
-            print(f"\n📊 已完成工時: {total_work_hours - current_work_hours:.2f} 小時")
+            print(f"\n📊 已完成工時: {summary.completed_hours:.2f} 小時")
             print(f"📊 當前工時: {current_work_hours:.2f} 小時")
             print(f"📊 總工時: {total_work_hours:.2f} 小時")
             
@@ -562,111 +621,14 @@ class WebAutomation:
         """計算今天滿8小時工時需要什麼時候下班"""
         try:
             print("🧮 開始計算工時...")
-            
+
             # 獲取當天的打卡記錄
             attendance_records = AttendanceParser.get_today_attendance_records(self.driver)
-            print(f"📊 打卡記錄數量: {len(attendance_records)}")
-            
-            if not attendance_records:
-                print("❌ 沒有找到今天的打卡記錄")
-                return
-            
-            # 顯示所有打卡記錄
-            print("\n📝 今天的打卡記錄:")
-            total_work_hours = 0
-            current_work_hours = 0  # 當前正在進行的工時
-            
-            # 在 GitHub Actions 環境中使用台灣時間
-            if os.getenv("GITHUB_ACTIONS"):
-                # GitHub Actions 使用 UTC 時間，台灣時間 = UTC + 8
-                now = datetime.datetime.now() + datetime.timedelta(hours=8)
-                print(f"🕐 當前時間 (台灣時間): {now.strftime('%H:%M:%S')}")
-            else:
-                now = datetime.datetime.now()
-                print(f"🕐 當前時間: {now.strftime('%H:%M:%S')}")
-            
-            for i, record in enumerate(attendance_records, 1):
-                check_in = record.get('check_in', 'N/A')
-                check_out = record.get('check_out', 'N/A')
-                print(f"  第 {i} 次:")
-                print(f"    Check in:  {check_in}")
-                print(f"    Check out: {check_out}")
-                
-                # 計算這段的工時
-                if check_in != 'N/A' and check_out != 'N/A' and check_out:
-                    # 已完成的工時段
-                    try:
-                        in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                        out_time = datetime.datetime.strptime(check_out, "%H:%M").time()
-                        today = datetime.datetime.now().date()
-                        in_datetime = datetime.datetime.combine(today, in_time)
-                        out_datetime = datetime.datetime.combine(today, out_time)
-                        duration = out_datetime - in_datetime
-                        hours = duration.total_seconds() / 3600
-                        total_work_hours += hours
-                        print(f"    工時: {hours:.2f} 小時 (已完成)")
-                    except Exception as e:
-                        print(f"    工時計算失敗: {e}")
-                elif check_in != 'N/A' and check_out == '':
-                    # 正在進行的工時段
-                    try:
-                        in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                        today = datetime.datetime.now().date()
-                        in_datetime = datetime.datetime.combine(today, in_time)
-                        duration = now - in_datetime
-                        hours = duration.total_seconds() / 3600
-                        current_work_hours = hours
-                        print(f"    工時: {hours:.2f} 小時 (進行中)")
-                    except Exception as e:
-                        print(f"    當前工時計算失敗: {e}")
-                        current_work_hours = 0
-            
-            # 總工時 = 已完成的工時 + 當前正在進行的工時
-            total_work_hours += current_work_hours
-            print(f"\n📊 已完成工時: {total_work_hours - current_work_hours:.2f} 小時")
-            print(f"📊 當前工時: {current_work_hours:.2f} 小時")
-            print(f"📊 總工時: {total_work_hours:.2f} 小時")
-            
-            # 檢查當前狀態
-            current_status = AttendanceParser.get_current_status(attendance_records)
-            print(f"📱 當前狀態: {current_status}")
-            
-            if current_status == "checked_out":
-                print("✅ 今天已經下班了")
-                if total_work_hours >= 8:
-                    print(f"🎉 恭喜！今天工時充足 ({total_work_hours:.2f} 小時)")
-                else:
-                    print(f"⚠️ 今天工時不足 ({total_work_hours:.2f} 小時 < 8 小時)")
-                return
-            
-            # 計算還需要多少工時
-            remaining_hours = 8 - total_work_hours
-            print(f"⏰ 還需要工時: {remaining_hours:.2f} 小時")
-            
-            if remaining_hours <= 0:
-                print("🎉 已經滿8小時了！可以下班了！")
-                return
-            
-            # 計算下班時間
-            if current_status == "checked_in":
-                # 如果正在上班，計算還需要多少時間
-                if remaining_hours > 0:
-                    # 從現在開始，還需要工作 remaining_hours 小時
-                    checkout_time = now + datetime.timedelta(hours=remaining_hours)
-                    print(f"⏰ 滿8小時的下班時間: {checkout_time.strftime('%H:%M')}")
-                    
-                    # 計算還需要多少時間
-                    time_remaining = checkout_time - now
-                    if time_remaining.total_seconds() > 0:
-                        remaining_minutes = int(time_remaining.total_seconds() / 60)
-                        print(f"⏳ 還需要工作: {remaining_minutes} 分鐘")
-                    else:
-                        print("🎉 已經可以下班了！")
-                else:
-                    print("🎉 已經滿8小時了！可以下班了！")
-            else:
-                print("ℹ️ 當前未在上班狀態，無法計算下班時間")
-                
+            if attendance_records:
+                # 保存到打卡資料庫，之後 hours --cached 不需開啟瀏覽器
+                self._store_records(attendance_records)
+            hours_report.report_work_hours(attendance_records)
+
         except Exception as e:
             print(f"❌ 計算工時失敗: {e}")
             import traceback
@@ -754,45 +716,12 @@ class WebAutomation:
                 
                 # 對於下班打卡，檢查工時
                 if attendance_records:
-                    total_work_hours = 0
-                    current_work_hours = 0
-                    now = datetime.datetime.now()
-                    
-                    for record in attendance_records:
-                        check_in = record.get('check_in', 'N/A')
-                        check_out = record.get('check_out', 'N/A')
-                        
-                        if check_in != 'N/A' and check_out != 'N/A' and check_out:
-                            # 已完成的工時段
-                            try:
-                                in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                                out_time = datetime.datetime.strptime(check_out, "%H:%M").time()
-                                today = datetime.datetime.now().date()
-                                in_datetime = datetime.datetime.combine(today, in_time)
-                                out_datetime = datetime.datetime.combine(today, out_time)
-                                duration = out_datetime - in_datetime
-                                hours = duration.total_seconds() / 3600
-                                total_work_hours += hours
-                            except Exception as e:
-                                print(f"   ⚠️ 工時計算失敗: {e}")
-                        elif check_in != 'N/A' and check_out == '':
-                            # 正在進行的工時段
-                            try:
-                                in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                                today = datetime.datetime.now().date()
-                                in_datetime = datetime.datetime.combine(today, in_time)
-                                duration = now - in_datetime
-                                hours = duration.total_seconds() / 3600
-                                current_work_hours = hours
-                            except Exception as e:
-                                print(f"   ⚠️ 當前工時計算失敗: {e}")
-                    
-                    total_work_hours += current_work_hours
+                    total_work_hours = work_hours.summarize(attendance_records).total_hours
                     print(f"   📊 總工時: {total_work_hours:.2f} 小時")
                     
-                    if total_work_hours < 8:
+                    if total_work_hours < work_hours.REQUIRED_WORK_HOURS:
                         print(f"   ⚠️ 工時不足 ({total_work_hours:.2f}小時 < 8小時)")
-                        remaining_hours = 8 - total_work_hours
+                        remaining_hours = work_hours.REQUIRED_WORK_HOURS - total_work_hours
                         remaining_minutes = int(remaining_hours * 60)
                         print(f"   💡 還需要工作: {remaining_minutes} 分鐘")
                     else:
@@ -808,7 +737,8 @@ class WebAutomation:
         
         try:
             # 執行打卡
-            btn.click()
+            with span("punch"):
+                btn.click()
             print(f"✅ {label} 打卡成功")
             
             # 更新上班時間（如果是上班打卡）
@@ -831,7 +761,8 @@ class WebAutomation:
             EmailService.send_checkin_notification(
                 f"{label} 打卡失敗: {e}", 
                 label, 
-                source="強制打卡"
+                source="強制打卡",
+                urgent=True
             )
             return False
 
@@ -876,162 +807,173 @@ class WebAutomation:
                 return False
             
             # 計算當前工時
-            now = datetime.datetime.now()
-            total_work_hours = 0
-            current_work_hours = 0
-            
-            for record in attendance_records:
-                check_in = record.get('check_in', 'N/A')
-                check_out = record.get('check_out', 'N/A')
-                
-                if check_in != 'N/A' and check_out != 'N/A' and check_out:
-                    # 已完成的工時段
-                    try:
-                        in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                        out_time = datetime.datetime.strptime(check_out, "%H:%M").time()
-                        today = datetime.datetime.now().date()
-                        in_datetime = datetime.datetime.combine(today, in_time)
-                        out_datetime = datetime.datetime.combine(today, out_time)
-                        duration = out_datetime - in_datetime
-                        hours = duration.total_seconds() / 3600
-                        total_work_hours += hours
-                        print(f"  ✅ 已完成工時段: {check_in}-{check_out} = {hours:.2f}小時")
-                    except Exception as e:
-                        print(f"  ⚠️ 工時計算失敗: {e}")
-                elif check_in != 'N/A' and check_out == '':
-                    # 正在進行的工時段
-                    try:
-                        in_time = datetime.datetime.strptime(check_in, "%H:%M").time()
-                        today = datetime.datetime.now().date()
-                        in_datetime = datetime.datetime.combine(today, in_time)
-                        duration = now - in_datetime
-                        hours = duration.total_seconds() / 3600
-                        current_work_hours = hours
-                        print(f"  🔄 正在進行工時段: {check_in}-現在 = {hours:.2f}小時")
-                    except Exception as e:
-                        print(f"  ⚠️ 當前工時計算失敗: {e}")
+            now = current_time()
+            summary = work_hours.summarize(attendance_records, now)
+            for record, segment in zip(attendance_records, summary.segments):
+                if segment is None:
+                    continue
+                minutes, in_progress = segment
+                if in_progress:
+                    print(f"  🔄 正在進行工時段: {record['check_in']}-現在 = {minutes / 60:.2f}小時")
+                else:
+                    print(f"  ✅ 已完成工時段: {record['check_in']}-{record['check_out']} = {minutes / 60:.2f}小時")
             
             # 總工時
-            total_work_hours += current_work_hours
+            total_work_hours = summary.total_hours
             print(f"\n📊 總工時: {total_work_hours:.2f} 小時")
             
             # 檢查是否已經滿8小時
-            if total_work_hours >= 8:
+            if total_work_hours >= work_hours.REQUIRED_WORK_HOURS:
                 print("🎉 已經滿8小時了！可以立即下班打卡")
-                
-                # 查找下班按鈕
-                buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(),'Check out')]")
-                if not buttons:
-                    print("❌ 找不到下班按鈕")
-                    return False
-                
-                btn = buttons[0]
-                print(f"🔘 找到下班按鈕: {btn.text.strip()}")
-                
-                # 執行下班打卡
-                try:
-                    btn.click()
-                    print("✅ 下班打卡成功！")
-                    
-                    # 發送通知
-                    EmailService.send_checkin_notification(
-                        f"自動下班打卡成功 (工時: {total_work_hours:.2f}小時)", 
-                        "下班", 
-                        work_hours=total_work_hours,
-                        source="自動下班偵測",
-                        attendance_records=attendance_records
-                    )
-                    
-                    return True
-                except Exception as e:
-                    print(f"❌ 下班打卡失敗: {e}")
-                    return False
-            else:
-                # 計算還需要多少時間
-                remaining_hours = 8 - total_work_hours
-                remaining_minutes = int(remaining_hours * 60)
-                print(f"⏰ 還需要工作: {remaining_minutes} 分鐘 ({remaining_hours:.2f} 小時)")
-                
-                # 計算下班時間
-                checkout_time = now + datetime.timedelta(hours=remaining_hours)
-                print(f"🕐 預計下班時間: {checkout_time.strftime('%H:%M:%S')}")
-                
-                # 計算等待時間（滿8小時後再等1分鐘）
-                wait_time = remaining_hours + (1/60)  # 加1分鐘
-                wait_minutes = int(wait_time * 60)
-                target_time = now + datetime.timedelta(minutes=wait_minutes)
-                
-                print(f"⏳ 將在 {target_time.strftime('%H:%M:%S')} 自動執行下班打卡")
-                print(f"   等待時間: {wait_minutes} 分鐘")
-                
-                # 發送通知
-                EmailService.send_checkin_notification(
-                    f"自動下班偵測啟動 - 將在 {target_time.strftime('%H:%M')} 自動打卡下班", 
-                    "下班偵測", 
-                    work_hours=total_work_hours,
-                    source="自動下班偵測",
-                    attendance_records=attendance_records
+                return self._click_checkout(
+                    attendance_records,
+                    f"自動下班打卡成功 (工時: {total_work_hours:.2f}小時)",
+                    total_hours=total_work_hours,
                 )
-                
-                # 等待到目標時間
-                print(f"\n⏰ 開始等待... (按 Ctrl+C 取消)")
-                try:
-                    import time
-                    while datetime.datetime.now() < target_time:
-                        time.sleep(30)  # 每30秒檢查一次
-                        remaining = target_time - datetime.datetime.now()
-                        if remaining.total_seconds() > 0:
-                            remaining_min = int(remaining.total_seconds() / 60)
-                            remaining_sec = int(remaining.total_seconds() % 60)
-                            print(f"⏳ 還需要等待: {remaining_min}分{remaining_sec}秒")
-                    
-                    print(f"\n🚀 時間到了！開始執行下班打卡...")
-                    
-                    # 重新獲取最新狀態
-                    attendance_records = AttendanceParser.get_today_attendance_records(self.driver)
-                    current_status = AttendanceParser.get_current_status(attendance_records)
-                    
-                    if current_status != "checked_in":
-                        print(f"⚠️ 狀態已改變: {current_status}，無法執行下班打卡")
-                        return False
-                    
-                    # 查找下班按鈕
-                    buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(),'Check out')]")
-                    if not buttons:
-                        print("❌ 找不到下班按鈕")
-                        return False
-                    
-                    btn = buttons[0]
-                    print(f"🔘 找到下班按鈕: {btn.text.strip()}")
-                    
-                    # 執行下班打卡
-                    btn.click()
-                    print("✅ 自動下班打卡成功！")
-                    
-                    # 發送成功通知
-                    EmailService.send_checkin_notification(
-                        f"自動下班打卡成功！", 
-                        "下班", 
-                        source="自動下班偵測",
-                        attendance_records=attendance_records
-                    )
-                    
-                    return True
-                    
-                except KeyboardInterrupt:
-                    print("\n⏸ 用戶取消等待")
-                    return False
-                except Exception as e:
-                    print(f"❌ 等待過程出錯: {e}")
-                    return False
-                    
+
+            # 計算還需要多少時間
+            remaining_hours = summary.remaining_hours()
+            remaining_minutes = int(remaining_hours * 60)
+            print(f"⏰ 還需要工作: {remaining_minutes} 分鐘 ({remaining_hours:.2f} 小時)")
+
+            # 計算下班時間
+            checkout_time = summary.checkout_time(now)
+            print(f"🕐 預計下班時間: {checkout_time.strftime('%H:%M:%S')}")
+
+            # 計算等待時間（滿8小時後再等1分鐘）
+            wait_time = remaining_hours + (1/60)  # 加1分鐘
+            wait_minutes = int(wait_time * 60)
+            target_time = now + datetime.timedelta(minutes=wait_minutes)
+
+            print(f"⏳ 將在 {target_time.strftime('%H:%M:%S')} 自動執行下班打卡")
+            print(f"   等待時間: {wait_minutes} 分鐘")
+
+            # 保存延後工作，程式中斷後重新執行 auto 可以接續等待
+            job = DeferredJobStore().add(target_time, "下班", AUTO_CHECKOUT_SOURCE)
+
+            # 發送通知
+            EmailService.send_checkin_notification(
+                f"自動下班偵測啟動 - 將在 {target_time.strftime('%H:%M')} 自動打卡下班",
+                "下班偵測",
+                work_hours=total_work_hours,
+                source=AUTO_CHECKOUT_SOURCE,
+                attendance_records=attendance_records
+            )
+
         except Exception as e:
             print(f"❌ 自動下班偵測失敗: {e}")
             import traceback
             traceback.print_exc()
             return False
 
+        return self.run_deferred_checkout(job)
+
+    @staticmethod
+    def _deferred_checkout_allowed(job):
+        """確認今天仍需要執行延後打卡；請假日或非工作日時移除工作，停用時保留工作"""
+        if not Config.AUTO_CHECKIN_ENABLED:
+            print("⏸ 已停用自動打卡 (AUTO_CHECKIN_ENABLED=false)，保留延後工作")
+            return False
+        today = current_time().date()
+        if Config.is_skip_today(today) or not Config.is_workday(today):
+            print("⏸ 今天不需要打卡，取消延後下班打卡")
+            DeferredJobStore().remove(job["id"])
+            return False
+        return True
+
+    def run_deferred_checkout(self, job):
+        """關閉瀏覽器等待到延後工作的時間，再重新登入完成下班打卡"""
+        target_time = DeferredJobStore.fire_time(job)
+        if not self._deferred_checkout_allowed(job):
+            return False
+
+        # 等待期間不保留瀏覽器
+        self.quit()
+        print(f"\n⏰ 開始等待，瀏覽器已關閉... (按 Ctrl+C 取消，重新執行 auto 可接續等待)")
+        try:
+            self._sleep_until(target_time)
+        except KeyboardInterrupt:
+            print("\n⏸ 用戶取消等待")
+            return False
+
+        # 等待期間可能停用了自動打卡或新增了請假日，打卡前重新確認
+        if not self._deferred_checkout_allowed(job):
+            return False
+
+        print(f"\n🚀 時間到了！開始執行下班打卡...")
+        try:
+            self.setup_driver()
+            if not self.login():
+                print("❌ 登入失敗，保留延後工作，可重新執行 auto 再試一次")
+                return False
+
+            # 重新獲取最新狀態
+            attendance_records = AttendanceParser.get_today_attendance_records(self.driver)
+            current_status = AttendanceParser.get_current_status(attendance_records)
+            DeferredJobStore().remove(job["id"])
+
+            if current_status != "checked_in":
+                print(f"⚠️ 狀態已改變: {current_status}，無法執行下班打卡")
+                return False
+
+            return self._click_checkout(attendance_records, "自動下班打卡成功！")
+        except Exception as e:
+            print(f"❌ 延後下班打卡出錯: {e}")
+            return False
+
+    @staticmethod
+    def _sleep_until(target_time):
+        """睡眠到指定時間，每 10 分鐘顯示一次剩餘時間"""
+        while True:
+            remaining = (target_time - current_time()).total_seconds()
+            if remaining <= 0:
+                return
+            print(f"⏳ 還需要等待: {int(remaining // 60)}分{int(remaining % 60)}秒")
+            time.sleep(min(remaining, 600))
+
+    def _click_checkout(self, attendance_records, message, total_hours=None):
+        """點擊下班按鈕並寄送通知"""
+        buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(),'Check out')]")
+        if not buttons:
+            print("❌ 找不到下班按鈕")
+            return False
+
+        btn = buttons[0]
+        print(f"🔘 找到下班按鈕: {btn.text.strip()}")
+
+        try:
+            with span("punch"):
+                btn.click()
+            print("✅ 下班打卡成功！")
+        except Exception as e:
+            print(f"❌ 下班打卡失敗: {e}")
+            self._record_punch("下班", attendance_store.FAILED, f"下班打卡失敗: {e}", total_hours, AUTO_CHECKOUT_SOURCE)
+            return False
+
+        self._record_punch("下班", attendance_store.SUCCESS, message, total_hours, AUTO_CHECKOUT_SOURCE)
+
+        EmailService.send_checkin_notification(
+            message,
+            "下班",
+            work_hours=total_hours,
+            source=AUTO_CHECKOUT_SOURCE,
+            attendance_records=attendance_records
+        )
+        return True
+
+    def reset_session(self):
+        """清除瀏覽器中的登入狀態，之後以目前 Config 中的帳號重新登入"""
+        try:
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException as e:
+            print(f"⚠️ 清除登入狀態失敗: {e}")
+        self.session_store = SessionStore() if Config.SESSION_PERSISTENCE_ENABLED else None
+        self.work_start_time = None
+        self.today_log = []
+
     def quit(self):
         """關閉瀏覽器"""
         if self.driver:
             self.driver.quit()
+            self.driver = None
@@ -0,0 +1,130 @@
+"""
+工時計算模組
+將打卡記錄轉成「當天第幾分鐘」的整數陣列，一次計算已完成、進行中與剩餘工時
+"""
+import os
+import datetime
+from array import array
+
+REQUIRED_WORK_HOURS = 8
+
+
+def current_time():
+    """取得與打卡系統一致的當前時間（GitHub Actions 為 UTC，需轉成台灣時間）"""
+    if os.getenv("GITHUB_ACTIONS"):
+        return datetime.datetime.now() + datetime.timedelta(hours=8)
+    return datetime.datetime.now()
+
+
+def to_minutes(time_str):
+    """將 "HH:MM" 轉成當天第幾分鐘，格式錯誤時回傳 None"""
+    if not time_str or time_str == 'N/A':
+        return None
+    hour, sep, minute = time_str.partition(':')
+    if not sep or not hour.isdigit() or not minute.isdigit():
+        return None
+    hour, minute = int(hour), int(minute)
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def to_arrays(records):
+    """將打卡記錄轉成上班與下班分鐘陣列；無法解析的時間記為 -1，進行中的下班時間也記為 -1"""
+    check_ins = array('h')
+    check_outs = array('h')
+    for record in records:
+        in_minutes = to_minutes(record.get('check_in'))
+        out_minutes = to_minutes(record.get('check_out'))
+        check_ins.append(-1 if in_minutes is None else in_minutes)
+        check_outs.append(-1 if out_minutes is None else out_minutes)
+    return check_ins, check_outs
+
+
+class WorkHoursSummary:
+    """一天的工時計算結果（單位：分鐘）"""
+
+    __slots__ = ("completed_minutes", "in_progress_minutes", "in_progress_since", "segments")
+
+    def __init__(self, completed_minutes=0.0, in_progress_minutes=0.0, in_progress_since=None, segments=None):
+        self.completed_minutes = completed_minutes
+        self.in_progress_minutes = in_progress_minutes
+        self.in_progress_since = in_progress_since
+        self.segments = segments or []
+
+    @property
+    def completed_hours(self):
+        return self.completed_minutes / 60
+
+    @property
+    def current_hours(self):
+        return self.in_progress_minutes / 60
+
+    @property
+    def total_hours(self):
+        return (self.completed_minutes + self.in_progress_minutes) / 60
+
+    def remaining_hours(self, required_hours=REQUIRED_WORK_HOURS):
+        """距離滿 required_hours 還需要的工時"""
+        return required_hours - self.total_hours
+
+    def checkout_time(self, now, required_hours=REQUIRED_WORK_HOURS):
+        """從 now 開始繼續工作，滿 required_hours 的時間點"""
+        return now + datetime.timedelta(hours=max(0.0, self.remaining_hours(required_hours)))
+
+
+def summarize(records, now=None):
+    """計算單日工時
+
+    已完成的時段 = 下班 - 上班；有上班但下班為空字串的時段視為進行中，以 now 計算。
+    與原本的邏輯相同，若有多個進行中的時段只採計最後一個。
+    """
+    check_ins, check_outs = to_arrays(records)
+    now = now or current_time()
+    now_minutes = now.hour * 60 + now.minute + now.second / 60 + now.microsecond / 60e6
+
+    completed = 0
+    in_progress = 0.0
+    in_progress_since = None
+    segments = []
+    for index in range(len(check_ins)):
+        in_minutes = check_ins[index]
+        if in_minutes < 0:
+            segments.append(None)
+            continue
+        out_minutes = check_outs[index]
+        if out_minutes >= 0:
+            completed += out_minutes - in_minutes
+            segments.append((out_minutes - in_minutes, False))
+        elif records[index].get('check_out') == '':
+            in_progress = now_minutes - in_minutes
+            in_progress_since = in_minutes
+            segments.append((in_progress, True))
+        else:
+            segments.append(None)
+
+    return WorkHoursSummary(completed, in_progress, in_progress_since, segments)
+
+
+def summarize_history(records_by_date):
+    """批次計算多天的已完成工時，回傳 {日期: 小時}
+
+    所有天數的記錄先攤平成同一組分鐘陣列，再以單一迴圈依日期索引累加，
+    適合一次處理整年的歷史資料。
+    """
+    dates = list(records_by_date)
+    day_index = array('i')
+    check_ins = array('h')
+    check_outs = array('h')
+    for index, date in enumerate(dates):
+        ins, outs = to_arrays(records_by_date[date])
+        check_ins.extend(ins)
+        check_outs.extend(outs)
+        day_index.extend([index] * len(ins))
+
+    totals = array('l', [0]) * len(dates)
+    for day, in_minutes, out_minutes in zip(day_index, check_ins, check_outs):
+        if in_minutes >= 0 and out_minutes >= 0:
+            totals[day] += out_minutes - in_minutes
+
+    return {date: totals[index] / 60 for index, date in enumerate(dates)}